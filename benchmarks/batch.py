@@ -0,0 +1,43 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares the per-value cost of hashing many small records with ion_hash() and with hash_values().
+
+Usage:
+  python benchmarks/batch.py
+"""
+
+import timeit
+
+import amazon.ion.simpleion as ion
+import ionhash
+
+
+_RECORDS = {
+    'int': [ion.loads(str(i)) for i in range(10000)],
+    'flat struct': [ion.loads('{id: %d, name: "n%d", ok: true}' % (i, i)) for i in range(10000)],
+    'nested structs': [ion.loads('{id: %d, a: {b: {c: %d}}, d: [{e: 1}, {f: 2}]}' % (i, i)) for i in range(10000)],
+}
+
+
+def main():
+    for name, values in _RECORDS.items():
+        ion_hash = min(timeit.repeat(lambda: [v.ion_hash('sha256') for v in values], number=1, repeat=5))
+        hash_values = min(timeit.repeat(lambda: list(ionhash.hash_values(values, 'sha256')), number=1, repeat=5))
+        print('%-16s ion_hash: %8.2f us/value   hash_values: %8.2f us/value   (%.0f%% less)'
+              % (name, ion_hash / len(values) * 1e6, hash_values / len(values) * 1e6,
+                 (1 - hash_values / ion_hash) * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares keeping the digests seen while deduplicating in a Python set and in a DigestStore
+(in memory, in a file, and in a file preceded by a Bloom filter), reporting the digests added
+per second, the memory traced by tracemalloc (which excludes SQLite's own allocations, whose
+page cache is bounded), and the size of the database file.
+
+Usage:
+  python benchmarks/dedup.py [count]
+"""
+
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ionhash import DigestStore
+
+
+def _digests(count):
+    # one in ten digests is a duplicate of an earlier one
+    rng = random.Random(0)
+    digests = []
+    for i in range(count):
+        if i and rng.random() < 0.1:
+            digests.append(digests[rng.randrange(i)])
+        else:
+            digests.append(hashlib.sha256(b'%d' % i).digest())
+    return digests
+
+
+class _SetStore:
+    def __init__(self):
+        self._digests = set()
+
+    def add(self, digest):
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def close(self):
+        pass
+
+
+def _add_all(make_store, digests, path):
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+    store = make_store()
+    added = sum(store.add(digest) for digest in digests)
+    store.close()
+    return store, added
+
+
+def _run(name, make_store, digests, path=None):
+    start = time.perf_counter()
+    store, added = _add_all(make_store, digests, path)
+    elapsed = time.perf_counter() - start
+    # tracing slows allocation considerably, so memory is measured by a separate run
+    tracemalloc.start()
+    _add_all(make_store, digests, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = '' if path is None else '%8.1f MB file' % (os.path.getsize(path) / 1e6)
+    print('%-24s %10.0f digests/s %8.1f MB traced peak %s   (%d added)'
+          % (name, len(digests) / elapsed, peak / 1e6, size, added), flush=True)
+    if isinstance(store, DigestStore) and 'bloom_filter_positives' in store.statistics():
+        print('%-24s Bloom filter false positive rate %.4f' % ('', store.statistics()['bloom_filter_false_positive_rate']))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    digests = _digests(count)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _run('set', _SetStore, digests)
+        _run('DigestStore (memory)', DigestStore, digests)
+        path = os.path.join(temp_dir, 'file.db')
+        _run('DigestStore (file)', lambda: DigestStore(path), digests, path)
+        path = os.path.join(temp_dir, 'bloom.db')
+        _run('DigestStore (file+bloom)', lambda: DigestStore(path, expected_count=count), digests, path)
+
+
+if __name__ == '__main__':
+    main()
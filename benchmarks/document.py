@@ -0,0 +1,59 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares updating the Ion hash of a large struct with HashedDocument.set() to re-hashing it with
+hash_value() after the same change.
+
+Usage:
+  python benchmarks/document.py
+"""
+
+import timeit
+
+import amazon.ion.simpleion as ion
+
+from ionhash import HashedDocument
+from ionhash.fast_value_hasher import hash_value
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+def _document(fields):
+    return ion.loads('{%s}' % ', '.join('f%d: {id: %d, g: {h: [%d, "x"], i: {j: %d}}}' % (i, i, i, i)
+                                        for i in range(fields)))
+
+
+def main():
+    hfp = hashlib_hash_function_provider('sha256')
+    new_value = ion.loads('42')
+    for fields in (100, 1000, 10000):
+        value = _document(fields)
+        document = HashedDocument(_document(fields), 'sha256')
+        path = ['f%d' % (fields // 2), 'g', 'i', 'j']
+
+        def _rehash():
+            value['f%d' % (fields // 2)]['g']['i']['j'] = new_value
+            return hash_value(value, hfp)
+
+        def _update():
+            document.set(path, new_value)
+            return document.digest
+
+        assert _rehash() == _update()
+        rehash = min(timeit.repeat(_rehash, number=5, repeat=3)) / 5
+        update = min(timeit.repeat(_update, number=5, repeat=3)) / 5
+        print('%6d fields  hash_value: %9.2f ms   HashedDocument.set: %7.3f ms'
+              % (fields, rehash * 1e3, update * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares _escape() with alternative escaping strategies on escape-free and escape-dense inputs,
+given as `bytes` and as `memoryview` slices of a larger buffer:
+
+  chained replace   the previous _escape(): three `in` checks, then three chained replace() calls
+  regex             a single pass using re.sub() with a character class
+  regex search      searching a memoryview in place with a character class (as hash_binary() did),
+                    then copying and escaping it if needed
+
+Usage:
+  python benchmarks/escape.py
+"""
+
+import random
+import re
+import timeit
+
+from ionhash.hasher import _escape
+
+
+_ESCAPABLE_BYTE = re.compile(b'[\x0b\x0c\x0e]')
+
+
+def _chained_replace(_bytes):
+    if 0x0B in _bytes or 0x0E in _bytes or 0x0C in _bytes:
+        return _bytes.replace(b'\x0c', b'\x0c\x0c').replace(b'\x0b', b'\x0c\x0b').replace(b'\x0e', b'\x0c\x0e')
+    return _bytes
+
+
+def _regex(_bytes):
+    return _ESCAPABLE_BYTE.sub(b'\x0c\\g<0>', _bytes)
+
+
+def _regex_search(view):
+    if _ESCAPABLE_BYTE.search(view) is not None:
+        return _chained_replace(bytes(view))
+    return view
+
+
+def _time(fn, _bytes):
+    number = max(10, 200000 // max(len(_bytes), 1))
+    return min(timeit.repeat(lambda: fn(_bytes), number=number, repeat=5)) / number
+
+
+def main():
+    rng = random.Random(0)
+    inputs = [
+        ('escape-free 8 B', b'abcdefgh'),
+        ('escape-free 1 KB', bytes(rng.choice(b'abcdefgh') for _ in range(1024))),
+        ('escape-free 64 KB', bytes(rng.choice(b'abcdefgh') for _ in range(65536))),
+        ('one escape 64 KB', b'a' * 65535 + b'\x0e'),
+        ('random 64 KB', bytes(rng.getrandbits(8) for _ in range(65536))),
+        ('escape-dense 1 KB', b'\x0b\x0c\x0ea' * 256),
+    ]
+    for name, _bytes in inputs:
+        view = memoryview(b'\x00' + _bytes + b'\x00')[1:-1]
+        assert _escape(_bytes) == _escape(view) == _chained_replace(_bytes) == _regex(_bytes) == _regex_search(view)
+        print('%-18s bytes: _escape %9.2f us  chained replace %9.2f us  regex %9.2f us   '
+              'memoryview: _escape %9.2f us  regex search %9.2f us'
+              % (name, _time(_escape, _bytes) * 1e6, _time(_chained_replace, _bytes) * 1e6,
+                 _time(_regex, _bytes) * 1e6, _time(_escape, view) * 1e6, _time(_regex_search, view) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares hashlib_hash_function_provider() with a provider that calls hashlib.new() for every
+hash object it creates, both in isolation and when hashing struct-heavy values.
+
+Usage:
+  python benchmarks/hashlib_provider.py
+"""
+
+import hashlib
+from io import BytesIO
+import timeit
+
+import amazon.ion.simpleion as ion
+from amazon.ion import reader as ion_reader
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_managed import managed_reader
+
+from ionhash.fast_value_hasher import hash_value
+from ionhash.hasher import HashEvent
+from ionhash.hasher import IonHasher
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+class _NewPerDigestHash(IonHasher):
+    def __init__(self, algorithm):
+        self._algorithm = algorithm
+        self._hasher = hashlib.new(algorithm)
+
+    def update(self, _bytes):
+        self._hasher.update(_bytes)
+
+    def digest(self):
+        digest = self._hasher.digest()
+        self._hasher = hashlib.new(self._algorithm)
+        return digest
+
+
+def _new_per_digest_provider(algorithm):
+    return lambda: _NewPerDigestHash(algorithm)
+
+
+_VALUE = ion.loads('[%s]' % ', '.join('{id: %d, a: {b: {c: %d}}, d: [{e: 1}, {f: 2}]}' % (i, i)
+                                       for i in range(1000)))
+_BINARY = ion.dumps(_VALUE, binary=True)
+
+
+def _hash_reader(hfp):
+    reader = hash_reader(ion_reader.blocking_reader(managed_reader(binary_reader(), None), BytesIO(_BINARY)), hfp)
+    while reader.send(NEXT_EVENT).event_type is not IonEventType.STREAM_END:
+        pass
+    return reader.send(HashEvent.DIGEST)
+
+
+def _time(fn, number=1):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    for algorithm in ('md5', 'sha256'):
+        providers = (('hashlib.new()', _new_per_digest_provider(algorithm)),
+                     ('prototype copy', hashlib_hash_function_provider(algorithm)))
+        for name, hfp in providers:
+            def _cycle():
+                hf = hfp()
+                hf.update(b'\x0b\x20\x0e')
+                hf.digest()
+                hf.update(b'\x0b\x21\x01\x0e')
+                hf.digest()
+            print('%-7s %-15s create+2 digests: %6.2f us   hash_value: %7.2f ms   hash_reader: %7.2f ms'
+                  % (algorithm, name, _time(_cycle, 100000) * 1e6,
+                     _time(lambda: hash_value(_VALUE, hfp)) * 1e3,
+                     _time(lambda: _hash_reader(hfp)) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares computing the SHA-256 and MD5 Ion hashes of records with one traversal per algorithm,
+and with a single traversal using multi_hash_function_provider(), for hash_value() and hash_reader().
+
+Usage:
+  python benchmarks/multi_hash.py
+"""
+
+from io import BytesIO
+import timeit
+
+import amazon.ion.simpleion as ion
+from amazon.ion import reader as ion_reader
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_managed import managed_reader
+
+from ionhash.fast_value_hasher import hash_value
+from ionhash.hasher import HashEvent
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hashlib_hash_function_provider
+from ionhash.hasher import multi_hash_function_provider
+
+
+_ALGORITHMS = ('sha256', 'md5')
+
+_RECORDS = {
+    'flat records': ion.loads('[%s]' % ', '.join('{id: %d, name: "user%d", score: %d.5e0, tags: [a, b]}' % (i, i, i)
+                                                 for i in range(1000))),
+    'nested records': ion.loads('[%s]' % ', '.join('{id: %d, a: {b: {c: %d}}, d: [{e: 1}, {f: 2}]}' % (i, i)
+                                                   for i in range(1000))),
+    'string records': ion.loads('[%s]' % ', '.join('"%s"' % ('lorem ipsum %d ' % i * 50) for i in range(1000))),
+}
+
+
+def _hash_reader(data, hfp):
+    reader = hash_reader(ion_reader.blocking_reader(managed_reader(binary_reader(), None), BytesIO(data)), hfp)
+    while reader.send(NEXT_EVENT).event_type is not IonEventType.STREAM_END:
+        pass
+    return reader.send(HashEvent.DIGEST)
+
+
+def _time(fn):
+    return min(timeit.repeat(fn, number=1, repeat=5))
+
+
+def main():
+    providers = [hashlib_hash_function_provider(algorithm) for algorithm in _ALGORITHMS]
+    multi = multi_hash_function_provider(_ALGORITHMS)
+    for name, value in _RECORDS.items():
+        data = ion.dumps(value, binary=True)
+        assert list(hash_value(value, multi).values()) == [hash_value(value, hfp) for hfp in providers]
+        print('%-15s hash_value: %7.2f ms per algorithm, %7.2f ms single traversal   '
+              'hash_reader: %7.2f ms per algorithm, %7.2f ms single traversal'
+              % (name, _time(lambda: [hash_value(value, hfp) for hfp in providers]) * 1e3,
+                 _time(lambda: hash_value(value, multi)) * 1e3,
+                 _time(lambda: [_hash_reader(data, hfp) for hfp in providers]) * 1e3,
+                 _time(lambda: _hash_reader(data, multi)) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares hashing telemetry-like lists of floats and ints by the scalar path, by the NumPy
+vectorized path, and, given the equivalent NumPy arrays, by hash_array().
+
+Usage:
+  python benchmarks/numpy_lists.py
+"""
+
+import random
+import timeit
+
+import amazon.ion.simpleion as ion
+import numpy as np
+
+from ionhash import numpy_hasher
+from ionhash.fast_value_hasher import hash_value
+from ionhash.hasher import hashlib_hash_function_provider
+from ionhash.numpy_hasher import hash_array
+
+
+def _time(fn):
+    return min(timeit.repeat(fn, number=1, repeat=5))
+
+
+def main():
+    rng = random.Random(0)
+    hfp = hashlib_hash_function_provider('sha256')
+    for length in (100, 10000, 50000):
+        lists = [('floats', [rng.uniform(-1e3, 1e3) for _ in range(length)]),
+                 ('ints', [rng.randrange(-2 ** 40, 2 ** 40) for _ in range(length)])]
+        for name, values in lists:
+            value = ion.loads(ion.dumps(values))
+            array = np.array(values)
+            vectorized = _time(lambda: hash_value(value, hfp))
+            np_module, numpy_hasher.np = numpy_hasher.np, None
+            try:
+                expected = hash_value(value, hfp)
+                scalar = _time(lambda: hash_value(value, hfp))
+            finally:
+                numpy_hasher.np = np_module
+            assert hash_value(value, hfp) == hash_array(array, hash_function_provider=hfp) == expected
+            print('%6d %-6s scalar path %9.2f ms  vectorized %8.2f ms  hash_array %8.2f ms  %6.1fx'
+                  % (length, name, scalar * 1e3, vectorized * 1e3,
+                     _time(lambda: hash_array(array, hash_function_provider=hfp)) * 1e3, scalar / vectorized))
+
+
+if __name__ == '__main__':
+    main()
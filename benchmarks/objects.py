@@ -0,0 +1,65 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares hashing plain Python records with hash_object(), and by converting them to simpleion
+values with ``ion.loads(ion.dumps(obj))`` and calling ``ion_hash()``.
+
+Usage:
+  python benchmarks/objects.py
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+import timeit
+
+import amazon.ion.simpleion as ion
+
+from ionhash import hash_object
+
+
+@dataclass
+class _Order:
+    __ion_hash_fields__ = ('id', 'customer', 'total', 'placed', 'items')
+    id: int
+    customer: str
+    total: Decimal
+    placed: datetime
+    items: list
+
+
+def _record(i):
+    return {'id': i, 'customer': 'customer%d' % i, 'total': Decimal('%d.99' % i),
+            'placed': datetime(2020, 1, 1, 12, 0, i % 60, tzinfo=timezone.utc),
+            'items': [{'sku': 'sku%d' % j, 'quantity': j, 'price': 9.99} for j in range(5)]}
+
+
+def _time(fn):
+    return min(timeit.repeat(fn, number=1, repeat=5))
+
+
+def main():
+    records = [_record(i) for i in range(1000)]
+    orders = [_Order(**record) for record in records]
+    converted = _time(lambda: [ion.loads(ion.dumps(record)).ion_hash('sha256') for record in records])
+    direct = _time(lambda: [hash_object(record, 'sha256') for record in records])
+    dataclasses = _time(lambda: [hash_object(order, 'sha256') for order in orders])
+    assert [hash_object(order, 'sha256') for order in orders] \
+        == [ion.loads(ion.dumps(record)).ion_hash('sha256') for record in records]
+    print('1000 records:  loads(dumps()).ion_hash() %8.2f ms  hash_object() %8.2f ms (%.1fx)  '
+          'hash_object() of dataclasses %8.2f ms'
+          % (converted * 1e3, direct * 1e3, converted / direct, dataclasses * 1e3))
+
+
+if __name__ == '__main__':
+    main()
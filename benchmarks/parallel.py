@@ -0,0 +1,54 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares hashing binary Ion records serially and with parallel_hash_binary().
+
+Usage:
+  python benchmarks/parallel.py [max_workers]
+"""
+
+import os
+import sys
+import time
+
+import amazon.ion.simpleion as ion
+import ionhash
+
+
+def _records():
+    small = ion.dumps(ion.loads('{id: 1, name: "widget", tags: [a, b, c], dims: {w: 1.5, h: 2.5}}'), binary=True)
+    large = ion.dumps(ion.loads('{id: 2, data: "%s"}' % ('x' * 1000000)), binary=True)
+    return [large if i % 5000 == 0 else small for i in range(50000)]
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    records = _records()
+    size = sum(len(record) for record in records)
+
+    start = time.perf_counter()
+    serial = [ionhash.hash_binary(record, 'sha256')[0] for record in records]
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = list(ionhash.parallel_hash_binary(records, 'sha256', max_workers=max_workers))
+    parallel_seconds = time.perf_counter() - start
+
+    assert parallel == serial
+    print('%d records, %.1f MB' % (len(records), size / 1e6))
+    print('serial:               %6.2f s' % serial_seconds)
+    print('parallel (%2d workers): %6.2f s   (%.2fx)' % (max_workers, parallel_seconds, serial_seconds / parallel_seconds))
+
+
+if __name__ == '__main__':
+    main()
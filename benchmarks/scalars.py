@@ -0,0 +1,121 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares, per Ion type, the throughput of deriving the TQ byte and representation of scalars with
+the representation encoders, and with the previous approach:  serializing each value as binary Ion
+with ion-python's serializers, then splitting off the type descriptor and length.
+
+Usage:
+  python benchmarks/scalars.py
+"""
+
+import timeit
+
+import amazon.ion.simpleion as ion
+from amazon.ion.core import IonType
+from amazon.ion.writer_binary_raw import _serialize_blob
+from amazon.ion.writer_binary_raw import _serialize_bool
+from amazon.ion.writer_binary_raw import _serialize_clob
+from amazon.ion.writer_binary_raw import _serialize_decimal
+from amazon.ion.writer_binary_raw import _serialize_float
+from amazon.ion.writer_binary_raw import _serialize_int
+from amazon.ion.writer_binary_raw import _serialize_timestamp
+
+from ionhash.hasher import _representation
+from ionhash.hasher import _TQ
+
+
+class _IonEventDuck:
+    def __init__(self, value, ion_type):
+        self.value = value
+        self.ion_type = ion_type
+
+
+def _serialize_string(event):
+    ba = bytearray()
+    ba.append(_TQ[IonType.STRING])
+    ba.extend(event.value.encode('utf-8'))
+    return ba
+
+
+def _serialize_symbol(event):
+    token = event.value
+    ba = bytearray()
+    is_token = hasattr(token, 'sid')
+    if is_token and token.sid == 0:
+        ba.append(0x71)
+    else:
+        ba.append(_TQ[IonType.SYMBOL])
+        ba.extend(bytearray(token.text if is_token else token, encoding="utf-8"))
+    return ba
+
+
+_SERIALIZERS = {
+    IonType.BOOL:      _serialize_bool,
+    IonType.INT:       _serialize_int,
+    IonType.FLOAT:     _serialize_float,
+    IonType.DECIMAL:   _serialize_decimal,
+    IonType.TIMESTAMP: _serialize_timestamp,
+    IonType.SYMBOL:    _serialize_symbol,
+    IonType.STRING:    _serialize_string,
+    IonType.CLOB:      _serialize_clob,
+    IonType.BLOB:      _serialize_blob,
+}
+
+
+def _serialize_then_split(value, ion_type):
+    _bytes = _SERIALIZERS[ion_type](_IonEventDuck(value, ion_type))
+    offset = 1
+    if (_bytes[0] & 0x0F) == 0x0E:
+        for i in range(1, len(_bytes)):
+            if (_bytes[i] & 0x80) != 0:
+                offset = i + 1
+                break
+    tq = _bytes[0]
+    if ion_type != IonType.BOOL and ion_type != IonType.SYMBOL:
+        tq &= 0xF0
+    return tq, _bytes[offset:]
+
+
+_VALUES = [
+    ('bool', ion.loads('[true, false]')),
+    ('int', ion.loads('[0, 7, -300, 123456789, -18446744073709551616]')),
+    ('float', ion.loads('[0e0, -0e0, 1.5e0, 6.02214076e23, nan]')),
+    ('decimal', ion.loads('[0d0, -0d0, 1.50, -123.456d-7, 12345678901234567890.12345]')),
+    ('timestamp', ion.loads('[2017T, 2017-01-01T, 2017-01-01T12:30Z, 2017-01-01T12:30:59-08:00, '
+                            '2017-01-01T12:30:59.123456789+05:30]')),
+    ('symbol', ion.loads("[a, 'hello world', '\\u00e9t\\u00e9']")),
+    ('string', ion.loads('["", "hello world", "%s"]' % ('lorem ipsum ' * 20))),
+    ('clob', ion.loads('[{{""}}, {{"hello world"}}]')),
+    ('blob', ion.loads('[{{}}, {{aGVsbG8gd29ybGQ=}}]')),
+]
+
+
+def _time(fn, values):
+    number = 20000 // len(values)
+    return min(timeit.repeat(lambda: [fn(value, value.ion_type) for value in values], number=number, repeat=5)) \
+        / (number * len(values))
+
+
+def main():
+    for name, values in _VALUES:
+        for value in values:
+            assert _representation(value, value.ion_type) == _serialize_then_split(value, value.ion_type)
+        before = _time(_serialize_then_split, values)
+        after = _time(_representation, values)
+        print('%-10s serialize then split %8.3f us  encoders %8.3f us  %5.2fx'
+              % (name, before * 1e6, after * 1e6, before / after))
+
+
+if __name__ == '__main__':
+    main()
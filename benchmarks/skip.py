@@ -0,0 +1,65 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Compares skipping the nested containers of a binary Ion stream with hash_reader() (which
+steps through every skipped value) and with hash_binary_reader() (which hashes each skipped
+span directly from the binary data).
+
+Usage:
+  python benchmarks/skip.py
+"""
+
+from io import BytesIO
+import timeit
+
+import amazon.ion.simpleion as ion
+from amazon.ion import reader as ion_reader
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader import SKIP_EVENT
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_managed import managed_reader
+
+from ionhash.binary_hasher import hash_binary_reader
+from ionhash.hasher import HashEvent
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+_BINARY = ion.dumps(ion.loads('{header: "h", body: [%s]}' % ', '.join(
+    '{id: %d, a: {b: {c: %d}}, d: [{e: 1}, {f: 2}], s: "abc"}' % (i, i) for i in range(2000))), binary=True)
+
+
+def _skip_body(reader):
+    reader.send(NEXT_EVENT)
+    event = reader.send(NEXT_EVENT)
+    while event.event_type is not IonEventType.STREAM_END:
+        event = reader.send(SKIP_EVENT if event.event_type is IonEventType.CONTAINER_START else NEXT_EVENT)
+    return reader.send(HashEvent.DIGEST)
+
+
+def _time(fn):
+    return min(timeit.repeat(fn, number=1, repeat=5))
+
+
+def main():
+    hfp = hashlib_hash_function_provider('sha256')
+    reader = lambda: ion_reader.blocking_reader(managed_reader(binary_reader(), None), BytesIO(_BINARY))
+    assert _skip_body(hash_reader(reader(), hfp)) == _skip_body(hash_binary_reader(_BINARY, hfp))
+    print('%d bytes   hash_reader: %8.2f ms   hash_binary_reader: %8.2f ms'
+          % (len(_BINARY), _time(lambda: _skip_body(hash_reader(reader(), hfp))) * 1e3,
+             _time(lambda: _skip_body(hash_binary_reader(_BINARY, hfp))) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
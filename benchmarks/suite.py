@@ -0,0 +1,306 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Measures the throughput and memory use of each hashing path over generated corpora of various
+shapes, optionally saving the results as a JSON baseline, or comparing them with one.
+
+Each hashing path hashes every top-level value of each corpus:
+
+  ion_hash            the ion_hash() method of simpleion values
+  hash_binary         hash_binary() over the binary Ion corpus
+  hash_reader_binary  hash_reader() over a binary reader
+  hash_reader_text    hash_reader() over a text reader
+  hash_writer         hash_writer() over a binary writer, given the corpus' events
+
+For each path and corpus, the best of --repeat timed runs is reported as values/s and as MB/s
+(of binary Ion), along with the peak memory traced by tracemalloc during a separate, untimed run,
+and the number of memory blocks allocated by that run that are still allocated (by the digests,
+caches, or uncollected cyclic garbage) as it returns, with garbage collection disabled.
+
+Usage:
+  python benchmarks/suite.py [--scale F] [--repeat N] [--filter SUBSTRING]
+                             [--save BASELINE.json] [--compare BASELINE.json [--threshold T]]
+
+--compare reports the change in throughput relative to the baseline, and exits with status 1 if
+any throughput has dropped by more than --threshold (a fraction, 0.1 by default).  Baselines are
+specific to the machine (and the --scale) they were recorded with.
+"""
+
+import argparse
+import base64
+import gc
+from io import BytesIO
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import amazon.ion.simpleion as ion
+from amazon.ion import reader as ion_reader
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_managed import managed_reader
+from amazon.ion.reader_text import text_reader
+from amazon.ion.writer import blocking_writer
+from amazon.ion.writer_binary import binary_writer
+
+from ionhash.binary_hasher import hash_binary
+from ionhash.hasher import HashEvent
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hash_writer
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+_ALGORITHM = 'sha256'
+
+
+#
+# Corpora:  each returns the Ion text of a stream of top-level values, given a scale factor
+#
+
+def _count(count, scale):
+    """Returns the scaled number of top-level values of a corpus, which is at least 1."""
+    return max(1, int(count * scale))
+
+
+def _wide_structs(scale):
+    return '\n'.join('{%s}' % ', '.join('f%d: %d' % (i, i * r) for i in range(500)) for r in range(_count(4, scale)))
+
+
+def _deep_nesting(scale):
+    return '\n'.join('[' * 200 + '{a: %d}' % r + ']' * 200 for r in range(_count(10, scale)))
+
+
+def _large_blobs(scale):
+    rng = random.Random(0)
+    return '\n'.join('{{%s}}' % base64.b64encode(bytes(rng.getrandbits(8) for _ in range(64 * 1024))).decode()
+                     for _ in range(_count(2, scale)))
+
+
+def _large_strings(scale):
+    return '\n'.join('"%s"' % ('lorem ipsum dolor sit amet ' * 1250) for _ in range(_count(2, scale)))
+
+
+def _small_records(scale):
+    return '\n'.join('{id: %d, name: "user%d", active: true, score: %d.5e0, tags: [a, b]}' % (i, i, i)
+                     for i in range(_count(1000, scale)))
+
+
+def _annotations(scale):
+    return '\n'.join('a::b::c::{x: d::e::%d, y: f::[g::h::1, i::"j"], z: k::l::m::n}' % i for i in range(_count(500, scale)))
+
+
+def _escape_dense(scale):
+    # the escape-worthy bytes 0x0B, 0x0C and 0x0E, in strings, symbols, blobs and field names
+    return '\n'.join("{'\\x0b%d': \"\\x0b\\x0c\\x0e%s\", b: '\\x0e\\x0c', c: {{CwwOCwwOCwwO}}}" % (i, '\\x0e' * 50)
+                     for i in range(_count(500, scale)))
+
+
+_CORPORA = [
+    ('wide_structs', _wide_structs),
+    ('deep_nesting', _deep_nesting),
+    ('large_blobs', _large_blobs),
+    ('large_strings', _large_strings),
+    ('small_records', _small_records),
+    ('annotations', _annotations),
+    ('escape_dense', _escape_dense),
+]
+
+
+class _Corpus:
+    def __init__(self, name, text):
+        self.name = name
+        self.values = ion.loads(text, single_value=False)
+        self.text = ion.dumps(self.values, binary=False, sequence_as_stream=True).encode()
+        self.binary = ion.dumps(self.values, binary=True, sequence_as_stream=True)
+        self.events = _events(_binary_reader(self.binary))
+
+
+def _binary_reader(data):
+    return ion_reader.blocking_reader(managed_reader(binary_reader(), None), BytesIO(data))
+
+
+def _text_reader(data):
+    return ion_reader.blocking_reader(managed_reader(text_reader(), None), BytesIO(data))
+
+
+def _events(reader):
+    events = []
+    event = reader.send(NEXT_EVENT)
+    while event.event_type is not IonEventType.STREAM_END:
+        events.append(event)
+        event = reader.send(NEXT_EVENT)
+    return events
+
+
+#
+# Hashing paths:  each returns the digests of the corpus' top-level values
+#
+
+def _ion_hash(corpus, hfp):
+    return [value.ion_hash(hash_function_provider=hfp) for value in corpus.values]
+
+
+def _hash_binary(corpus, hfp):
+    return list(hash_binary(corpus.binary, hash_function_provider=hfp))
+
+
+def _read_digests(reader):
+    digests = []
+    event = reader.send(NEXT_EVENT)
+    while event.event_type is not IonEventType.STREAM_END:
+        if event.depth == 0 and event.event_type is not IonEventType.CONTAINER_START:
+            digests.append(reader.send(HashEvent.DIGEST))
+        event = reader.send(NEXT_EVENT)
+    return digests
+
+
+def _hash_reader_binary(corpus, hfp):
+    return _read_digests(hash_reader(_binary_reader(corpus.binary), hfp))
+
+
+def _hash_reader_text(corpus, hfp):
+    return _read_digests(hash_reader(_text_reader(corpus.text), hfp))
+
+
+def _hash_writer(corpus, hfp):
+    writer = hash_writer(blocking_writer(binary_writer(), BytesIO()), hfp)
+    digests = []
+    for event in corpus.events:
+        writer.send(event)
+        if event.depth == 0 and event.event_type is not IonEventType.CONTAINER_START:
+            digests.append(writer.send(HashEvent.DIGEST))
+    return digests
+
+
+_PATHS = [
+    ('ion_hash', _ion_hash),
+    ('hash_binary', _hash_binary),
+    ('hash_reader_binary', _hash_reader_binary),
+    ('hash_reader_text', _hash_reader_text),
+    ('hash_writer', _hash_writer),
+]
+
+
+def _measure(path, corpus, hfp, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        digests = path(corpus, hfp)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # the garbage collector is disabled so that no cyclic garbage is freed while the blocks are counted
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = len(tracemalloc.take_snapshot().traces)
+        digests = path(corpus, hfp)
+        blocks = len(tracemalloc.take_snapshot().traces) - before
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    return {
+        'values': len(digests),
+        'seconds': best,
+        'values_per_second': len(digests) / best,
+        'mb_per_second': len(corpus.binary) / best / 1e6,
+        'allocated_blocks': blocks,
+        'peak_memory_bytes': peak,
+    }, digests
+
+
+def run(scale=1.0, repeat=3, name_filter=None):
+    """Returns the results of each hashing path over each corpus, keyed by 'path/corpus'."""
+    hfp = hashlib_hash_function_provider(_ALGORITHM)
+    results = {}
+    for corpus_name, generate in _CORPORA:
+        names = [(path_name, path) for path_name, path in _PATHS
+                 if name_filter is None or name_filter in '%s/%s' % (path_name, corpus_name)]
+        if not names:
+            continue
+        corpus = _Corpus(corpus_name, generate(scale))
+        expected = None
+        for path_name, path in names:
+            result, digests = _measure(path, corpus, hfp, repeat)
+            # every path must agree, or the comparison is meaningless
+            if expected is None:
+                expected = digests
+            elif digests != expected:
+                raise Exception("%s produced different digests for the %s corpus" % (path_name, corpus_name))
+            key = '%s/%s' % (path_name, corpus_name)
+            results[key] = result
+            print('%-34s %10.1f values/s %8.3f MB/s %8d blocks allocated %10.1f KB peak'
+                  % (key, result['values_per_second'], result['mb_per_second'],
+                     result['allocated_blocks'], result['peak_memory_bytes'] / 1024), flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints the change in throughput of each result relative to the baseline, and returns the
+    keys of the results whose throughput dropped by more than threshold."""
+    regressions = []
+    print()
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print('%-34s (not in baseline)' % key)
+            continue
+        if not result['values'] or not base['values']:
+            print('%-34s (no values)' % key)
+            continue
+        change = result['values_per_second'] / base['values_per_second'] - 1
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(key)
+        print('%-34s %+7.1f%% throughput %+7.1f%% peak memory%s'
+              % (key, change * 100, (result['peak_memory_bytes'] / max(base['peak_memory_bytes'], 1) - 1) * 100,
+                 '   REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies the size of each corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of timed runs of each benchmark')
+    parser.add_argument('--filter', help="only runs benchmarks whose 'path/corpus' name contains this")
+    parser.add_argument('--save', metavar='BASELINE', help='saves the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compares the results with this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='the fractional drop in throughput reported as a regression')
+    args = parser.parse_args()
+
+    results = run(args.scale, args.repeat, args.filter)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'scale': args.scale, 'algorithm': _ALGORITHM, 'results': results}, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != args.scale:
+            print('warning: the baseline was recorded with --scale %s' % baseline.get('scale'))
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print('\n%d regression(s) beyond %.0f%%' % (len(regressions), args.threshold * 100))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
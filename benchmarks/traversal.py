@@ -0,0 +1,53 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Measures the time spent by fast_value_hasher.hash_value() traversing values of various shapes.
+
+Usage:
+  python benchmarks/traversal.py
+"""
+
+import timeit
+
+import amazon.ion.simpleion as ion
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyList
+
+from ionhash.fast_value_hasher import hash_value
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+def _deep(depth):
+    value = ion.loads('[1]')
+    for i in range(depth):
+        value = IonPyList.from_value(IonType.LIST, [value])
+    return value
+
+
+_CASES = [
+    ('shallow struct', ion.loads('{id: 12345, name: "widget", tags: [a, b, c], price: 12.50, ok: true}'), 20000),
+    ('list of 1000 structs', ion.loads('[' + ','.join('{a:%d, b:"x%d"}' % (i, i) for i in range(1000)) + ']'), 20),
+    ('nesting depth 100', _deep(100), 2000),
+    ('nesting depth 10000', _deep(10000), 20),
+]
+
+
+def main():
+    hfp = hashlib_hash_function_provider('sha256')
+    for name, value, number in _CASES:
+        seconds = min(timeit.repeat(lambda: hash_value(value, hfp), number=number, repeat=5))
+        print('%-24s %12.2f us/value' % (name, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
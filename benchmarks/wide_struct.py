@@ -0,0 +1,53 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Measures the cost of sorting the field digests of wide structs, using the native ordering of
+digests and using _bytearray_comparator, and the time taken to hash such structs.
+
+Usage:
+  python benchmarks/wide_struct.py
+"""
+
+from functools import cmp_to_key
+import timeit
+
+import amazon.ion.simpleion as ion
+
+from ionhash.binary_hasher import hash_binary
+from ionhash.fast_value_hasher import hash_value
+from ionhash.hasher import _bytearray_comparator
+from ionhash.hasher import _sort_field_hashes
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+def _time(fn):
+    return min(timeit.repeat(fn, number=1, repeat=5))
+
+
+def main():
+    hfp = hashlib_hash_function_provider('sha256')
+    for width in (1000, 10000, 100000):
+        value = ion.loads('{%s}' % ', '.join('f%d: %d' % (i, i) for i in range(width)))
+        data = ion.dumps(value, binary=True)
+        digests = [value[name].ion_hash('sha256') for name in list(value.keys())[:width]]
+
+        comparator_sort = _time(lambda: sorted(digests, key=cmp_to_key(_bytearray_comparator)))
+        native_sort = _time(lambda: _sort_field_hashes(list(digests)))
+        print('%6d fields  sort with comparator: %8.2f ms   native sort: %6.2f ms   '
+              'hash_value: %8.2f ms   hash_binary: %8.2f ms'
+              % (width, comparator_sort * 1e3, native_sort * 1e3,
+                 _time(lambda: hash_value(value, hfp)) * 1e3, _time(lambda: hash_binary(data, 'sha256')) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
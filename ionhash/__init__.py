@@ -11,10 +11,58 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+from importlib import import_module
+
 from amazon.ion.simple_types import _IonNature
 
-from ionhash.fast_value_hasher import hash_value
-from ionhash.hasher import hashlib_hash_function_provider
+from ionhash.fast_value_hasher import hash_value, hash_values as _hash_values
+from ionhash.hasher import hashlib_hash_function_provider, multi_hash_function_provider, _resolve_hash_function_provider
+from ionhash.hasher import configure_symbol_cache, symbol_cache_info
+from ionhash.memoization import enable_memoization, disable_memoization, memoization_enabled, invalidate
+from ionhash.memoization import _memoized_hash_value
+
+
+# The module of each attribute that is imported when it is first accessed (by __getattr__()), so
+# that importing ionhash doesn't import asyncio, sqlite3, multiprocessing, etc. unless they're used
+_LAZY_ATTRIBUTES = {
+    'AsyncHashReader': 'ionhash.async_hasher',
+    'AsyncHashWriter': 'ionhash.async_hasher',
+    'hash_array': 'ionhash.numpy_hasher',
+    'hash_object': 'ionhash.object_hasher',
+    'hash_binary': 'ionhash.binary_hasher',
+    'hash_binary_reader': 'ionhash.binary_hasher',
+    'split_binary': 'ionhash.binary_hasher',
+    'hash_binary_range': 'ionhash.binary_hasher',
+    'hash_binary_values': 'ionhash.binary_hasher',
+    'hash_binary_indexed': 'ionhash.digest_index',
+    'hash_binary_indexed_values': 'ionhash.digest_index',
+    'DigestStore': 'ionhash.dedup',
+    'dedup_values': 'ionhash.dedup',
+    'dedup_binary': 'ionhash.dedup',
+    'partition_binary': 'ionhash.partition',
+    'shard_index': 'ionhash.partition',
+    'HashedDocument': 'ionhash.document',
+    'enable_instrumentation': 'ionhash.instrumentation',
+    'disable_instrumentation': 'ionhash.instrumentation',
+    'instrumentation_enabled': 'ionhash.instrumentation',
+    'instrumentation_snapshot': 'ionhash.instrumentation',
+    'reset_instrumentation': 'ionhash.instrumentation',
+    'parallel_hash_binary': 'ionhash.parallel',
+    'parallel_hash_values': 'ionhash.parallel',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    attribute = getattr(import_module(module), name)
+    globals()[name] = attribute
+    return attribute
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
 # pydoc for this method is DUPLICATED in docs/index.rst
@@ -35,19 +83,41 @@ def ion_hash(self, algorithm=None, hash_function_provider=None):
 
     Returns:
         `bytes` that represent the Ion hash of this value for the specified algorithm
-        or hash_function_provider.
+        or hash_function_provider, or a dict of such `bytes` if the hash_function_provider
+        was returned by ``multi_hash_function_provider()``.
     """
-    if algorithm is None and hash_function_provider is None:
-        raise Exception("Either 'algorithm' or 'hash_function_provider' must be specified")
-    if algorithm is not None and hash_function_provider is not None:
-        raise Exception("Either 'algorithm' or 'hash_function_provider' must be specified, not both")
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    if memoization_enabled():
+        return _memoized_hash_value(self, hash_function_provider if algorithm is None else algorithm, hfp)
+    return hash_value(self, hfp)
 
-    if algorithm is not None:
-        hfp = hashlib_hash_function_provider(algorithm)
-    else:
-        hfp = hash_function_provider
 
-    return hash_value(self, hfp)
+def hash_values(values, algorithm=None, hash_function_provider=None):
+    """Given an algorithm or hash_function_provider, computes the Ion hash of each of
+    the given simpleion values.
+
+    This is equivalent to calling ``ion_hash()`` on each value, but the hash function
+    provider and the ``IonHasher`` instances it provides are reused from one value to
+    the next, which reduces the per-value overhead when hashing many small values.
+
+    Args:
+        values:
+            An iterable of simpleion values.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+            Note that multiple ``IonHasher`` instances may be required to hash a single value
+            (depending on the type of the Ion value).
+
+    Returns:
+        A generator that yields `bytes` that represent the Ion hash of each value, in order.
+    """
+    return _hash_values(values, _resolve_hash_function_provider(algorithm, hash_function_provider))
 
 
 # adds the `ion_hash` method to all simpleion value classes:
@@ -0,0 +1,172 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""asyncio counterparts of `hash_reader()` and `hash_writer()`, which read Ion data from (or write
+Ion data to) asyncio streams without blocking the event loop."""
+
+from amazon.ion.core import ION_STREAM_END_EVENT
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader import SKIP_EVENT
+from amazon.ion.reader import read_data_event
+from amazon.ion.writer import WriteEventType
+
+from ionhash.hasher import HashEvent
+from ionhash.hasher import _Hasher
+from ionhash.hasher import _hash_event
+
+
+_DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class AsyncHashReader:
+    """Wraps a non-blocking ion-python reader that reads from an asyncio stream, and adds Ion Hash
+    functionality.
+
+    Data is read from the stream only when the wrapped reader needs more of it to produce the next
+    event, so a slow consumer applies backpressure to the stream.
+
+    ``await send(input)`` behaves like ``hash_reader(...).send(input)`` does for a blocking reader:
+    it returns `bytes` when given ``HashEvent.DIGEST``, and otherwise the next event of the wrapped
+    reader.  SKIP_EVENTs are translated into a series of NEXT_EVENTs in order to ensure that the hash
+    correctly includes any subsequent or nested values.  ``async for`` iterates over the events
+    up to (but not including) the end of the stream.
+
+    Args:
+        reader(coroutine):
+            A non-blocking ion-python reader coroutine, e.g.
+            ``managed_reader(binary_reader(), catalog)``.
+
+        source:
+            An ``asyncio.StreamReader`` (or any object with an awaitable ``read(n)`` method),
+            or an asynchronous iterable of `bytes`.
+
+        hash_function_provider(function):
+            A function that returns a new ``IonHasher`` instance when called.
+
+        buffer_size(int):
+            The maximum number of bytes to read from a StreamReader at a time.
+    """
+    def __init__(self, reader, source, hash_function_provider, buffer_size=_DEFAULT_BUFFER_SIZE):
+        self._reader = reader
+        if hasattr(source, 'read'):
+            self._read = lambda: source.read(buffer_size)
+        else:
+            self._read = _chunk_reader(source.__aiter__())
+        self._hasher = _Hasher(hash_function_provider)
+        self._output = None
+        self._stream_ended = False
+
+    async def send(self, input):
+        if isinstance(input, HashEvent):
+            if input == HashEvent.DIGEST:
+                return self._hasher.digest()
+            raise Exception("Unsupported HashEvent: %s" % (input,))
+
+        if input == SKIP_EVENT:
+            # translate SKIP_EVENTs into the appropriate number
+            # of NEXT_EVENTs to ensure hash correctness:
+            target_depth = self._output.depth
+            if self._output.event_type != IonEventType.CONTAINER_START:
+                target_depth = self._output.depth - 1
+
+            output = await self._next(NEXT_EVENT)
+            while output.event_type != IonEventType.STREAM_END and output.depth > target_depth:
+                _hash_event(self._hasher, output)
+                output = await self._next(NEXT_EVENT)
+        else:
+            output = await self._next(input)
+
+        _hash_event(self._hasher, output)
+        self._output = output
+        return output
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.send(NEXT_EVENT)
+        if event.event_type == IonEventType.STREAM_END:
+            raise StopAsyncIteration
+        return event
+
+    async def _next(self, input):
+        """Sends input to the wrapped reader, feeding it data from the source until it produces an event."""
+        if self._stream_ended:
+            return ION_STREAM_END_EVENT
+        event = self._reader.send(input)
+        while event.event_type.is_stream_signal:
+            data = await self._read()
+            if len(data) == 0:
+                # end of the source
+                if event.event_type is IonEventType.INCOMPLETE:
+                    event = self._reader.send(NEXT_EVENT)
+                    continue
+                self._stream_ended = True
+                return ION_STREAM_END_EVENT
+            event = self._reader.send(read_data_event(data))
+        return event
+
+
+class AsyncHashWriter:
+    """Wraps an ion-python writer that writes to an asyncio stream, and adds Ion Hash functionality.
+
+    ``await send(event)`` writes the event, then waits until the stream's buffer has drained (so a
+    slow stream applies backpressure to the producer), and returns the ``WriteEventType`` of the
+    wrapped writer, as ``hash_writer(blocking_writer(...)).send(event)`` does.  It returns `bytes`
+    when given ``HashEvent.DIGEST``.
+
+    Args:
+        writer(coroutine):
+            An ion-python writer coroutine, e.g. ``binary_writer()``.
+
+        stream:
+            An ``asyncio.StreamWriter`` (or any object with a ``write(data)`` method and an
+            awaitable ``drain()`` method).
+
+        hash_function_provider(function):
+            A function that returns a new ``IonHasher`` instance when called.
+    """
+    def __init__(self, writer, stream, hash_function_provider):
+        self._writer = writer
+        self._stream = stream
+        self._hasher = _Hasher(hash_function_provider)
+
+    async def send(self, input):
+        if isinstance(input, HashEvent):
+            if input == HashEvent.DIGEST:
+                return self._hasher.digest()
+            raise Exception("Unsupported HashEvent: %s" % (input,))
+
+        result = self._writer.send(input)
+        self._stream.write(result.data)
+        while result.type is WriteEventType.HAS_PENDING:
+            result = self._writer.send(None)
+            self._stream.write(result.data)
+        _hash_event(self._hasher, input)
+        await self._stream.drain()
+        return result.type
+
+
+def _chunk_reader(chunks):
+    """Returns a coroutine function that returns the next non-empty chunk of the given asynchronous
+    iterator, or empty `bytes` once it is exhausted."""
+    async def _read():
+        try:
+            chunk = b''
+            while len(chunk) == 0:
+                chunk = await chunks.__anext__()
+            return chunk
+        except StopAsyncIteration:
+            return b''
+    return _read
@@ -0,0 +1,862 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Computes Ion hashes directly from binary Ion data, without instantiating any ion_readers
+or simpleion values."""
+
+from io import BytesIO
+from mmap import mmap
+from struct import unpack_from
+
+from amazon.ion.core import IonEvent
+from amazon.ion.core import IonEventType
+from amazon.ion.core import IonType
+from amazon.ion.reader import BufferQueue
+from amazon.ion.reader import SKIP_EVENT
+from amazon.ion.reader import blocking_reader
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_binary import _decimal_factory
+from amazon.ion.reader_binary import _timestamp_factory
+from amazon.ion.symbols import LOCAL_TABLE_TYPE
+from amazon.ion.symbols import SYSTEM_SYMBOL_TABLE
+from amazon.ion.symbols import SymbolTable
+from amazon.ion.symbols import SymbolTableCatalog
+from amazon.ion.symbols import TEXT_IMPORTS
+from amazon.ion.symbols import TEXT_ION_1_0
+from amazon.ion.symbols import TEXT_ION_SYMBOL_TABLE
+from amazon.ion.symbols import TEXT_MAX_ID
+from amazon.ion.symbols import TEXT_NAME
+from amazon.ion.symbols import TEXT_SYMBOLS
+from amazon.ion.symbols import TEXT_VERSION
+from amazon.ion.reader_managed import managed_reader
+from amazon.ion.util import coroutine
+
+from ionhash.fast_value_hasher import _s_scalar, _write_symbol, _CONTAINER_START
+from ionhash.hasher import _sort_field_hashes, _resolve_hash_function_provider, _escape, \
+    _BEGIN_MARKER, _BEGIN_MARKER_BYTE, _END_MARKER, _END_MARKER_BYTE, _ESCAPE_MARKER, _TQ, _TQ_ANNOTATED_VALUE, \
+    _hasher, _hash_event, _hash_reader_handler, _update_escaped, _CHUNK_SIZE, _MultiHash
+
+
+def hash_binary(buffer, algorithm=None, hash_function_provider=None, catalog=None):
+    """Given binary Ion data and an algorithm or hash_function_provider, computes the Ion hash
+    of each top-level value in the data.
+
+    The type descriptors of the binary Ion data are walked directly; no readers, events or
+    simpleion values are created.  Where a value's Ion Hash representation is identical to
+    its binary Ion representation (e.g. strings, blobs and clobs), representations longer than
+    64 bytes that need no escaping are passed to the hash function as slices of the given buffer
+    rather than copies, if the buffer is a `bytes`, `bytearray` or `mmap`.
+
+    Args:
+        buffer:
+            A `bytes`, `bytearray`, `memoryview` or other object supporting the buffer protocol
+            (such as an `mmap`) that contains binary Ion data, beginning with an Ion version marker.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+            Note that multiple ``IonHasher`` instances may be required to hash a single value
+            (depending on the type of the Ion value).
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+    Returns:
+        A list containing the Ion hash `bytes` of each top-level value in the data.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    return [digest for (_, _, digest, _) in _BinaryHasher(buffer, hfp, catalog).hash_values()]
+
+
+def split_binary(buffer, chunk_size, catalog=None):
+    """Splits binary Ion data into ranges of consecutive top-level values that may be hashed
+    independently of one another (e.g. by different processes) using ``hash_binary_range()``.
+
+    Only the type descriptors and lengths of the top-level values are read, along with any Ion
+    version markers and local symbol tables, which are tracked so that each range records the
+    local symbol tables in effect at its start.
+
+    Args:
+        buffer:
+            A `bytes`-like object (such as an `mmap`) that contains binary Ion data, beginning
+            with an Ion version marker.
+
+        chunk_size:
+            The approximate number of bytes in each range;  a range contains at least one
+            top-level value, so a value larger than chunk_size is a range on its own.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+    Returns:
+        A generator that yields a (start, end, symbol_tables) tuple for each range, in order, where
+        start and end are its positions within the data, and symbol_tables is an opaque (picklable)
+        description of the local symbol tables in effect at start.  If the data can't be traversed,
+        the range of the values preceding the error is yielded before the exception is raised.
+    """
+    return _BinaryHasher(buffer, None, catalog).ranges(chunk_size)
+
+
+def hash_binary_range(buffer, binary_range, algorithm=None, hash_function_provider=None, catalog=None):
+    """Given binary Ion data, one of the ranges into which ``split_binary()`` split it, and an
+    algorithm or hash_function_provider, computes the Ion hash of each top-level value in the range.
+
+    Args:
+        buffer:
+            The `bytes`-like object that contains the binary Ion data passed to ``split_binary()``.
+
+        binary_range:
+            A (start, end, symbol_tables) tuple yielded by ``split_binary()``.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables;  it must be equivalent to the one passed to ``split_binary()``.
+
+    Returns:
+        A list containing the Ion hash `bytes` of each top-level value in the range.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    start, end, symbol_tables = binary_range
+    hasher = _BinaryHasher(buffer, hfp, catalog)
+    hasher.restore_symbol_tables(symbol_tables)
+    return [digest for (_, _, digest, _) in hasher.hash_values(start, end)]
+
+
+def hash_binary_values(buffer, algorithm=None, hash_function_provider=None, binary_range=None, catalog=None):
+    """Given binary Ion data and an algorithm or hash_function_provider, computes the Ion hash of
+    each top-level value in the data (or in one of the ranges into which ``split_binary()`` split
+    it), yielding each as soon as it has been computed.
+
+    Unlike ``hash_binary()``, a value that can't be hashed (e.g. one that contains a symbol whose
+    text is unknown) doesn't prevent the values that follow it from being hashed, as its end is
+    known from its type descriptor.
+
+    Args:
+        buffer:
+            A `bytes`-like object (such as an `mmap`) that contains binary Ion data, beginning
+            with an Ion version marker.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+        binary_range:
+            An optional (start, end, symbol_tables) tuple yielded by ``split_binary()``;  by
+            default, every top-level value in the data is hashed.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+    Returns:
+        A generator that yields a (start, end, digest) tuple for each top-level value, in order,
+        where start and end are its positions within the data, and digest is its Ion hash `bytes`,
+        or the exception raised while hashing it.  If the data can't be traversed, the exception
+        is raised once the values preceding the error have been yielded.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    hasher = _BinaryHasher(buffer, hfp, catalog)
+    start = 0
+    end = None
+    if binary_range is not None:
+        start, end, symbol_tables = binary_range
+        hasher.restore_symbol_tables(symbol_tables)
+    return _hash_values_or_errors(hasher, start, end)
+
+
+def _hash_values_or_errors(hasher, start, end):
+    for pos, value_end, _ in hasher.values(start, end):
+        try:
+            digest = hasher.hash_value(pos)
+        except Exception as e:
+            digest = e
+        yield pos, value_end, digest
+
+
+@coroutine
+def hash_binary_reader(buffer, hash_function_provider, catalog=None):
+    """Provides a ``hash_reader`` over the given binary Ion data, for which skipping a container
+    does not require reading its contents event by event.
+
+    Events are read from the data by an ion-python binary reader, exactly as with
+    ``hash_reader(blocking_reader(managed_reader(binary_reader(), catalog), BytesIO(buffer)), ...)``.
+    When an amazon.ion.reader.SKIP_EVENT is received, however, the wrapped reader skips the
+    remainder of the current container without decoding it, and the skipped bytes are hashed
+    directly (as by ``hash_binary()``), producing the same hash as if the skipped values had
+    been read.
+
+    Args:
+        buffer:
+            A `bytes`-like object that contains binary Ion data, beginning with an Ion version marker.
+
+        hash_function_provider(function):
+            A function that returns a new ``IonHasher`` instance when called.
+
+            Note that multiple ``IonHasher`` instances may be required to hash a single value
+            (depending on the type of the Ion value).
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+    Yields:
+        bytes:
+            The result of hashing.
+
+        other values:
+            As defined by an ion-python reader coroutine.
+    """
+    data = bytes(buffer)
+    # the queue holds all of the data, so its position is the offset of the reader within the data
+    queue = BufferQueue()
+    queue.extend(data)
+    reader = blocking_reader(managed_reader(binary_reader(queue), catalog), BytesIO())
+    handler = _FastSkipHashReaderHandler(_BinaryHasher(data, hash_function_provider, catalog), queue)
+    return _hasher(handler, reader, hash_function_provider)
+
+
+class _FastSkipHashReaderHandler:
+    """Handles input to a hash_binary_reader coroutine; SKIP_EVENTs within containers are passed
+    to the wrapped reader, and the bytes it skips are hashed by a _BinaryHasher."""
+    def __init__(self, binary_hasher, queue):
+        self._binary_hasher = binary_hasher
+        self._queue = queue
+
+    def __call__(self, input, output, hasher, reader):
+        # top-level values may not be skipped by the wrapped reader
+        if input != SKIP_EVENT or not isinstance(output, IonEvent) \
+                or (output.event_type is not IonEventType.CONTAINER_START and output.depth == 0):
+            return _hash_reader_handler(input, output, hasher, reader)
+
+        start = self._queue.position
+        output = reader.send(SKIP_EVENT)
+        end = self._queue.position
+        self._binary_hasher.advance_to(start)
+        hasher.write_children(self._binary_hasher, start, end)
+        _hash_event(hasher, output)
+        return output
+
+
+# Type IDs (the high nibble of a type descriptor) of binary Ion
+_TID_NULL = 0x0
+_TID_BOOL = 0x1
+_TID_POS_INT = 0x2
+_TID_NEG_INT = 0x3
+_TID_FLOAT = 0x4
+_TID_DECIMAL = 0x5
+_TID_TIMESTAMP = 0x6
+_TID_SYMBOL = 0x7
+_TID_STRING = 0x8
+_TID_CLOB = 0x9
+_TID_BLOB = 0xA
+_TID_LIST = 0xB
+_TID_SEXP = 0xC
+_TID_STRUCT = 0xD
+_TID_ANNOTATION = 0xE
+
+_LN_LENGTH_FOLLOWS = 0xE
+_LN_NULL = 0xF
+
+_IVM = b'\xE0\x01\x00\xEA'
+
+_ION_TYPES = {
+    _TID_NULL: IonType.NULL,
+    _TID_BOOL: IonType.BOOL,
+    _TID_POS_INT: IonType.INT,
+    _TID_NEG_INT: IonType.INT,
+    _TID_FLOAT: IonType.FLOAT,
+    _TID_DECIMAL: IonType.DECIMAL,
+    _TID_TIMESTAMP: IonType.TIMESTAMP,
+    _TID_SYMBOL: IonType.SYMBOL,
+    _TID_STRING: IonType.STRING,
+    _TID_CLOB: IonType.CLOB,
+    _TID_BLOB: IonType.BLOB,
+    _TID_LIST: IonType.LIST,
+    _TID_SEXP: IonType.SEXP,
+    _TID_STRUCT: IonType.STRUCT,
+}
+
+# Precomputed B || TQ || E of each null.* type, and of values whose representation is empty
+_SERIALIZED_NULLS = {tid: bytes([_BEGIN_MARKER_BYTE, _TQ[ion_type] | 0x0F, _END_MARKER_BYTE])
+                     for (tid, ion_type) in _ION_TYPES.items()}
+_SERIALIZED_FALSE = bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.BOOL], _END_MARKER_BYTE])
+_SERIALIZED_TRUE = bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.BOOL] | 0x01, _END_MARKER_BYTE])
+_SERIALIZED_ZERO_INT = bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.INT], _END_MARKER_BYTE])
+_SERIALIZED_ZERO_DECIMAL = bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.DECIMAL], _END_MARKER_BYTE])
+
+# Precomputed B || TQ prefixes of scalars whose representation is copied from the binary Ion data
+_SCALAR_PREFIXES = {
+    _TID_POS_INT: bytes([_BEGIN_MARKER_BYTE, 0x20]),
+    _TID_NEG_INT: bytes([_BEGIN_MARKER_BYTE, 0x30]),
+    _TID_FLOAT: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.FLOAT]]),
+    _TID_STRING: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.STRING]]),
+    _TID_CLOB: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.CLOB]]),
+    _TID_BLOB: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.BLOB]]),
+}
+
+_CONTAINER_STARTS = {
+    _TID_LIST: _CONTAINER_START[IonType.LIST],
+    _TID_SEXP: _CONTAINER_START[IonType.SEXP],
+    _TID_STRUCT: _CONTAINER_START[IonType.STRUCT],
+}
+
+_ANNOTATED_VALUE_START = _BEGIN_MARKER + _TQ_ANNOTATED_VALUE
+
+# Representations longer than this are passed to the hash function separately from
+# their B || TQ prefix, rather than being concatenated with it
+_MAX_CONCATENATED_REPRESENTATION = 64
+
+
+def _read_var_uint(view, pos):
+    """Returns the value of the VarUInt at pos, and the position following it."""
+    value = 0
+    while True:
+        octet = view[pos]
+        pos += 1
+        value = (value << 7) | (octet & 0x7F)
+        if octet & 0x80:
+            return value, pos
+
+
+def _read_uint(view, start, end):
+    value = 0
+    for pos in range(start, end):
+        value = (value << 8) | view[pos]
+    return value
+
+
+def _read_type_descriptor(view, pos):
+    """Returns the type ID and length nibble of the value whose type descriptor is at pos,
+    followed by the start and end positions of the value's representation."""
+    octet = view[pos]
+    tid = octet >> 4
+    ln = octet & 0x0F
+    pos += 1
+    if ln == _LN_LENGTH_FOLLOWS or (tid == _TID_STRUCT and ln == 1):
+        length, pos = _read_var_uint(view, pos)
+    elif ln == _LN_NULL or tid == _TID_BOOL:
+        length = 0
+    else:
+        length = ln
+    return tid, ln, pos, pos + length
+
+
+def _is_nop_pad(view, pos):
+    octet = view[pos]
+    return octet >> 4 == _TID_NULL and octet & 0x0F != _LN_NULL
+
+
+def _var_uint(value):
+    """Returns the VarUInt encoding of value."""
+    octets = [0x80 | (value & 0x7F)]
+    value >>= 7
+    while value:
+        octets.append(value & 0x7F)
+        value >>= 7
+    return bytes(reversed(octets))
+
+
+def _type_descriptor(tid, length):
+    """Returns the type descriptor (including any length field) of a value whose representation
+    is length bytes long."""
+    if length < _LN_LENGTH_FOLLOWS and not (tid == _TID_STRUCT and length == 1):
+        return bytes([tid << 4 | length])
+    return bytes([tid << 4 | _LN_LENGTH_FOLLOWS]) + _var_uint(length)
+
+
+# The annotations of a local symbol table:  $ion_symbol_table (SID 3)
+_SYMBOL_TABLE_ANNOTATIONS = b'\x81\x83'
+
+
+def _symbol_table_prefix(view, local_symbol_tables):
+    """Returns an Ion version marker followed by the given local symbol tables (as recorded by a
+    _BinaryHasher), which together make current the symbol table they determine."""
+    parts = [_IVM]
+    for (start, end) in local_symbol_tables:
+        struct_descriptor = _type_descriptor(_TID_STRUCT, end - start)
+        wrapper_length = len(_SYMBOL_TABLE_ANNOTATIONS) + len(struct_descriptor) + end - start
+        parts += [_type_descriptor(_TID_ANNOTATION, wrapper_length), _SYMBOL_TABLE_ANNOTATIONS,
+                  struct_descriptor, view[start:end]]
+    return b''.join(parts)
+
+
+class _Frame:
+    """The traversal state of a container whose children are being hashed."""
+    __slots__ = ['tid', 'pos', 'end', 'hash_fn', 'annotated', 'field_hash_fn', 'field_hashes', 'in_field']
+
+    def __init__(self, tid, pos, end, hash_fn, annotated, field_hash_fn=None, field_hashes=None):
+        self.tid = tid
+        self.pos = pos
+        self.end = end
+        self.hash_fn = hash_fn
+        self.annotated = annotated
+        self.field_hash_fn = field_hash_fn
+        self.field_hashes = field_hashes
+        self.in_field = False
+
+
+class _BinaryHasher:
+    """Hashes the top-level values of a buffer of binary Ion data, tracking the local symbol
+    tables that the data declares."""
+    def __init__(self, buffer, hfp, catalog=None):
+        self._view = memoryview(buffer).cast('B')
+        # the buffer's find() method, which searches it in place, if it has one
+        self._find = buffer.find if type(buffer) in (bytes, bytearray, mmap) else None
+        self._hfp = hfp
+        self._catalog = SymbolTableCatalog() if catalog is None else catalog
+        # the hasher of the top-level values hashed by hash_value()
+        self._hash_fn = None
+        # hashers of structs that have been completely written, for reuse by subsequent structs
+        self._free_hashers = []
+        # the top-level values traversed by advance_to()
+        self._top_level = None
+        self._top_level_end = 0
+        # the (start, end) positions of the structs of the local symbol tables that determine the
+        # current symbol table, i.e. those declared since the last Ion version marker or local
+        # symbol table that didn't append to its predecessor
+        self._local_symbol_tables = ()
+        self._set_symbol_table(SYSTEM_SYMBOL_TABLE)
+
+    def _set_symbol_table(self, symbol_table):
+        self._symbol_table = symbol_table
+        # index 0 corresponds to $0, whose text is always unknown
+        self._symbol_texts = [None] + [token.text for token in symbol_table]
+        self._serialized_symbols = {0: _write_symbol(None)}
+
+    def _symbol_text(self, sid):
+        if sid >= len(self._symbol_texts):
+            raise Exception("Out of range SID: %d" % sid)
+        return self._symbol_texts[sid]
+
+    def _serialized_symbol(self, sid):
+        """Returns s(symbol) for the given sid."""
+        serialized = self._serialized_symbols.get(sid)
+        if serialized is None:
+            text = self._symbol_text(sid)
+            if text is None:
+                raise Exception("Unable to hash a symbol with unknown text (sid %d)" % sid)
+            serialized = _write_symbol(text)
+            self._serialized_symbols[sid] = serialized
+        return serialized
+
+    def values(self, start=0, end=None):
+        """Yields the start position, end position and local symbol tables of each top-level value
+        between start (which must be the position of a top-level value) and end (by default, the
+        end of the data), processing the system values that precede it.
+
+        The local symbol tables are a tuple of the (start, end) positions of the structs of those
+        that determine the value's symbol table (see restore_symbol_tables() and _RecordWriter);
+        consecutive values with the same local symbol tables are given the same tuple."""
+        for pos, value_end in self._top_level_values(start, end):
+            yield pos, value_end, self._local_symbol_tables
+
+    def hash_value(self, pos):
+        """Returns the Ion hash of the top-level value at pos, which must be the value most recently
+        yielded by values()."""
+        hash_fn = self._hash_fn
+        if hash_fn is None:
+            hash_fn = self._hfp()
+            self._hash_fn = hash_fn
+        try:
+            self._write_value(pos, hash_fn)
+        except Exception:
+            # the hash function may have been given part of the value's serialization
+            self._hash_fn = None
+            raise
+        return hash_fn.digest()
+
+    def hash_values(self, start=0, end=None):
+        """Yields the start position, end position, Ion hash and local symbol tables of each
+        top-level value between start and end;  see values()."""
+        for pos, value_end, local_symbol_tables in self.values(start, end):
+            yield pos, value_end, self.hash_value(pos), local_symbol_tables
+
+    def ranges(self, chunk_size):
+        """Yields (start, end, local symbol tables) for consecutive ranges of top-level values,
+        each of which spans approximately chunk_size bytes."""
+        start = None
+        try:
+            for pos, end, local_symbol_tables in self.values():
+                if start is None:
+                    start = pos
+                    symbol_tables = local_symbol_tables
+                if end - start >= chunk_size:
+                    yield start, end, symbol_tables
+                    start = None
+        except Exception:
+            # the values preceding the one that couldn't be traversed may still be hashed
+            if start is not None:
+                yield start, end, symbol_tables
+            raise
+        if start is not None:
+            yield start, end, symbol_tables
+
+    def restore_symbol_tables(self, local_symbol_tables):
+        """Makes current the symbol table determined by the given local symbol tables, as
+        recorded by ranges()."""
+        self._local_symbol_tables = ()
+        self._set_symbol_table(SYSTEM_SYMBOL_TABLE)
+        for (start, end) in local_symbol_tables:
+            self._read_local_symbol_table(start, end)
+
+    def advance_to(self, pos):
+        """Processes the system values (Ion version markers and local symbol tables) that precede
+        the top-level value whose representation includes pos (which may be the position following
+        the last child of a container);  positions must not decrease from call to call."""
+        if self._top_level is None:
+            self._top_level = self._top_level_values()
+        while self._top_level_end < pos:
+            self._top_level_end = next(self._top_level)[1]
+
+    def write_elements(self, start, end, hash_fn):
+        """Writes s(value) to hash_fn for each of the values between start and end, which are
+        elements of a list or sexp."""
+        view = self._view
+        pos = start
+        while pos < end:
+            if _is_nop_pad(view, pos):
+                pos = _read_type_descriptor(view, pos)[3]
+            else:
+                pos = self._write_value(pos, hash_fn)
+
+    def field_hashes(self, start, end, hash_fn):
+        """Yields H(field), computed using hash_fn, for each of the struct fields between start and end."""
+        view = self._view
+        pos = start
+        while pos < end:
+            sid, pos = _read_var_uint(view, pos)
+            if _is_nop_pad(view, pos):
+                pos = _read_type_descriptor(view, pos)[3]
+            else:
+                hash_fn.update(self._serialized_symbol(sid))
+                pos = self._write_value(pos, hash_fn)
+                yield hash_fn.digest()
+
+    def _top_level_values(self, pos=0, limit=None):
+        """Yields the start and end positions of each top-level value other than system values
+        between pos and limit (by default, the end of the data), processing the system values as
+        they are encountered."""
+        view = self._view
+        if limit is None:
+            limit = len(view)
+        while pos < limit:
+            if view[pos:pos + len(_IVM)] == _IVM:
+                self._local_symbol_tables = ()
+                self._set_symbol_table(SYSTEM_SYMBOL_TABLE)
+                pos += len(_IVM)
+                continue
+
+            tid, ln, start, end = _read_type_descriptor(view, pos)
+            if tid == _TID_NULL and ln != _LN_NULL:
+                pos = end
+                continue
+            if self._is_system_value(tid, ln, start, end):
+                pos = end
+                continue
+
+            yield pos, end
+            pos = end
+
+    def _is_system_value(self, tid, ln, start, end):
+        """Returns True if the top-level value is a local symbol table (which is processed)
+        or an unannotated $ion_1_0 symbol (which is a no-op)."""
+        view = self._view
+        if tid == _TID_SYMBOL and ln != _LN_NULL:
+            return self._symbol_text(_read_uint(view, start, end)) == TEXT_ION_1_0
+        if tid == _TID_ANNOTATION:
+            annotations_length, pos = _read_var_uint(view, start)
+            first_annotation, _ = _read_var_uint(view, pos)
+            value_tid, value_ln, value_start, value_end = _read_type_descriptor(view, pos + annotations_length)
+            if value_tid == _TID_STRUCT and value_ln != _LN_NULL \
+                    and self._symbol_text(first_annotation) == TEXT_ION_SYMBOL_TABLE:
+                self._read_local_symbol_table(value_start, value_end)
+                return True
+        return False
+
+    def _fields(self, start, end):
+        """Yields the field name text, type ID, length nibble, and representation start/end of each
+        field of the struct whose representation is between start and end."""
+        view = self._view
+        pos = start
+        while pos < end:
+            sid, pos = _read_var_uint(view, pos)
+            tid, ln, value_start, pos = _read_type_descriptor(view, pos)
+            if tid == _TID_ANNOTATION:
+                # annotations on symbol table fields are ignored
+                annotations_length, value_pos = _read_var_uint(view, value_start)
+                tid, ln, value_start, _ = _read_type_descriptor(view, value_pos + annotations_length)
+            if tid != _TID_NULL:
+                yield self._symbol_text(sid), tid, ln, value_start, pos
+
+    def _elements(self, start, end):
+        """Yields the type ID, length nibble, and representation start/end of each element
+        of the sequence whose representation is between start and end."""
+        view = self._view
+        pos = start
+        while pos < end:
+            tid, ln, value_start, pos = _read_type_descriptor(view, pos)
+            if tid == _TID_ANNOTATION:
+                annotations_length, value_pos = _read_var_uint(view, value_start)
+                tid, ln, value_start, _ = _read_type_descriptor(view, value_pos + annotations_length)
+            if tid != _TID_NULL:
+                yield tid, ln, value_start, pos
+
+    def _read_local_symbol_table(self, start, end):
+        """Replaces the current symbol table with the local symbol table whose struct representation
+        is between start and end, following the same rules as ion-python's managed reader."""
+        view = self._view
+        symbols = []
+        imports = None
+        appends = False
+        for (field_name, tid, ln, value_start, value_end) in self._fields(start, end):
+            if ln == _LN_NULL:
+                continue
+            if field_name == TEXT_SYMBOLS and tid == _TID_LIST:
+                for (element_tid, element_ln, element_start, element_end) in self._elements(value_start, value_end):
+                    if element_tid == _TID_STRING:
+                        symbols.append(None if element_ln == _LN_NULL
+                                       else str(view[element_start:element_end], 'utf-8'))
+            elif field_name == TEXT_IMPORTS and tid == _TID_LIST:
+                imports = []
+                appends = False
+                for (element_tid, element_ln, element_start, element_end) in self._elements(value_start, value_end):
+                    if element_tid == _TID_STRUCT and element_ln != _LN_NULL:
+                        self._read_import(imports, element_start, element_end)
+            elif field_name == TEXT_IMPORTS and tid == _TID_SYMBOL \
+                    and self._symbol_text(_read_uint(view, value_start, value_end)) == TEXT_ION_SYMBOL_TABLE:
+                if self._symbol_table.table_type.is_system:
+                    imports = None
+                    appends = False
+                else:
+                    imports = [self._symbol_table]
+                    appends = True
+        if appends:
+            self._local_symbol_tables += ((start, end),)
+        else:
+            self._local_symbol_tables = ((start, end),)
+        self._set_symbol_table(SymbolTable(LOCAL_TABLE_TYPE, symbols, imports=imports))
+
+    def _read_import(self, imports, start, end):
+        view = self._view
+        name = None
+        version = 1
+        max_id = None
+        for (field_name, tid, ln, value_start, value_end) in self._fields(start, end):
+            if ln == _LN_NULL:
+                continue
+            if field_name == TEXT_NAME and tid == _TID_STRING:
+                name = str(view[value_start:value_end], 'utf-8')
+            elif field_name == TEXT_VERSION and tid == _TID_POS_INT:
+                version = _read_uint(view, value_start, value_end)
+            elif field_name == TEXT_MAX_ID and tid == _TID_POS_INT:
+                max_id = _read_uint(view, value_start, value_end)
+        if name is not None:
+            imports.append(self._catalog.resolve(name, version, max_id))
+
+    # Writes s(value) to hash_fn for the value whose type descriptor is at pos, and returns the
+    # position following the value.
+    #
+    # As in fast_value_hasher, the value is traversed with an explicit stack of _Frames.
+    def _write_value(self, pos, hash_fn):
+        view = self._view
+        free_hashers = self._free_hashers
+        stack = []
+        value_end = None
+        while True:
+            tid, ln, start, end = _read_type_descriptor(view, pos)
+            if value_end is None:
+                value_end = end
+
+            annotated = tid == _TID_ANNOTATION
+            if annotated:
+                annotations_length, annotations_pos = _read_var_uint(view, start)
+                annotations_end = annotations_pos + annotations_length
+                serialized_annotations = [_ANNOTATED_VALUE_START]
+                while annotations_pos < annotations_end:
+                    sid, annotations_pos = _read_var_uint(view, annotations_pos)
+                    serialized_annotations.append(self._serialized_symbol(sid))
+                hash_fn.update(b''.join(serialized_annotations))
+                tid, ln, start, end = _read_type_descriptor(view, annotations_end)
+
+            if tid in _CONTAINER_STARTS and ln != _LN_NULL:
+                hash_fn.update(_CONTAINER_STARTS[tid])
+                if tid == _TID_STRUCT:
+                    # a single hasher is reused for every field, as digest() resets it
+                    field_hash_fn = free_hashers.pop() if free_hashers else self._hfp()
+                    stack.append(_Frame(tid, start, end, hash_fn, annotated, field_hash_fn, []))
+                else:
+                    stack.append(_Frame(tid, start, end, hash_fn, annotated))
+            else:
+                self._write_scalar(hash_fn, tid, ln, start, end)
+                if annotated:
+                    hash_fn.update(_END_MARKER)
+
+            # find the next value to hash, closing any containers that have been exhausted
+            while stack:
+                frame = stack[-1]
+                field_hashes = frame.field_hashes
+                if frame.in_field:
+                    field_hashes.append(frame.field_hash_fn.digest())
+                    frame.in_field = False
+
+                pos = frame.pos
+                if field_hashes is None:
+                    while pos < frame.end and _is_nop_pad(view, pos):
+                        pos = _read_type_descriptor(view, pos)[3]
+                else:
+                    while pos < frame.end:
+                        sid, value_pos = _read_var_uint(view, pos)
+                        if not _is_nop_pad(view, value_pos):
+                            break
+                        pos = _read_type_descriptor(view, value_pos)[3]
+
+                if pos >= frame.end:
+                    stack.pop()
+                    if field_hashes is None:
+                        end_bytes = _END_MARKER
+                    elif type(frame.hash_fn) is _MultiHash:
+                        frame.hash_fn.update_field_hashes(field_hashes)
+                        end_bytes = _END_MARKER
+                        free_hashers.append(frame.field_hash_fn)
+                    else:
+                        _sort_field_hashes(field_hashes)
+                        end_bytes = _escape(b''.join(field_hashes)) + _END_MARKER
+                        free_hashers.append(frame.field_hash_fn)
+                    frame.hash_fn.update(end_bytes + _END_MARKER if frame.annotated else end_bytes)
+                elif field_hashes is None:
+                    hash_fn = frame.hash_fn
+                    frame.pos = _read_type_descriptor(view, pos)[3]
+                    break
+                else:
+                    hash_fn = frame.field_hash_fn
+                    hash_fn.update(self._serialized_symbol(sid))
+                    frame.in_field = True
+                    pos = value_pos
+                    frame.pos = _read_type_descriptor(view, pos)[3]
+                    break
+            else:
+                return value_end
+
+    def _write_scalar(self, hash_fn, tid, ln, start, end):
+        """Writes s(scalar) to hash_fn for the scalar (or null) with the given type descriptor."""
+        view = self._view
+        if ln == _LN_NULL:
+            hash_fn.update(_SERIALIZED_NULLS[tid])
+        elif tid == _TID_BOOL:
+            hash_fn.update(_SERIALIZED_TRUE if ln else _SERIALIZED_FALSE)
+        elif tid == _TID_POS_INT or tid == _TID_NEG_INT:
+            # the representation is the minimal big-endian magnitude
+            while start < end and view[start] == 0:
+                start += 1
+            if start == end:
+                hash_fn.update(_SERIALIZED_ZERO_INT)
+            else:
+                self._write_representation(hash_fn, _SCALAR_PREFIXES[tid], start, end)
+        elif tid == _TID_FLOAT:
+            if end - start == 8:
+                value = unpack_from('>d', view, start)[0]
+                # NaNs are canonicalized and positive zero has an empty representation
+                if value == value and (value != 0 or view[start] & 0x80):
+                    self._write_representation(hash_fn, _SCALAR_PREFIXES[tid], start, end)
+                    return
+            elif end - start == 4:
+                value = unpack_from('>f', view, start)[0]
+            else:
+                value = 0.0
+            hash_fn.update(_s_scalar(value, IonType.FLOAT, False))
+        elif tid == _TID_DECIMAL:
+            if start == end:
+                hash_fn.update(_SERIALIZED_ZERO_DECIMAL)
+            else:
+                hash_fn.update(_s_scalar(_decimal_factory(bytes(view[start:end]))(), IonType.DECIMAL, False))
+        elif tid == _TID_TIMESTAMP:
+            hash_fn.update(_s_scalar(_timestamp_factory(bytes(view[start:end]))(), IonType.TIMESTAMP, False))
+        elif tid == _TID_SYMBOL:
+            hash_fn.update(self._serialized_symbol(_read_uint(view, start, end)))
+        elif tid in _SCALAR_PREFIXES:
+            self._write_representation(hash_fn, _SCALAR_PREFIXES[tid], start, end)
+        else:
+            raise Exception("Invalid type descriptor: 0x%02X" % view[start - 1])
+
+    def _is_escape_free(self, start, end):
+        """Returns True if the buffer can be searched in place, and contains no bytes that need
+        escaping between start and end."""
+        find = self._find
+        return find is not None and find(_ESCAPE_MARKER, start, end) < 0 \
+            and find(_BEGIN_MARKER, start, end) < 0 and find(_END_MARKER, start, end) < 0
+
+    def _write_representation(self, hash_fn, prefix, start, end):
+        """Writes B || TQ || escape(representation) || E to hash_fn, where the representation
+        is the slice of the buffer between start and end."""
+        if end - start > _MAX_CONCATENATED_REPRESENTATION and self._is_escape_free(start, end):
+            # the representation is passed to hash_fn without being copied
+            hash_fn.update(prefix)
+            hash_fn.update(self._view[start:end])
+            hash_fn.update(_END_MARKER)
+            return
+        if end - start > _CHUNK_SIZE:
+            hash_fn.update(prefix)
+            _update_escaped(hash_fn.update, self._view[start:end])
+            hash_fn.update(_END_MARKER)
+            return
+        representation = _escape(self._view[start:end])
+        if len(representation) <= _MAX_CONCATENATED_REPRESENTATION:
+            hash_fn.update(b''.join([prefix, representation, _END_MARKER]))
+        else:
+            hash_fn.update(prefix)
+            hash_fn.update(representation)
+            hash_fn.update(_END_MARKER)
+
+
+class _RecordWriter:
+    """Writes top-level values of binary Ion data to a file as they are, without decoding them,
+    preceded by the local symbol tables needed to read them whenever those change.  Writes are
+    buffered, and passed to the file in blocks of approximately buffer_size bytes."""
+    def __init__(self, out, buffer_size=1 << 20):
+        self._out = out
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._local_symbol_tables = None
+
+    def write(self, view, start, end, local_symbol_tables):
+        """Writes the value between start and end of view, whose local symbol tables (as recorded
+        by a _BinaryHasher over view) are given;  all of the values written must be of the same data."""
+        buffer = self._buffer
+        if local_symbol_tables != self._local_symbol_tables:
+            buffer += _symbol_table_prefix(view, local_symbol_tables)
+            self._local_symbol_tables = local_symbol_tables
+        buffer += view[start:end]
+        if len(buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Passes any buffered bytes to the file."""
+        if self._buffer:
+            self._out.write(self._buffer)
+            self._buffer = bytearray()
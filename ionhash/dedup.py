@@ -0,0 +1,246 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Removes the values of an Ion stream whose Ion hash is that of a preceding value, keeping the
+digests seen in a DigestStore, whose memory use is bounded regardless of the number of digests."""
+
+from itertools import tee
+from math import ceil, log
+import sqlite3
+
+from ionhash.binary_hasher import _BinaryHasher, _RecordWriter
+from ionhash.fast_value_hasher import hash_values
+from ionhash.hasher import _resolve_hash_function_provider
+
+
+# The maximum number of new digests held in memory before they are inserted into the database
+_DEFAULT_BATCH_SIZE = 10000
+
+# The size of SQLite's page cache, in KiB
+_CACHE_SIZE = 64 * 1024
+
+
+class DigestStore:
+    """A set of digests, kept in a SQLite database (in a file, or in memory), optionally
+    preceded by a Bloom filter.
+
+    Each digest occupies little more than its own size in the database, and only the database's
+    page cache (64 MiB) and a batch of recently added digests are held in memory, so a store in a
+    file may hold many more digests than would fit in memory.  The Bloom filter, if any, holds
+    approximately 10 bits per expected digest (for a false positive rate of 1%), and avoids
+    searching the database for a digest that certainly hasn't been added;  only those that may
+    have been (including the filter's false positives) are searched for.
+
+    Args:
+        path:
+            The path of the database file, which is created if it doesn't exist;  digests already
+            in it are considered to have been added.  If None, the database is held in memory.
+
+        expected_count:
+            The number of digests the store is expected to hold;  if specified, a Bloom filter
+            sized for that number of digests and false_positive_rate precedes the database.
+
+        false_positive_rate:
+            The Bloom filter's false positive rate when it holds expected_count digests.
+
+        batch_size:
+            The maximum number of digests added to the store before they are inserted into
+            the database.
+    """
+    def __init__(self, path=None, expected_count=None, false_positive_rate=0.01, batch_size=_DEFAULT_BATCH_SIZE):
+        self._connection = sqlite3.connect(':memory:' if path is None else path)
+        self._connection.execute('PRAGMA cache_size = -%d' % _CACHE_SIZE)
+        self._connection.execute('PRAGMA synchronous = OFF')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS digests (digest BLOB PRIMARY KEY) WITHOUT ROWID')
+        self._batch_size = batch_size
+        # digests added, but not yet inserted into the database
+        self._pending = set()
+        self._bloom_filter = None
+        if expected_count is not None:
+            self._bloom_filter = _BloomFilter(expected_count, false_positive_rate)
+            for (digest,) in self._connection.execute('SELECT digest FROM digests'):
+                self._bloom_filter.add(digest)
+        self._added = 0
+        self._duplicates = 0
+        self._bloom_filter_positives = 0
+
+    def add(self, digest):
+        """Adds the given digest to the store, returning True if it wasn't already in it."""
+        bloom_filter = self._bloom_filter
+        # unless the Bloom filter reports otherwise, the digest may have been added
+        if bloom_filter is None or bloom_filter.add(digest):
+            if bloom_filter is not None:
+                self._bloom_filter_positives += 1
+            if digest in self._pending or self._connection.execute(
+                    'SELECT 1 FROM digests WHERE digest = ?', (digest,)).fetchone() is not None:
+                self._duplicates += 1
+                return False
+        self._added += 1
+        self._pending.add(digest)
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Inserts the digests added since the last flush into the database, and commits them."""
+        if self._pending:
+            self._connection.executemany('INSERT OR IGNORE INTO digests VALUES (?)',
+                                         ((digest,) for digest in self._pending))
+            self._connection.commit()
+            self._pending = set()
+
+    def close(self):
+        """Flushes the store and closes its database."""
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def statistics(self):
+        """Returns a dict of the number of digests added to the store (and not already in it), the
+        number of duplicates (that were), and, if the store has a Bloom filter, the number of
+        digests it reported as possibly added, how many of those were false positives, and the
+        fraction of the digests not already in the store that were false positives."""
+        statistics = {
+            'added': self._added,
+            'duplicates': self._duplicates,
+        }
+        if self._bloom_filter is not None:
+            false_positives = self._bloom_filter_positives - self._duplicates
+            statistics['bloom_filter_positives'] = self._bloom_filter_positives
+            statistics['bloom_filter_false_positives'] = false_positives
+            statistics['bloom_filter_false_positive_rate'] = false_positives / max(self._added, 1)
+        return statistics
+
+
+class _BloomFilter:
+    """A Bloom filter of digests, which are assumed to be uniformly distributed, so the positions
+    of each digest's bits are derived from the digest itself (by double hashing)."""
+    def __init__(self, expected_count, false_positive_rate):
+        expected_count = max(expected_count, 1)
+        self._size = max(64, ceil(-expected_count * log(false_positive_rate) / log(2) ** 2))
+        self._hash_count = max(1, round(self._size / expected_count * log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def add(self, digest):
+        """Adds the given digest, returning True if it may have been added already."""
+        value = int.from_bytes(digest[:16], 'little')
+        position = value & 0xFFFFFFFFFFFFFFFF
+        step = (value >> 64) | 1
+        size = self._size
+        bits = self._bits
+        present = True
+        for _ in range(self._hash_count):
+            position %= size
+            mask = 1 << (position & 7)
+            octet = bits[position >> 3]
+            if not octet & mask:
+                present = False
+                bits[position >> 3] = octet | mask
+            position += step
+        return present
+
+
+def dedup_values(values, algorithm=None, hash_function_provider=None, store=None):
+    """Given an iterable of simpleion values and an algorithm or hash_function_provider, yields
+    each value whose Ion hash is not that of a preceding value.
+
+    Args:
+        values:
+            An iterable of simpleion values.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+        store:
+            An optional ``DigestStore`` that holds the digests of the values seen;  values whose
+            digests it already holds are also removed.  If None, an in-memory ``DigestStore``
+            is used.
+
+    Returns:
+        A generator that yields the values that are not duplicates, in order.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    return _dedup_values(values, hfp, store)
+
+
+def _dedup_values(values, hfp, store):
+    if store is None:
+        with DigestStore() as store:
+            yield from _dedup_values(values, hfp, store)
+        return
+
+    values, to_hash = tee(values)
+    for value, digest in zip(values, hash_values(to_hash, hfp)):
+        if store.add(digest):
+            yield value
+
+
+def dedup_binary(buffer, out, algorithm=None, hash_function_provider=None, catalog=None, store=None):
+    """Given binary Ion data, a binary file and an algorithm or hash_function_provider, writes
+    to the file each top-level value of the data whose Ion hash is not that of a preceding value.
+
+    The values are written as binary Ion, as they are in the data (without being decoded and
+    re-encoded), along with the local symbol tables needed to read them.
+
+    Args:
+        buffer:
+            A `bytes`-like object (such as an `mmap`) that contains binary Ion data, beginning
+            with an Ion version marker.
+
+        out:
+            A binary file (or other object with a `write()` method that accepts `bytes`) to
+            which the values that are not duplicates are written.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+        store:
+            An optional ``DigestStore`` that holds the digests of the values seen;  values whose
+            digests it already holds are also removed.  If None, an in-memory ``DigestStore``
+            is used.
+
+    Returns:
+        The number of values written.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    if store is None:
+        with DigestStore() as store:
+            return dedup_binary(buffer, out, hash_function_provider=hfp, catalog=catalog, store=store)
+
+    view = memoryview(buffer).cast('B')
+    writer = _RecordWriter(out)
+    count = 0
+    for start, end, digest, local_symbol_tables in _BinaryHasher(buffer, hfp, catalog).hash_values():
+        if store.add(digest):
+            writer.write(view, start, end, local_symbol_tables)
+            count += 1
+    writer.flush()
+    return count
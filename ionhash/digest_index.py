@@ -0,0 +1,254 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Incrementally hashes binary Ion data, using a sidecar index file of the digests computed
+by a previous run.
+
+The index records the offset, length, fingerprint and Ion hash of each top-level value.  A
+value's fingerprint is a BLAKE2b digest of its bytes, keyed by a digest of the local symbol
+tables in effect for it, so a value whose bytes are unchanged but whose symbols now have
+different text is not mistaken for an unchanged value.  When the data is hashed again, a value
+whose fingerprint is in the index is not hashed;  its digest is read from the index.
+
+Index file format (integers are big-endian):
+
+  magic (8 bytes) || digest size (uint16) || identifier length (uint16) || identifier (UTF-8)
+  followed by an entry per top-level value:
+  offset (uint64) || length (uint64) || fingerprint (16 bytes) || digest (digest size bytes)
+"""
+
+from collections import deque
+from hashlib import blake2b
+import os
+from struct import Struct
+
+from ionhash.binary_hasher import _BinaryHasher
+from ionhash.hasher import _resolve_hash_function_provider
+
+
+_MAGIC = b'IONHIDX1'
+_HEADER = Struct('>8sHH')
+_FINGERPRINT_SIZE = 16
+
+# The number of entries of the previous index ahead of the last match that are searched for each
+# value;  values that have moved further than this are hashed again
+_MATCH_WINDOW = 4096
+
+# The number of entries read from, or written to, the index file at a time
+_ENTRIES_PER_BLOCK = 4096
+
+
+def hash_binary_indexed(buffer, index_file, algorithm=None, hash_function_provider=None, catalog=None):
+    """Given binary Ion data, the path of an index file, and an algorithm or hash_function_provider,
+    computes the Ion hash of each top-level value in the data, reusing the digests recorded in
+    the index file for values that are unchanged, and then rewrites the index file.
+
+    A value is unchanged if its bytes, and those of the local symbol tables in effect for it, are
+    those of a value recorded in the index at about the same position in the sequence of values
+    (values inserted, removed or modified elsewhere don't prevent reuse).  If the index file
+    doesn't exist, or was written for a different algorithm, all of the values are hashed.
+
+    The index is replaced only once every value has been hashed.
+
+    Args:
+        buffer:
+            A `bytes`-like object (such as an `mmap`) that contains binary Ion data, beginning
+            with an Ion version marker.
+
+        index_file:
+            The path of the index file.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.  As the index can't
+            identify it, the caller must ensure that an index file is only used with the same
+            hash_function_provider.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables;  as the index records only the names and versions of
+            imported tables, it must resolve them to the same tables from run to run.
+
+    Returns:
+        A list containing the Ion hash `bytes` of each top-level value in the data.
+    """
+    return [digest for (start, end, digest, reused)
+            in hash_binary_indexed_values(buffer, index_file, algorithm, hash_function_provider, catalog)]
+
+
+def hash_binary_indexed_values(buffer, index_file, algorithm=None, hash_function_provider=None, catalog=None):
+    """Like ``hash_binary_indexed()``, but yields the digests one at a time, along with the
+    position of each value and whether its digest was read from the index.
+
+    Args:
+        buffer:
+            A `bytes`-like object (such as an `mmap`) that contains binary Ion data, beginning
+            with an Ion version marker.
+
+        index_file:
+            The path of the index file.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called;  see
+            ``hash_binary_indexed()``.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables;  see ``hash_binary_indexed()``.
+
+    Returns:
+        A generator that yields a (start, end, digest, reused) tuple for each top-level value in
+        the data, in order, where start and end are its positions within the data, digest is its
+        Ion hash `bytes`, and reused is True if the digest was read from the index.  The index file
+        is rewritten once every value has been yielded.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    return _hash_values_indexed(buffer, index_file, hfp, algorithm or '', catalog)
+
+
+def _hash_values_indexed(buffer, index_file, hfp, identifier, catalog):
+    digest_size = len(_checked_digest(hfp().digest(), None))
+    entry = _entry_struct(digest_size)
+    hasher = _BinaryHasher(buffer, hfp, catalog)
+    view = memoryview(buffer).cast('B')
+    symbol_tables = None
+    context = None
+    temp_file = index_file + '.tmp'
+    with _open_index(index_file, identifier, digest_size) as previous, open(temp_file, 'wb') as out:
+        try:
+            matcher = _IndexMatcher(previous, entry)
+            identifier_bytes = identifier.encode('utf-8')
+            out.write(_HEADER.pack(_MAGIC, digest_size, len(identifier_bytes)) + identifier_bytes)
+            block = []
+            for pos, end, local_symbol_tables in hasher.values():
+                if local_symbol_tables is not symbol_tables:
+                    symbol_tables = local_symbol_tables
+                    context = blake2b(b''.join(view[table_start:table_end]
+                                               for (table_start, table_end) in symbol_tables)).digest()
+                fingerprint = blake2b(view[pos:end], digest_size=_FINGERPRINT_SIZE, key=context).digest()
+                digest = matcher.match(fingerprint)
+                reused = digest is not None
+                if not reused:
+                    digest = _checked_digest(hasher.hash_value(pos), digest_size)
+                block.append(entry.pack(pos, end - pos, fingerprint, digest))
+                if len(block) == _ENTRIES_PER_BLOCK:
+                    out.write(b''.join(block))
+                    block = []
+                yield pos, end, digest, reused
+            out.write(b''.join(block))
+        except BaseException:
+            out.close()
+            os.remove(temp_file)
+            raise
+    os.replace(temp_file, index_file)
+
+
+def _checked_digest(digest, digest_size):
+    if not isinstance(digest, bytes) or (digest_size is not None and len(digest) != digest_size):
+        raise Exception("Only hash functions whose digests are bytes of a fixed size may be indexed")
+    return digest
+
+
+def _entry_struct(digest_size):
+    return Struct('>QQ%ds%ds' % (_FINGERPRINT_SIZE, digest_size))
+
+
+class _NoIndex:
+    """Stands in for an index file that doesn't exist, or can't be used."""
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+def _open_index(index_file, identifier, digest_size):
+    """Returns the given index file, open and positioned at its first entry, or a _NoIndex if
+    it doesn't exist or was written for a different identifier or digest size."""
+    try:
+        f = open(index_file, 'rb')
+    except FileNotFoundError:
+        return _NoIndex()
+    header = f.read(_HEADER.size)
+    if len(header) == _HEADER.size:
+        magic, index_digest_size, identifier_length = _HEADER.unpack(header)
+        if magic == _MAGIC and index_digest_size == digest_size \
+                and f.read(identifier_length) == identifier.encode('utf-8'):
+            return f
+    f.close()
+    return _NoIndex()
+
+
+def _read_entries(f, entry):
+    """Yields the fingerprint and digest of each entry of the open index file."""
+    while True:
+        block = f.read(entry.size * _ENTRIES_PER_BLOCK)
+        block = block[:len(block) - len(block) % entry.size]
+        if not block:
+            return
+        for (offset, length, fingerprint, digest) in entry.iter_unpack(block):
+            yield fingerprint, digest
+
+
+class _IndexMatcher:
+    """Finds the digests of fingerprints among a window of the entries of a previous index that
+    follow the last entry matched."""
+    def __init__(self, f, entry):
+        self._entries = iter(()) if f is None else _read_entries(f, entry)
+        # the (fingerprint, digest) of each of the window's entries, in order
+        self._pending = deque()
+        # the number of the window's entries of each fingerprint
+        self._counts = {}
+        for _ in range(_MATCH_WINDOW):
+            if not self._read_entry():
+                break
+
+    def _read_entry(self):
+        """Adds the next entry of the index to the window;  returns False if there are no more."""
+        entry = next(self._entries, None)
+        if entry is None:
+            return False
+        self._pending.append(entry)
+        fingerprint = entry[0]
+        self._counts[fingerprint] = self._counts.get(fingerprint, 0) + 1
+        return True
+
+    def _pop_entry(self):
+        """Removes the first entry of the window, returning its (fingerprint, digest)."""
+        entry = self._pending.popleft()
+        fingerprint = entry[0]
+        count = self._counts[fingerprint] - 1
+        if count:
+            self._counts[fingerprint] = count
+        else:
+            del self._counts[fingerprint]
+        self._read_entry()
+        return entry
+
+    def match(self, fingerprint):
+        """Returns the digest of the given fingerprint, or None if it isn't in the window;  if
+        it is, the window is advanced past its first entry of the fingerprint."""
+        if fingerprint not in self._counts:
+            return None
+        # usually, the first entry
+        entry = self._pop_entry()
+        while entry[0] != fingerprint:
+            entry = self._pop_entry()
+        return entry[1]
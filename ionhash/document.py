@@ -0,0 +1,273 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Maintains the Ion hash of a simpleion value as it is modified, without re-hashing the entire value."""
+
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyNull
+
+from ionhash.fast_value_hasher import _s_scalar, _write_symbol, _CONTAINER_START
+from ionhash.hasher import _resolve_hash_function_provider, _sort_field_hashes, _escape, \
+    _BEGIN_MARKER, _END_MARKER, _TQ_ANNOTATED_VALUE, _MultiHash
+
+
+class HashedDocument:
+    """A simpleion value together with a tree of the digests from which its Ion hash is computed,
+    allowing the Ion hash to be updated as parts of the value are set, deleted, or appended.
+
+    The digest of each field of each struct is retained, so modifying a value only re-hashes the
+    modified field of each struct that encloses it, and re-sorts the field digests of those
+    structs.  As the Ion hash of a list or sexp is computed over the serialized representations
+    of its elements (rather than over their digests), lists and sexps that enclose a modification
+    are re-hashed in full, but without re-hashing the structs within them.
+
+    The value must only be modified through the methods of this class.
+
+    Paths are sequences of struct field names (`str`) and list/sexp indexes (`int`), identifying
+    a value relative to the root value;  where a struct has multiple fields with the same name,
+    a path refers to the last of them (as does ``IonPyDict.__getitem__``).
+
+    Args:
+        value:
+            The simpleion value to hash.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+    """
+    def __init__(self, value, algorithm=None, hash_function_provider=None):
+        self._hash_fn = _resolve_hash_function_provider(algorithm, hash_function_provider)()
+        if type(self._hash_fn) is _MultiHash:
+            # the serialized bodies of structs, which are retained, differ per hash function
+            raise Exception("HashedDocument does not support hash functions from multi_hash_function_provider()")
+        self._root = self._build(value)
+        self._digest = None
+
+    @property
+    def value(self):
+        """The simpleion value."""
+        return self._root.value
+
+    @property
+    def digest(self):
+        """`bytes` that represent the Ion hash of the value."""
+        if self._digest is None:
+            self._write(self._root, self._hash_fn)
+            self._digest = self._hash_fn.digest()
+        return self._digest
+
+    def set(self, path, value):
+        """Sets the value at the given path; an empty path replaces the root value.
+
+        Setting a struct field replaces all fields of the struct with the same name, and setting a
+        list or sexp element replaces the element at the given index.
+        """
+        if len(path) == 0:
+            self._root = self._build(value)
+            self._digest = None
+            return
+        ancestors, node, key = self._resolve_parent(path)
+        new_node = self._build(value)
+        if node.fields is not None:
+            node.value[key] = value
+            node.fields = [field for field in node.fields if field.name != key]
+            node.fields.append(self._field(key, new_node))
+        else:
+            node.value[key] = value
+            node.elements[key] = new_node
+        self._update(ancestors, node)
+
+    def delete(self, path):
+        """Deletes the value at the given (non-empty) path.
+
+        Deleting a struct field deletes all fields of the struct with the same name.
+        """
+        if len(path) == 0:
+            raise Exception("Unable to delete the root value")
+        ancestors, node, key = self._resolve_parent(path)
+        if node.fields is not None:
+            if key not in node.value:
+                raise KeyError(key)
+            del node.value[key]
+            node.fields = [field for field in node.fields if field.name != key]
+        else:
+            del node.value[key]
+            del node.elements[key]
+        self._update(ancestors, node)
+
+    def append(self, path, value):
+        """Appends the given value to the list or sexp at the given path."""
+        ancestors = []
+        node = self._resolve(path, ancestors)
+        if node.elements is None:
+            raise Exception("Unable to append to a value of type %s" % node.value.ion_type.name)
+        node.value.append(value)
+        node.elements.append(self._build(value))
+        self._update(ancestors, node)
+
+    def _resolve(self, path, ancestors):
+        """Returns the node at the given path, appending (node, index of child field or element)
+        pairs for each of its ancestors to ancestors."""
+        node = self._root
+        for key in path:
+            if node.fields is not None:
+                index = _last_field_index(node, key)
+                ancestors.append((node, index))
+                node = node.fields[index].node
+            elif node.elements is not None:
+                index = range(len(node.elements))[key]
+                ancestors.append((node, index))
+                node = node.elements[index]
+            else:
+                raise Exception("Unable to resolve %r within a value of type %s" % (key, node.value.ion_type.name))
+        return node
+
+    def _resolve_parent(self, path):
+        ancestors = []
+        node = self._resolve(path[:-1], ancestors)
+        key = path[-1]
+        if node.fields is not None:
+            if not isinstance(key, str):
+                raise Exception("Struct fields must be identified by name, not %r" % (key,))
+        elif node.elements is not None:
+            if not isinstance(key, int):
+                raise Exception("List and sexp elements must be identified by index, not %r" % (key,))
+        else:
+            raise Exception("Unable to resolve %r within a value of type %s" % (key, node.value.ion_type.name))
+        return ancestors, node, key
+
+    def _update(self, ancestors, node):
+        """Updates the given (modified) node and then its ancestors, from the innermost outwards."""
+        if node.fields is not None:
+            node.serialized = self._serialize_struct(node)
+        for ancestor, index in reversed(ancestors):
+            if ancestor.fields is not None:
+                field = ancestor.fields[index]
+                ancestor.fields[index] = self._field(field.name, field.node)
+                ancestor.serialized = self._serialize_struct(ancestor)
+        self._digest = None
+
+    def _build(self, value):
+        """Returns the root of a new tree of _Nodes for the given value."""
+        root = _Node(value)
+        stack = [(root, _children(root))] if root.serialized is None else []
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if node.fields is not None:
+                    node.fields = [self._field(name, child_node) for name, child_node in node.fields]
+                    node.serialized = self._serialize_struct(node)
+                continue
+            if node.fields is not None:
+                name, child_value = child
+                child_node = _Node(child_value)
+                node.fields.append((name, child_node))
+            else:
+                child_node = _Node(child)
+                node.elements.append(child_node)
+            if child_node.serialized is None:
+                stack.append((child_node, _children(child_node)))
+        return root
+
+    def _field(self, name, node):
+        self._hash_fn.update(_write_symbol(name))
+        self._write(node, self._hash_fn)
+        return _Field(name, node, self._hash_fn.digest())
+
+    @staticmethod
+    def _serialize_struct(node):
+        digests = [field.digest for field in node.fields]
+        _sort_field_hashes(digests)
+        return node.start + _escape(b''.join(digests)) + node.end
+
+    @staticmethod
+    def _write(node, hash_fn):
+        """Writes s(value) of the given node to hash_fn."""
+        if node.serialized is not None:
+            hash_fn.update(node.serialized)
+            return
+        hash_fn.update(node.start)
+        stack = [iter(node.elements)]
+        ends = [node.end]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                hash_fn.update(ends.pop())
+            elif child.serialized is not None:
+                hash_fn.update(child.serialized)
+            else:
+                hash_fn.update(child.start)
+                stack.append(iter(child.elements))
+                ends.append(child.end)
+
+
+class _Node:
+    """A value within a HashedDocument.
+
+    Attributes:
+        value: the simpleion value
+        serialized: s(value), except for lists and sexps
+        fields: for structs, the _Fields of the struct
+        elements: for lists and sexps, the _Nodes of the elements
+        start: for containers, the bytes that precede the representation in s(value)
+        end: for containers, the bytes that follow the representation in s(value)
+    """
+    __slots__ = ['value', 'serialized', 'fields', 'elements', 'start', 'end']
+
+    def __init__(self, value):
+        self.value = value
+        self.serialized = None
+        self.fields = None
+        self.elements = None
+        annotations = value.ion_annotations
+        prefix = _BEGIN_MARKER + _TQ_ANNOTATED_VALUE + b''.join([_write_symbol(a) for a in annotations]) \
+            if annotations else b''
+        ion_type = value.ion_type
+        is_ion_null = isinstance(value, IonPyNull)
+        if is_ion_null or ion_type not in _CONTAINER_START:
+            self.serialized = prefix + _s_scalar(value, ion_type, is_ion_null) + (_END_MARKER if annotations else b'')
+        else:
+            # serialized is computed from the fields of structs once they have been hashed
+            self.start = prefix + _CONTAINER_START[ion_type]
+            self.end = _END_MARKER + _END_MARKER if annotations else _END_MARKER
+            if ion_type is IonType.STRUCT:
+                self.fields = []
+            else:
+                self.elements = []
+
+
+class _Field:
+    """A field of a struct within a HashedDocument, and its digest H(field)."""
+    __slots__ = ['name', 'node', 'digest']
+
+    def __init__(self, name, node, digest):
+        self.name = name
+        self.node = node
+        self.digest = digest
+
+
+def _children(node):
+    return iter(node.value.iteritems()) if node.fields is not None else iter(node.value)
+
+
+def _last_field_index(node, name):
+    for index in range(len(node.fields) - 1, -1, -1):
+        if node.fields[index].name == name:
+            return index
+    raise KeyError(name)
@@ -1,20 +1,12 @@
 from amazon.ion.core import IonType
 from amazon.ion.simple_types import IonPyNull
 
-from functools import cmp_to_key
-
-from ionhash.hasher import _bytearray_comparator, _scalar_or_null_split_parts, _serialize_null, \
-    _UPDATE_SCALAR_HASH_BYTES_JUMP_TABLE, _BEGIN_MARKER, _TQ, _END_MARKER, \
-    _BEGIN_MARKER_BYTE, _END_MARKER_BYTE, _TQ_ANNOTATED_VALUE, _escape, _TQ_SYMBOL_SID0
-
-
-class _IonEventDuck:
-    """Looks like an IonEvent, quacks like an IonEvent...
-    Used for sending scalar values to the existing ion_binary_writer serializers.
-    """
-    def __init__(self, value, ion_type):
-        self.value = value
-        self.ion_type = ion_type
+from ionhash.hasher import _sort_field_hashes, _REPRESENTATION_ENCODERS, _SCALAR_PREFIXES, _TQ_NULL, \
+    _BEGIN_MARKER, _TQ, _END_MARKER, \
+    _BEGIN_MARKER_BYTE, _END_MARKER_BYTE, _TQ_ANNOTATED_VALUE, _escape, _SERIALIZED_SYMBOL_SID0, \
+    _is_chunked, _update_escaped, _MultiHash
+from ionhash import hasher
+from ionhash.numpy_hasher import _serialized_elements
 
 
 # H(value) → h(s(value))
@@ -22,6 +14,9 @@ def hash_value(value, hfp):
     """An implementation of the [Ion Hash algorithm](https://github.com/amzn/ion-hash/blob/gh-pages/docs/spec.md)
     for the Ion data model that doesn't instantiate any ion_readers or ion_writers.
 
+    The serialized representation of the value is streamed into the hash function as the value
+    is traversed, so the full serialization is never materialized in memory.
+
     Args:
         value: the Ion value to hash
         hfp: hash function provider
@@ -30,10 +25,30 @@ def hash_value(value, hfp):
         Ion Hash digest of the given Ion value
     """
     hash_fn = hfp()
-    hash_fn.update(serialize_value(value, hfp))
+    _write_value(value, hfp, hash_fn, [])
     return hash_fn.digest()
 
 
+def hash_values(values, hfp):
+    """Generator that yields the Ion Hash digest of each of the given Ion values.
+
+    Equivalent to calling hash_value() for each value, except that the hash functions
+    obtained from hfp are reused from one value to the next.
+
+    Args:
+        values: an iterable of the Ion values to hash
+        hfp: hash function provider
+
+    Yields:
+        Ion Hash digest of each of the given Ion values
+    """
+    hash_fn = hfp()
+    free_hashers = []
+    for value in values:
+        _write_value(value, hfp, hash_fn, free_hashers)
+        yield hash_fn.digest()
+
+
 # s(value) → serialized bytes
 def serialize_value(value, hfp):
     """Transforms an Ion value to its Ion Hash serialized representation.
@@ -45,50 +60,158 @@ def serialize_value(value, hfp):
     Returns:
         bytes representing the given Ion value, serialized according to the Ion Hash algorithm
     """
-    if value.ion_annotations:
-        return _s_annotated_value(value, hfp)
-    else:
-        return _s_value(value, hfp)
+    sink = _BytesSink()
+    _write_value(value, hfp, sink, [])
+    return bytes(sink.buffer)
 
 
-# s(annotated value) → B || TQ || s(annotation1) || s(annotation2) || ... || s(annotationn) || s(value) || E
-def _s_annotated_value(value, hfp):
-    return _BEGIN_MARKER + _TQ_ANNOTATED_VALUE + b''.join([_write_symbol(a) for a in value.ion_annotations]) \
-           + _s_value(value, hfp) + _END_MARKER
+class _BytesSink:
+    """Looks like an IonHasher, but accumulates the bytes passed to `update` instead of hashing them.
+    Used by serialize_value() to collect the output of the streaming serializer.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def update(self, _bytes):
+        self.buffer.extend(_bytes)
+
+
+# Marks the end of a container's children
+_END = object()
 
 
+class _Frame:
+    """The traversal state of a container whose children are being written."""
+    __slots__ = ['value', 'children', 'hash_fn', 'annotated', 'field_hash_fn', 'field_hashes', 'in_field']
+
+    def __init__(self, value, children, hash_fn, annotated, field_hash_fn=None, field_hashes=None):
+        self.value = value
+        self.children = children
+        self.hash_fn = hash_fn
+        self.annotated = annotated
+        self.field_hash_fn = field_hash_fn
+        self.field_hashes = field_hashes
+        self.in_field = False
+
+
+# Writes s(value) to hash_fn.
+#
+# The value is traversed with an explicit stack of _Frames rather than by recursion, so values of
+# arbitrary depth may be hashed:
+#
+# s(annotated value) → B || TQ || s(annotation1) || s(annotation2) || ... || s(annotationn) || s(value) || E
 # s(struct) → B || TQ || escape(concat(sort(H(field1), H(field2), ..., H(fieldn)))) || E
 # s(list) or s(sexp) → B || TQ || s(value1) || s(value2) || ... || s(valuen)) || E
 # s(scalar) → B || TQ || escape(representation) || E
-def _s_value(value, hfp):
-    ion_type = value.ion_type
-    is_ion_null = isinstance(value, IonPyNull)
-    if ion_type == IonType.STRUCT and not is_ion_null:
-        field_hashes = [_h_field(field_name, field_value, hfp) for [field_name, field_value] in value.iteritems()]
-        field_hashes.sort(key=cmp_to_key(_bytearray_comparator))
-        return _BEGIN_MARKER + bytes([_TQ[IonType.STRUCT]]) + _escape(b''.join(field_hashes)) + _END_MARKER
-    elif ion_type in [IonType.LIST, IonType.SEXP] and not is_ion_null:
-        return _BEGIN_MARKER + bytes([_TQ[ion_type]]) \
-               + b''.join([bytes(serialize_value(child, hfp)) for child in value]) + _END_MARKER
-    else:
-        serializer = _serialize_null if is_ion_null else _UPDATE_SCALAR_HASH_BYTES_JUMP_TABLE[ion_type]
-        scalar_bytes = serializer(_IonEventDuck(None if is_ion_null else value, ion_type))
-        [tq, representation] = _scalar_or_null_split_parts(ion_type, scalar_bytes)
-        if len(representation) == 0:
-            return bytes([_BEGIN_MARKER_BYTE, tq, _END_MARKER_BYTE])
+# H(field) → h(s(fieldname) || s(fieldvalue))
+#
+# Each struct hashes its fields with a single hasher, as digest() resets it; once the struct has been
+# written its hasher is returned to free_hashers for use by subsequent structs.
+#
+# If a memo (see memoization._MemoContext) is provided, structs whose bodies (i.e. their escaped,
+# sorted field hashes) have been memoized are not traversed, the bodies of the structs that are
+# traversed are memoized, and each value is linked to its container.
+def _write_value(value, hfp, hash_fn, free_hashers, memo=None):
+    stack = []
+    while True:
+        annotations = value.ion_annotations
+        if annotations:
+            hash_fn.update(_BEGIN_MARKER + _TQ_ANNOTATED_VALUE + b''.join([_write_symbol(a) for a in annotations]))
+
+        ion_type = value.ion_type
+        is_ion_null = isinstance(value, IonPyNull)
+        if is_ion_null or ion_type not in _CONTAINER_START:
+            if not is_ion_null and _is_chunked(ion_type, value):
+                hash_fn.update(bytes([_BEGIN_MARKER_BYTE, _TQ[ion_type]]))
+                _update_escaped(hash_fn.update, value)
+                hash_fn.update(_END_MARKER + _END_MARKER if annotations else _END_MARKER)
+            else:
+                scalar_bytes = _s_scalar(value, ion_type, is_ion_null)
+                hash_fn.update(scalar_bytes + _END_MARKER if annotations else scalar_bytes)
+        elif ion_type is IonType.STRUCT:
+            body = None if memo is None else memo.struct_body(value)
+            if body is None:
+                hash_fn.update(_CONTAINER_START[ion_type])
+                field_hash_fn = free_hashers.pop() if free_hashers else hfp()
+                stack.append(_Frame(value, iter(value.iteritems()), hash_fn, annotations, field_hash_fn, []))
+            else:
+                end_bytes = _END_MARKER + _END_MARKER if annotations else _END_MARKER
+                hash_fn.update(_CONTAINER_START[ion_type] + body + end_bytes)
+        else:
+            elements = _serialized_elements(value)
+            if elements is None:
+                hash_fn.update(_CONTAINER_START[ion_type])
+                stack.append(_Frame(value, iter(value), hash_fn, annotations))
+            else:
+                # a homogeneous numeric list or sexp, serialized in bulk
+                hash_fn.update(_CONTAINER_START[ion_type])
+                for chunk in elements:
+                    hash_fn.update(chunk)
+                hash_fn.update(_END_MARKER + _END_MARKER if annotations else _END_MARKER)
+                if memo is not None:
+                    for child in value:
+                        memo.link(child, value)
+
+        # find the next value to write, closing any containers that have been exhausted
+        while stack:
+            frame = stack[-1]
+            field_hashes = frame.field_hashes
+            if frame.in_field:
+                field_hashes.append(frame.field_hash_fn.digest())
+            child = next(frame.children, _END)
+            if child is _END:
+                stack.pop()
+                if field_hashes is None:
+                    end_bytes = _END_MARKER
+                elif type(frame.hash_fn) is _MultiHash:
+                    # struct bodies differ per hash function, so are not memoized
+                    frame.hash_fn.update_field_hashes(field_hashes)
+                    end_bytes = _END_MARKER
+                    free_hashers.append(frame.field_hash_fn)
+                else:
+                    _sort_field_hashes(field_hashes)
+                    body = _escape(b''.join(field_hashes))
+                    if memo is not None:
+                        memo.store_struct_body(frame.value, body)
+                    end_bytes = body + _END_MARKER
+                    free_hashers.append(frame.field_hash_fn)
+                frame.hash_fn.update(end_bytes + _END_MARKER if frame.annotated else end_bytes)
+                continue
+            if field_hashes is None:
+                value = child
+                hash_fn = frame.hash_fn
+            else:
+                [field_name, value] = child
+                hash_fn = frame.field_hash_fn
+                hash_fn.update(_write_symbol(field_name))
+                frame.in_field = True
+            if memo is not None:
+                memo.link(value, frame.value)
+            break
         else:
-            return b''.join([_BEGIN_MARKER, bytes([tq]), _escape(representation), _END_MARKER])
+            return
 
 
-# H(field) → h(s(fieldname) || s(fieldvalue))
-def _h_field(field_name, field_value, hfp):
-    hash_fn = hfp()
-    hash_fn.update(_write_symbol(field_name) + serialize_value(field_value, hfp))
-    return hash_fn.digest()
+# Precomputed B || TQ prefixes of (non-null) containers
+_CONTAINER_START = {
+    IonType.LIST: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.LIST]]),
+    IonType.SEXP: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.SEXP]]),
+    IonType.STRUCT: bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.STRUCT]]),
+}
+
+
+# s(scalar) → B || TQ || escape(representation) || E
+def _s_scalar(value, ion_type, is_ion_null):
+    if is_ion_null:
+        return _SERIALIZED_NULLS[ion_type]
+    tq, representation = _REPRESENTATION_ENCODERS[ion_type](value)
+    if len(representation) == 0:
+        return _SCALAR_PREFIXES[tq] + _END_MARKER
+    return b''.join([_SCALAR_PREFIXES[tq], _escape(representation), _END_MARKER])
 
 
-# Precomputed bytes for the unknown symbol (sid $0) case of _write_symbol()
-_SERIALIZED_SYMBOL_SID0_BYTES = bytes([_BEGIN_MARKER_BYTE, _TQ_SYMBOL_SID0, _END_MARKER_BYTE])
+# Precomputed s(null) for each Ion type
+_SERIALIZED_NULLS = {ion_type: bytes([_BEGIN_MARKER_BYTE, tq, _END_MARKER_BYTE]) for ion_type, tq in _TQ_NULL.items()}
 
 
 # Function for writing symbol tokens (annotations and field names)
@@ -97,7 +220,7 @@ _SERIALIZED_SYMBOL_SID0_BYTES = bytes([_BEGIN_MARKER_BYTE, _TQ_SYMBOL_SID0, _END
 def _write_symbol(text_or_symbol_token):
     text = getattr(text_or_symbol_token, 'text', text_or_symbol_token)
     if text is None:
-        return _SERIALIZED_SYMBOL_SID0_BYTES
+        return _SERIALIZED_SYMBOL_SID0
     else:
-        return _BEGIN_MARKER + bytes([_TQ[IonType.SYMBOL]]) \
-               + _escape(bytearray(text, encoding="utf-8")) + _END_MARKER
+        # looked up on the module, as configure_symbol_cache() replaces the cache
+        return hasher._serialized_symbol_text(text)
@@ -15,9 +15,13 @@
 readers/writers that hash Ion values according to the Ion Hash Specification."""
 
 from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Context, MAX_EMAX, MAX_PREC, MIN_EMIN
 from enum import IntEnum
-from functools import cmp_to_key
+from functools import lru_cache
 import hashlib
+from math import copysign
+from struct import Struct
 
 from amazon.ion.core import DataEvent
 from amazon.ion.core import IonEvent
@@ -26,13 +30,15 @@ from amazon.ion.core import IonType
 from amazon.ion.util import coroutine
 from amazon.ion.reader import NEXT_EVENT
 from amazon.ion.reader import SKIP_EVENT
-from amazon.ion.writer_binary_raw import _serialize_blob
-from amazon.ion.writer_binary_raw import _serialize_bool
-from amazon.ion.writer_binary_raw import _serialize_clob
-from amazon.ion.writer_binary_raw import _serialize_decimal
-from amazon.ion.writer_binary_raw import _serialize_float
-from amazon.ion.writer_binary_raw import _serialize_int
-from amazon.ion.writer_binary_raw import _serialize_timestamp
+from amazon.ion.core import MICROSECOND_PRECISION
+from amazon.ion.core import TIMESTAMP_FRACTIONAL_SECONDS_FIELD
+from amazon.ion.core import TIMESTAMP_PRECISION_FIELD
+from amazon.ion.core import Timestamp
+from amazon.ion.core import TimestampPrecision
+from amazon.ion.util import total_seconds
+from amazon.ion.writer_binary_raw import _write_decimal_value
+from amazon.ion.writer_binary_raw import _write_timestamp_fractional_seconds
+from amazon.ion.writer_binary_raw_fields import _write_varint
 
 
 class HashEvent(IntEnum):
@@ -47,11 +53,69 @@ class HashEvent(IntEnum):
 
 def hashlib_hash_function_provider(algorithm):
     """A hash function provider based on `hashlib`."""
+    prototype = _hashlib_prototype(algorithm)
+
     def _f():
-        return _HashlibHash(algorithm)
+        return _HashlibHash(algorithm, prototype)
     return _f
 
 
+def multi_hash_function_provider(algorithms=None, hash_function_providers=None):
+    """A hash function provider whose ``IonHasher`` instances compute the digests of several hash
+    functions at once, so that several Ion hashes of a value may be computed in a single traversal.
+
+    The value is serialized and escaped once, and the resulting bytes are passed to each hash
+    function;  only the digests of struct fields, which are sorted, are computed per hash function.
+    The digest of each ``IonHasher`` instance (and therefore the result of ``ion_hash()``,
+    ``hash_binary()``, and ``HashEvent.DIGEST``) is a dict of the digests keyed by algorithm name,
+    or by the keys of hash_function_providers, in the order given.
+
+    Args:
+        algorithms:
+            An iterable of the names of hash algorithms supported by the `hashlib` module.
+
+        hash_function_providers:
+            A dict of hash function providers, keyed by the name under which their digests are
+            returned.
+    """
+    providers = {algorithm: hashlib_hash_function_provider(algorithm) for algorithm in algorithms or ()}
+    if hash_function_providers:
+        providers.update(hash_function_providers)
+    if not providers:
+        raise Exception("At least one algorithm or hash_function_provider must be specified")
+    names = tuple(providers)
+    providers = tuple(providers.values())
+
+    def _f():
+        return _MultiHash(names, [provider() for provider in providers])
+    return _f
+
+
+# Pristine `hashlib` hash objects, keyed by algorithm name; these are only ever copied, never updated
+_HASHLIB_PROTOTYPES = {}
+
+
+def _hashlib_prototype(algorithm):
+    prototype = _HASHLIB_PROTOTYPES.get(algorithm)
+    if prototype is None:
+        prototype = hashlib.new(algorithm)
+        _HASHLIB_PROTOTYPES[algorithm] = prototype
+    return prototype
+
+
+def _resolve_hash_function_provider(algorithm, hash_function_provider):
+    """Validates that exactly one of algorithm or hash_function_provider is specified, and returns the
+    corresponding hash function provider."""
+    if algorithm is None and hash_function_provider is None:
+        raise Exception("Either 'algorithm' or 'hash_function_provider' must be specified")
+    if algorithm is not None and hash_function_provider is not None:
+        raise Exception("Either 'algorithm' or 'hash_function_provider' must be specified, not both")
+
+    if algorithm is not None:
+        return hashlib_hash_function_provider(algorithm)
+    return hash_function_provider
+
+
 class IonHasher(ABC):
     """Abstract class declaring the hashing methods that must be implemented in order to
     support a hash function for use by `hash_reader` or `hash_writer`."""
@@ -68,20 +132,51 @@ class IonHasher(ABC):
 
 
 class _HashlibHash(IonHasher):
-    """Implements the expected hash function methods for the specified algorithm using `hashlib`."""
-    def __init__(self, algorithm):
+    """Implements the expected hash function methods for the specified algorithm using `hashlib`.
+
+    Rather than looking up the algorithm by name each time a new `hashlib` hash object is needed,
+    a copy is made of a pristine prototype for the algorithm.
+    """
+    def __init__(self, algorithm, prototype=None):
         self._algorithm = algorithm
-        self._hasher = hashlib.new(self._algorithm)
+        self._prototype = _hashlib_prototype(algorithm) if prototype is None else prototype
+        self._hasher = self._prototype.copy()
 
     def update(self, _bytes):
         self._hasher.update(_bytes)
 
     def digest(self):
         digest = self._hasher.digest()
-        self._hasher = hashlib.new(self._algorithm)
+        self._hasher = self._prototype.copy()
         return digest
 
 
+class _MultiHash(IonHasher):
+    """Passes the bytes given to `update` to each of several hash functions.
+
+    The digests of struct fields computed by a ``_MultiHash`` are dicts, which must be passed to
+    `update_field_hashes` rather than `update`, as each hash function sorts its own digests.
+    """
+    def __init__(self, names, hash_functions):
+        self._names = names
+        self._hash_functions = hash_functions
+
+    def update(self, _bytes):
+        for hash_function in self._hash_functions:
+            hash_function.update(_bytes)
+
+    def update_field_hashes(self, field_hashes):
+        """Updates each hash function with escape(concat(sort(field_hashes))), given its own
+        digests of the fields."""
+        for name, hash_function in zip(self._names, self._hash_functions):
+            digests = [field_hash[name] for field_hash in field_hashes]
+            _sort_field_hashes(digests)
+            hash_function.update(_escape(b''.join(digests)))
+
+    def digest(self):
+        return dict(zip(self._names, [hash_function.digest() for hash_function in self._hash_functions]))
+
+
 @coroutine
 def hash_reader(reader, hash_function_provider):
     """Provides a coroutine that wraps an ion-python reader and adds Ion Hash functionality.
@@ -238,23 +333,30 @@ class _Hasher:
     """Primary driver of the Ion hash algorithm.
 
     This class maintains a stack of serializers corresponding to the nesting of Ion data
-    being hashed.
+    being hashed.  Hash functions that are no longer needed by a serializer (and have been
+    reset by a call to `digest()`) are kept for reuse by subsequent serializers.
     """
     def __init__(self, hash_function_provider):
         self._hash_function_provider = hash_function_provider
+        self._free_hash_functions = []
         self._current_hasher = _Serializer(self._hash_function_provider(), 0)
         self._hasher_stack = [self._current_hasher]
 
     def scalar(self, ion_event):
         self._current_hasher.scalar(ion_event)
 
+    def _new_hash_function(self):
+        if self._free_hash_functions:
+            return self._free_hash_functions.pop()
+        return self._hash_function_provider()
+
     def step_in(self, ion_event):
         hf = self._current_hasher.hash_function
         if isinstance(self._current_hasher, _StructSerializer):
-            hf = self._hash_function_provider()
+            hf = self._new_hash_function()
 
         if ion_event.ion_type == IonType.STRUCT:
-            self._current_hasher = _StructSerializer(hf, self._depth(), self._hash_function_provider)
+            self._current_hasher = _StructSerializer(hf, self._depth(), self._new_hash_function)
         else:
             self._current_hasher = _Serializer(hf, self._depth())
 
@@ -268,9 +370,23 @@ class _Hasher:
         popped_hasher = self._hasher_stack.pop()
         self._current_hasher = self._hasher_stack[-1]
 
+        if isinstance(popped_hasher, _StructSerializer):
+            self._free_hash_functions.append(popped_hasher.scalar_hash_function())
         if isinstance(self._current_hasher, _StructSerializer):
             digest = popped_hasher.digest()
             self._current_hasher.append_field_hash(digest)
+            self._free_hash_functions.append(popped_hasher.hash_function)
+
+    def write_children(self, binary_hasher, start, end):
+        """Hashes the children of the current container that are encoded as binary Ion between
+        start and end, using the given binary_hasher._BinaryHasher."""
+        if isinstance(self._current_hasher, _StructSerializer):
+            hash_fn = self._new_hash_function()
+            for digest in binary_hasher.field_hashes(start, end, hash_fn):
+                self._current_hasher.append_field_hash(digest)
+            self._free_hash_functions.append(hash_fn)
+        else:
+            binary_hasher.write_elements(start, end, self._current_hasher.hash_function)
 
     def digest(self):
         if self._depth() != 0:
@@ -318,19 +434,27 @@ class _Serializer:
         return self.hash_function.update(_END_MARKER)
 
     def _write_symbol(self, token):
-        self._begin_marker()
-        _bytes = _serialize_symbol_token(token)
-        [tq, representation] = _scalar_or_null_split_parts(IonType.SYMBOL, _bytes)
-        self._update(bytes([tq]))
-        if len(representation) > 0:
-            self._update(_escape(representation))
-        self._end_marker()
+        if getattr(token, 'sid', None) == 0:
+            _bytes = _SERIALIZED_SYMBOL_SID0
+        else:
+            _bytes = _serialized_symbol_text(getattr(token, 'text', token))
+        # B, TQ, representation, and E are each provided to the hash function separately
+        self._update(_bytes[:1])
+        self._update(_bytes[1:2])
+        if len(_bytes) > 3:
+            self._update(_bytes[2:-1])
+        self._update(_bytes[-1:])
 
     def scalar(self, ion_event):
         self._handle_annotations_begin(ion_event)
         self._begin_marker()
-        scalar_bytes = _serializer(ion_event)(ion_event)
-        [tq, representation] = _scalar_or_null_split_parts(ion_event.ion_type, scalar_bytes)
+        if ion_event.value is not None and _is_chunked(ion_event.ion_type, ion_event.value):
+            self._update(bytes([_TQ[ion_event.ion_type]]))
+            _update_escaped(self._update, ion_event.value)
+            self._end_marker()
+            self._handle_annotations_end(ion_event)
+            return
+        tq, representation = _representation(ion_event.value, ion_event.ion_type)
         self._update(bytes([tq]))
         if len(representation) > 0:
             self._update(_escape(representation))
@@ -365,92 +489,206 @@ class _StructSerializer(_Serializer):
         self.append_field_hash(digest)
 
     def step_out(self):
-        self._field_hashes.sort(key=cmp_to_key(_bytearray_comparator))
-        for digest in self._field_hashes:
-            self._update(_escape(digest))
+        if type(self.hash_function) is _MultiHash:
+            self.hash_function.update_field_hashes(self._field_hashes)
+        else:
+            _sort_field_hashes(self._field_hashes)
+            for digest in self._field_hashes:
+                self._update(_escape(digest))
         super().step_out()
 
     def append_field_hash(self, digest):
         self._field_hashes.append(digest)
 
+    def scalar_hash_function(self):
+        return self._scalar_serializer.hash_function
+
 
 #
-# Serialization functions for scalar types:
+# Representation encoders for scalar types:  each returns the TQ byte and the representation of a
+# non-null value, i.e. its binary Ion encoding without the type descriptor and length
 #
 
-def _serialize_null(ion_event):
-    ba = bytearray()
-    ba.append(_TQ[ion_event.ion_type] | _TQ[IonType.NULL])
-    return ba
+_TQ_BOOL_TRUE = _TQ[IonType.BOOL] | 0x01
+_TQ_NEGATIVE_INT = 0x30
+_TQ_NULL = {ion_type: tq | _TQ[IonType.NULL] for ion_type, tq in _TQ.items()}
+
+# B || TQ for each TQ byte
+_SCALAR_PREFIXES = tuple(bytes([_BEGIN_MARKER_BYTE, tq]) for tq in range(256))
+
+_DOUBLE = Struct('>d')
+
+_EXACT_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+def _encode_bool(value):
+    return (_TQ_BOOL_TRUE if value else _TQ[IonType.BOOL]), b''
+
+
+def _encode_int(value):
+    if value == 0:
+        return _TQ[IonType.INT], b''
+    if value < 0:
+        value = -value
+        return _TQ_NEGATIVE_INT, value.to_bytes((value.bit_length() + 7) // 8, 'big')
+    return _TQ[IonType.INT], value.to_bytes((value.bit_length() + 7) // 8, 'big')
+
+
+def _encode_float(value):
+    # positive zero is encoded without a representation
+    if value == 0.0 and copysign(1.0, value) > 0:
+        return _TQ[IonType.FLOAT], b''
+    return _TQ[IonType.FLOAT], _DOUBLE.pack(value)
+
+
+def _encode_decimal(value):
+    sign, _, exponent = value.as_tuple()
+    # shifting the exponent is exact in an unbounded context
+    magnitude = abs(int(value.scaleb(-exponent, _EXACT_CONTEXT)))
+    if not sign and not exponent and not magnitude:
+        # 0d0 is encoded without a representation
+        return _TQ[IonType.DECIMAL], b''
+    buf = bytearray()
+    _write_varint(buf, exponent)
+    if magnitude:
+        # the coefficient is a signed, big-endian Int, with room for its sign bit
+        coefficient = magnitude.to_bytes((magnitude.bit_length() + 8) // 8, 'big')
+        buf.extend(coefficient)
+        if sign:
+            buf[-len(coefficient)] |= 0x80
+    elif sign:
+        # negative zero
+        buf.append(0x80)
+    return _TQ[IonType.DECIMAL], buf
+
+
+def _encode_timestamp(value):
+    precision = getattr(value, TIMESTAMP_PRECISION_FIELD, None)
+    if precision is None:
+        precision = TimestampPrecision.SECOND
+    buf = bytearray()
+    dt = value
+    if dt.tzinfo is None:
+        # unknown local offset
+        buf.append(0xC0)
+    else:
+        # normalized to UTC
+        offset = dt.utcoffset()
+        if offset:
+            dt = datetime(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond) - offset
+        _write_varint(buf, int(total_seconds(offset) // 60))
+    # every field but the year fits in a single VarUInt octet, and the year in two
+    year = dt.year
+    if year < 0x80:
+        buf.append(0x80 | year)
+    else:
+        buf.append(year >> 7)
+        buf.append(0x80 | (year & 0x7F))
+    if precision.includes_month:
+        buf.append(0x80 | dt.month)
+    if precision.includes_day:
+        buf.append(0x80 | dt.day)
+    if precision.includes_minute:
+        buf.append(0x80 | dt.hour)
+        buf.append(0x80 | dt.minute)
+    if precision.includes_second:
+        buf.append(0x80 | dt.second)
+        if isinstance(value, Timestamp):
+            fractional_seconds = getattr(value, TIMESTAMP_FRACTIONAL_SECONDS_FIELD, None)
+            if fractional_seconds is not None:
+                _write_timestamp_fractional_seconds(buf, fractional_seconds)
+        else:
+            _write_decimal_value(buf, -MICROSECOND_PRECISION, dt.microsecond)
+    return _TQ[IonType.TIMESTAMP], buf
+
 
+def _encode_symbol(value):
+    if getattr(value, 'sid', None) == 0:
+        return _TQ_SYMBOL_SID0, b''
+    return _TQ[IonType.SYMBOL], getattr(value, 'text', value).encode('utf-8')
 
-def _serialize_string(ion_event):
-    ba = bytearray()
-    ba.append(_TQ[IonType.STRING])
-    ba.extend(ion_event.value.encode('utf-8'))
-    return ba
 
+def _encode_string(value):
+    return _TQ[IonType.STRING], value.encode('utf-8')
 
-def _serialize_symbol(ion_event):
-    return _serialize_symbol_token(ion_event.value)
 
+def _encode_clob(value):
+    return _TQ[IonType.CLOB], value
 
-def _serialize_symbol_token(token):
-    ba = bytearray()
-    is_token = hasattr(token, 'sid')
-    if is_token and token.sid == 0:
-        ba.append(_TQ_SYMBOL_SID0)
-    else:
-        ba.append(_TQ[IonType.SYMBOL])
-        ba.extend(bytearray(token.text if is_token else token, encoding="utf-8"))
-    return ba
-
-
-def _serializer(ion_event):
-    if ion_event.value is None:
-        return _serialize_null
-    return _UPDATE_SCALAR_HASH_BYTES_JUMP_TABLE[ion_event.ion_type]
-
-
-_UPDATE_SCALAR_HASH_BYTES_JUMP_TABLE = {
-    IonType.NULL:      _serialize_null,
-    IonType.BOOL:      _serialize_bool,
-    IonType.INT:       _serialize_int,
-    IonType.FLOAT:     _serialize_float,
-    IonType.DECIMAL:   _serialize_decimal,
-    IonType.TIMESTAMP: _serialize_timestamp,
-    IonType.SYMBOL:    _serialize_symbol,
-    IonType.STRING:    _serialize_string,
-    IonType.CLOB:      _serialize_clob,
-    IonType.BLOB:      _serialize_blob,
+
+def _encode_blob(value):
+    return _TQ[IonType.BLOB], value
+
+
+_REPRESENTATION_ENCODERS = {
+    IonType.BOOL:      _encode_bool,
+    IonType.INT:       _encode_int,
+    IonType.FLOAT:     _encode_float,
+    IonType.DECIMAL:   _encode_decimal,
+    IonType.TIMESTAMP: _encode_timestamp,
+    IonType.SYMBOL:    _encode_symbol,
+    IonType.STRING:    _encode_string,
+    IonType.CLOB:      _encode_clob,
+    IonType.BLOB:      _encode_blob,
 }
 
 
-def _scalar_or_null_split_parts(ion_type, _bytes):
-    """Splits scalar bytes into TQ and representation; also handles any special case binary cleanup."""
-    offset = 1 + _get_length_length(_bytes)
+def _representation(value, ion_type):
+    """Returns the TQ byte and the representation of the given scalar value (or of null, if the
+    value is None)."""
+    if value is None:
+        return _TQ_NULL[ion_type], b''
+    return _REPRESENTATION_ENCODERS[ion_type](value)
+
+
+# Precomputed s(symbol) for the unknown symbol (sid $0)
+_SERIALIZED_SYMBOL_SID0 = bytes([_BEGIN_MARKER_BYTE, _TQ_SYMBOL_SID0, _END_MARKER_BYTE])
+
+# Default maximum number of distinct symbol texts retained by the symbol cache
+_DEFAULT_SYMBOL_CACHE_SIZE = 4096
 
-    # the representation is everything after TL (first byte) and length
-    representation = _bytes[offset:]
 
-    tq = _bytes[0]
-    if (ion_type != IonType.BOOL
-            and ion_type != IonType.SYMBOL
-            and tq & 0x0F != 0x0F):      # not a null value
-        tq &= 0xF0                       # zero-out the L nibble
+def _serialize_symbol_text(text):
+    """Returns s(symbol), i.e. B || TQ || escape(representation) || E, for a symbol with the given text."""
+    return _BEGIN_MARKER + bytes([_TQ[IonType.SYMBOL]]) + bytes(_escape(text.encode('utf-8'))) + _END_MARKER
 
-    return [tq, representation]
 
+_serialized_symbol_text = lru_cache(maxsize=_DEFAULT_SYMBOL_CACHE_SIZE)(_serialize_symbol_text)
 
-def _get_length_length(_bytes):
-    """Returns a count of bytes in an Ion value's `length` field."""
-    if (_bytes[0] & 0x0F) == 0x0E:
-        # read subsequent byte(s) as the "length" field
-        for i in range(1, len(_bytes)):
-            if (_bytes[i] & 0x80) != 0:
-                return i
-        raise Exception("Problem while reading VarUInt!")
-    return 0
+
+def configure_symbol_cache(maxsize=_DEFAULT_SYMBOL_CACHE_SIZE):
+    """Replaces the cache of serialized symbols with an empty cache of the specified size.
+
+    Field names and annotations are hashed by first serializing them as Ion symbols;  the
+    serialized bytes are cached (per symbol text) by a least-recently-used cache that is
+    shared by all of the hashing functions in this package.
+
+    Args:
+        maxsize:
+            The maximum number of distinct symbol texts to cache.  If `None`, the cache is
+            unbounded;  if 0, symbols are serialized every time they are hashed.
+    """
+    global _serialized_symbol_text
+    _serialized_symbol_text = lru_cache(maxsize=maxsize)(_serialize_symbol_text)
+
+
+def symbol_cache_info():
+    """Returns the hits, misses, maxsize, and currsize of the cache of serialized symbols,
+    as a named tuple (see ``functools.lru_cache``)."""
+    return _serialized_symbol_text.cache_info()
+
+
+def _sort_field_hashes(field_hashes):
+    """Sorts the given list of digests, in place, by the lexicographical ordering of their octets
+    as unsigned integers.
+
+    This is the ordering implemented by `_bytearray_comparator`, and is the native ordering of
+    `bytes` and `bytearray`;  digests of other types (such as `memoryview`) are compared as `bytes`.
+    """
+    try:
+        field_hashes.sort()
+    except TypeError:
+        field_hashes.sort(key=bytes)
 
 
 def _bytearray_comparator(a, b):
@@ -479,13 +717,54 @@ def _bytearray_comparator(a, b):
 
 def _escape(_bytes):
     """If _bytes contains one or more BEGIN_MARKER_BYTEs, END_MARKER_BYTEs, or ESCAPE_BYTEs,
-    returns a new bytearray with such bytes preceeded by a ESCAPE_BYTE;  otherwise, returns
-    the original _bytes unchanged.
+    returns a new bytes (or bytearray) with such bytes preceeded by a ESCAPE_BYTE;  otherwise, returns
+    the original _bytes unchanged, unless it is a memoryview.
+
+    _bytes may be a `bytes`, `bytearray`, or `memoryview`;  a memoryview is always copied to `bytes`
+    (which is returned even if nothing is escaped), as copying it and searching the copy (with
+    memchr) is much faster than searching the memoryview in place.  Each marker is searched for
+    once, and only the markers present are replaced.
     """
-    if _BEGIN_MARKER_BYTE in _bytes or _END_MARKER_BYTE in _bytes or _ESCAPE_BYTE in _bytes:
-        return _bytes.replace(_ESCAPE_MARKER, _ESCAPED_ESCAPE_MARKER) \
-                     .replace(_BEGIN_MARKER, _ESCAPED_BEGIN_MARKER) \
-                     .replace(_END_MARKER, _ESCAPED_END_MARKER)
-    # no escaping needed, return the original _bytes
+    if type(_bytes) is memoryview:
+        _bytes = _bytes.tobytes()
+    has_escape = _ESCAPE_BYTE in _bytes
+    has_begin = _BEGIN_MARKER_BYTE in _bytes
+    has_end = _END_MARKER_BYTE in _bytes
+    # the escape byte must be escaped first, so the escape bytes inserted before markers are not escaped
+    if has_escape:
+        _bytes = _bytes.replace(_ESCAPE_MARKER, _ESCAPED_ESCAPE_MARKER)
+    if has_begin:
+        _bytes = _bytes.replace(_BEGIN_MARKER, _ESCAPED_BEGIN_MARKER)
+    if has_end:
+        _bytes = _bytes.replace(_END_MARKER, _ESCAPED_END_MARKER)
     return _bytes
 
+
+# Blob, clob, and string representations longer than this (in bytes, or characters for strings)
+# are escaped and passed to the hash function in chunks of this size, rather than in full
+_CHUNK_SIZE = 64 * 1024
+
+_CHUNKED_TYPES = frozenset([IonType.BLOB, IonType.CLOB, IonType.STRING])
+
+
+def _is_chunked(ion_type, value):
+    """Returns True if the given non-null scalar value is a large blob, clob, or string whose
+    representation should be hashed by _update_escaped()."""
+    return ion_type in _CHUNKED_TYPES and len(value) > _CHUNK_SIZE
+
+
+def _update_escaped(update, representation):
+    """Passes escape(representation) to update in chunks, so that the representation is never
+    copied or escaped in full, and the memory needed is independent of its size.
+
+    The representation may be a `str` (which is encoded as UTF-8 one chunk at a time), or a
+    bytes-like object such as `bytes`, a `memoryview`, or an `mmap`.
+    """
+    if isinstance(representation, str):
+        for i in range(0, len(representation), _CHUNK_SIZE):
+            update(_escape(representation[i:i + _CHUNK_SIZE].encode('utf-8')))
+    else:
+        view = memoryview(representation).cast('B')
+        for i in range(0, len(view), _CHUNK_SIZE):
+            update(_escape(view[i:i + _CHUNK_SIZE]))
+
@@ -0,0 +1,322 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Opt-in instrumentation of the hashing hot paths.
+
+While instrumentation is enabled, the functions and methods on the hot paths of the following
+are replaced by counting and timing wrappers:
+
+* `hash_reader()`, `hash_writer()`, `AsyncHashReader` and `AsyncHashWriter`
+* `ion_hash()`, `hash_values()`, `hash_object()` and `hash_array()`
+* `hash_binary()`, `hash_binary_reader()`, `hash_binary_range()`, `hash_binary_values()`,
+  `hash_binary_indexed()` and `hash_binary_indexed_values()`
+* `HashedDocument`
+* `dedup_values()`, `dedup_binary()` and `partition_binary()`
+
+Disabling instrumentation restores the originals, so there is no overhead while it is disabled.
+
+The following are recorded:
+
+* per hash function (the `hashlib` algorithm, or the class of the ``IonHasher``): the number of
+  ``IonHasher`` instances created, and the number of ``update()`` calls, bytes, and digests
+* the number of calls to ``_escape()``, the number of bytes passed to it, and how many of those
+  calls needed to escape their input
+* per Ion type and per depth: the number of scalars and containers, and the time taken to
+  serialize and hash scalars (total, and as a histogram)
+
+Depths are only known to the event-based hashers (`hash_reader()`, `hash_writer()` and their
+counterparts);  the other hashers, including the binary hashers, record per-type statistics
+only.  Lists and sexps serialized
+in bulk by NumPy (see `hash_array()`), and their elements, are not counted.  Statistics are
+recorded in the current process only, so hashing performed by the workers of
+`parallel_hash_binary()` and `parallel_hash_values()` is not included.
+"""
+
+from time import perf_counter_ns
+
+import ionhash
+from ionhash import binary_hasher
+from ionhash import dedup
+from ionhash import digest_index
+from ionhash import document
+from ionhash import fast_value_hasher
+from ionhash import hasher
+from ionhash import numpy_hasher
+from ionhash import object_hasher
+from ionhash import partition
+
+
+_enabled = False
+
+# The original attributes replaced by enable_instrumentation(), keyed by (owner, name)
+_replaced_attributes = {}
+
+# [IonHasher instances created, update() calls, bytes passed to update(), digests], keyed by hash function name
+_hash_functions = {}
+
+# [calls, bytes, calls that escaped their input]
+_escapes = [0, 0, 0]
+
+# _Stats keyed by Ion type name, and by depth
+_types = {}
+_depths = {}
+
+
+def enable_instrumentation():
+    """Enables instrumentation of the hashing hot paths.
+
+    Statistics accumulate from one call of ``enable_instrumentation()`` to the next, until
+    ``reset_instrumentation()`` is called.
+    """
+    global _enabled
+    if _enabled:
+        return
+    for owner, name, wrapper in _instrumented_attributes():
+        _replace_attribute(owner, name, wrapper(getattr(owner, name)))
+    _enabled = True
+
+
+def disable_instrumentation():
+    """Disables instrumentation of the hashing hot paths;  statistics recorded so far are retained."""
+    global _enabled
+    if not _enabled:
+        return
+    for (owner, name), attribute in _replaced_attributes.items():
+        if attribute is None:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, attribute)
+    _replaced_attributes.clear()
+    _enabled = False
+
+
+def instrumentation_enabled():
+    """Returns True if instrumentation of the hashing hot paths is enabled."""
+    return _enabled
+
+
+def instrumentation_snapshot():
+    """Returns a snapshot of the statistics recorded while instrumentation was enabled.
+
+    Returns:
+        A dict of the form::
+
+            {
+                'hash_functions': {name: {'created': int, 'updates': int, 'bytes': int, 'digests': int}},
+                'escape': {'calls': int, 'bytes': int, 'escaped': int},
+                'types': {ion_type_name: stats},
+                'depths': {depth: stats},
+            }
+
+        where each ``stats`` is a dict of the form::
+
+            {'scalars': int, 'containers': int, 'time_ns': int, 'histogram': {upper_bound_ns: int}}
+
+        ``time_ns`` is the total time taken to serialize and hash scalars, and ``histogram``
+        counts scalars by the power of two (in nanoseconds) that bounds the time taken to
+        serialize and hash each of them.
+    """
+    return {
+        'hash_functions': {name: dict(zip(('created', 'updates', 'bytes', 'digests'), counts))
+                           for name, counts in _hash_functions.items()},
+        'escape': dict(zip(('calls', 'bytes', 'escaped'), _escapes)),
+        'types': {ion_type: stats.snapshot() for ion_type, stats in _types.items()},
+        'depths': {depth: stats.snapshot() for depth, stats in _depths.items()},
+    }
+
+
+def reset_instrumentation():
+    """Discards all statistics recorded so far."""
+    _hash_functions.clear()
+    _escapes[:] = [0, 0, 0]
+    _types.clear()
+    _depths.clear()
+
+
+def _replace_attribute(owner, name, attribute):
+    _replaced_attributes[(owner, name)] = vars(owner).get(name)
+    setattr(owner, name, attribute)
+
+
+def _instrumented_attributes():
+    """Returns (owner, name, wrapper factory) for each attribute replaced while instrumentation is
+    enabled;  attributes imported by name are replaced in each module that imports them."""
+    return [(hasher._Hasher, '__init__', _counting_hasher_init),
+            (hasher._Hasher, 'scalar', _timed_hasher_scalar),
+            (hasher._Hasher, 'step_in', _counting_hasher_step_in),
+            (fast_value_hasher, '_Frame', _counting_frame),
+            (binary_hasher, '_Frame', _counting_binary_frame),
+            (binary_hasher._BinaryHasher, '_write_scalar', _timed_binary_write_scalar),
+            (object_hasher, '_object_ion_type', _counting_object_ion_type)] \
+        + [(module, '_escape', _counting_escape)
+           for module in (hasher, fast_value_hasher, binary_hasher, document, object_hasher)] \
+        + [(module, '_s_scalar', _timed_s_scalar)
+           for module in (fast_value_hasher, document, object_hasher)] \
+        + [(module, '_resolve_hash_function_provider', _counting_resolve_hash_function_provider)
+           for module in (ionhash, binary_hasher, document, object_hasher, numpy_hasher, digest_index, dedup,
+                          partition)]
+
+
+class _Stats:
+    """The statistics recorded for an Ion type or depth."""
+    __slots__ = ['scalars', 'containers', 'time_ns', 'histogram']
+
+    def __init__(self):
+        self.scalars = 0
+        self.containers = 0
+        self.time_ns = 0
+        self.histogram = {}
+
+    def record_scalar(self, elapsed):
+        self.scalars += 1
+        self.time_ns += elapsed
+        bound = 1 << elapsed.bit_length()
+        self.histogram[bound] = self.histogram.get(bound, 0) + 1
+
+    def snapshot(self):
+        return {'scalars': self.scalars, 'containers': self.containers, 'time_ns': self.time_ns,
+                'histogram': dict(sorted(self.histogram.items()))}
+
+
+def _stats(stats_by_key, key):
+    stats = stats_by_key.get(key)
+    if stats is None:
+        stats = _Stats()
+        stats_by_key[key] = stats
+    return stats
+
+
+def _record_scalar(ion_type, depth, elapsed):
+    _stats(_types, ion_type.name).record_scalar(elapsed)
+    if depth is not None:
+        _stats(_depths, depth).record_scalar(elapsed)
+
+
+def _record_container(ion_type, depth):
+    _stats(_types, ion_type.name).containers += 1
+    if depth is not None:
+        _stats(_depths, depth).containers += 1
+
+
+class _CountingHash(hasher.IonHasher):
+    """Counts the calls made to an IonHasher, and the bytes passed to it."""
+    def __init__(self, hash_function):
+        self._hash_function = hash_function
+        name = getattr(hash_function, '_algorithm', None) or type(hash_function).__qualname__
+        counts = _hash_functions.get(name)
+        if counts is None:
+            counts = [0, 0, 0, 0]
+            _hash_functions[name] = counts
+        counts[0] += 1
+        self._counts = counts
+
+    def update(self, _bytes):
+        self._counts[1] += 1
+        self._counts[2] += len(_bytes)
+        self._hash_function.update(_bytes)
+
+    def digest(self):
+        self._counts[3] += 1
+        return self._hash_function.digest()
+
+
+def _counting_hash(hash_function):
+    if isinstance(hash_function, hasher._MultiHash):
+        # each of the hash functions is counted separately;  the provider's _MultiHash is left as it is
+        return hasher._MultiHash(hash_function._names,
+                                 [_CountingHash(hf) for hf in hash_function._hash_functions])
+    return _CountingHash(hash_function)
+
+
+def _counting_provider(hash_function_provider):
+    return lambda: _counting_hash(hash_function_provider())
+
+
+def _counting_resolve_hash_function_provider(resolve):
+    def _f(algorithm, hash_function_provider):
+        return _counting_provider(resolve(algorithm, hash_function_provider))
+    return _f
+
+
+def _counting_hasher_init(init):
+    def _f(self, hash_function_provider):
+        init(self, _counting_provider(hash_function_provider))
+    return _f
+
+
+def _timed_hasher_scalar(scalar):
+    def _f(self, ion_event):
+        start = perf_counter_ns()
+        scalar(self, ion_event)
+        _record_scalar(ion_event.ion_type, ion_event.depth, perf_counter_ns() - start)
+    return _f
+
+
+def _counting_hasher_step_in(step_in):
+    def _f(self, ion_event):
+        _record_container(ion_event.ion_type, ion_event.depth)
+        step_in(self, ion_event)
+    return _f
+
+
+def _counting_frame(frame):
+    def _f(value, *args):
+        _record_container(value.ion_type, None)
+        return frame(value, *args)
+    return _f
+
+
+def _counting_binary_frame(frame):
+    def _f(tid, *args):
+        _record_container(binary_hasher._ION_TYPES[tid], None)
+        return frame(tid, *args)
+    return _f
+
+
+def _timed_binary_write_scalar(write_scalar):
+    # binary_hasher's own calls to _s_scalar() are not wrapped, so scalars are counted only here
+    def _f(self, hash_fn, tid, ln, start, end):
+        start_ns = perf_counter_ns()
+        write_scalar(self, hash_fn, tid, ln, start, end)
+        _record_scalar(binary_hasher._ION_TYPES[tid], None, perf_counter_ns() - start_ns)
+    return _f
+
+
+def _counting_object_ion_type(object_ion_type):
+    def _f(obj, from_type):
+        ion_type = object_ion_type(obj, from_type)
+        if ion_type is not None and ion_type.is_container:
+            _record_container(ion_type, None)
+        return ion_type
+    return _f
+
+
+def _timed_s_scalar(s_scalar):
+    def _f(value, ion_type, is_ion_null):
+        start = perf_counter_ns()
+        result = s_scalar(value, ion_type, is_ion_null)
+        _record_scalar(ion_type, None, perf_counter_ns() - start)
+        return result
+    return _f
+
+
+def _counting_escape(escape):
+    def _f(_bytes):
+        result = escape(_bytes)
+        _escapes[0] += 1
+        _escapes[1] += len(_bytes)
+        # a memoryview is returned as a copy, whether or not anything was escaped
+        if len(result) != len(_bytes):
+            _escapes[2] += 1
+        return result
+    return _f
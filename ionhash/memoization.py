@@ -0,0 +1,222 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Opt-in memoization of the Ion hashes computed by the `ion_hash()` method of simpleion values.
+
+While memoization is enabled, each simpleion value remembers its digest per algorithm (or
+hash_function_provider), and each struct within a hashed value remembers the digests of its
+fields, so hashing an unchanged value again is O(1), and hashing a value after part of it has
+changed only traverses the structs that enclose the change.
+
+Memoized digests are invalidated when a value is mutated:  the mutating methods of `IonPyList`
+and `IonPyDict`, and assignments to the `ion_type` and `ion_annotations` attributes of any
+simpleion value, invalidate the memoized digests of the value and of every container it has
+been hashed as a part of.
+"""
+
+import weakref
+
+from amazon.ion.simple_types import IonPyDict
+from amazon.ion.simple_types import IonPyList
+from amazon.ion.simple_types import _IonNature
+
+from ionhash.fast_value_hasher import _write_value
+
+
+_MEMO_ATTRIBUTE = '_ion_hash_memo'
+
+# Methods that mutate the contents of simpleion containers
+_MUTATING_METHODS = {
+    IonPyList: ['__setitem__', '__delitem__', '__iadd__', '__imul__',
+                'append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'],
+    # the other mutating methods of MutableMapping are implemented in terms of these
+    IonPyDict: ['__setitem__', '__delitem__', 'add_item'],
+}
+
+# Attributes of simpleion values that are included in their Ion hashes
+_HASHED_ATTRIBUTES = frozenset(['ion_type', 'ion_annotations'])
+
+_enabled = False
+
+# Incremented each time memoization is enabled, as mutations made while it was disabled were not tracked
+_generation = 0
+
+# The original class attributes replaced by enable_memoization(), keyed by (class, name)
+_replaced_attributes = {}
+
+
+def enable_memoization():
+    """Enables memoization of the digests computed by the `ion_hash()` method of simpleion values.
+
+    While enabled, mutating simpleion containers and assigning `ion_type` or `ion_annotations`
+    is slightly slower, as each mutation invalidates the affected memoized digests.  Mutations
+    that bypass the methods of `IonPyList` and `IonPyDict` (for example, mutating the sequence
+    returned by ``IonPyDict.get_all_values()``) are not detected;  ``invalidate()`` must be
+    called after such mutations.
+
+    Digests are memoized per algorithm, or per hash_function_provider object; a provider must
+    therefore always return hash functions for the same algorithm.
+    """
+    global _enabled, _generation
+    if _enabled:
+        return
+    for cls, names in _MUTATING_METHODS.items():
+        for name in names:
+            _replace_attribute(cls, name, _invalidating(getattr(cls, name)))
+    _replace_attribute(_IonNature, '__setattr__', _invalidating_setattr)
+    _generation += 1
+    _enabled = True
+
+
+def disable_memoization():
+    """Disables memoization of the digests computed by the `ion_hash()` method of simpleion values,
+    and discards all memoized digests."""
+    global _enabled
+    if not _enabled:
+        return
+    for (cls, name), attribute in _replaced_attributes.items():
+        if attribute is None:
+            delattr(cls, name)
+        else:
+            setattr(cls, name, attribute)
+    _replaced_attributes.clear()
+    _enabled = False
+
+
+def memoization_enabled():
+    """Returns True if memoization of Ion hashes is enabled."""
+    return _enabled
+
+
+def invalidate(value):
+    """Discards the memoized digests of the given simpleion value, and of the containers it has
+    been hashed as a part of.  Only needed after a mutation that is not detected automatically
+    (see ``enable_memoization()``).
+    """
+    _invalidate(value)
+
+
+def _replace_attribute(cls, name, attribute):
+    _replaced_attributes[(cls, name)] = cls.__dict__.get(name)
+    setattr(cls, name, attribute)
+
+
+def _invalidating(method):
+    def _f(self, *args, **kwargs):
+        _invalidate(self)
+        return method(self, *args, **kwargs)
+    _f.__name__ = method.__name__
+    _f.__doc__ = method.__doc__
+    return _f
+
+
+def _invalidating_setattr(self, name, value):
+    if name in _HASHED_ATTRIBUTES:
+        _invalidate(self)
+    object.__setattr__(self, name, value)
+
+
+class _Memo:
+    """The memoized state of a simpleion value.
+
+    Attributes:
+        valid: whether any digests computed since the value was last invalidated depend on the value
+        digests: the Ion hash of the value, keyed by algorithm or hash_function_provider
+        bodies: for structs, escape(concat(sort(H(field1), ..., H(fieldn)))), keyed like digests
+        parents: weak references to the containers the value was hashed as a part of
+    """
+    __slots__ = ['generation', 'valid', 'digests', 'bodies', 'parents']
+
+    def __init__(self):
+        self.generation = _generation
+        self.valid = False
+        self.digests = {}
+        self.bodies = {}
+        self.parents = []
+
+
+def _memo_for(value):
+    memo = value.__dict__.get(_MEMO_ATTRIBUTE)
+    if memo is None or memo.generation != _generation:
+        memo = _Memo()
+        value.__dict__[_MEMO_ATTRIBUTE] = memo
+    return memo
+
+
+def _valid_memo(value):
+    memo = value.__dict__.get(_MEMO_ATTRIBUTE)
+    if memo is None or not memo.valid or memo.generation != _generation:
+        return None
+    return memo
+
+
+# If a value is not valid, no memoized digest depends on it, so its ancestors need not be visited:
+# any ancestor whose digest was memoized after the value was last invalidated would have
+# traversed the value, and made it valid.
+def _invalidate(value):
+    values = [value]
+    while values:
+        memo = _valid_memo(values.pop())
+        if memo is None:
+            continue
+        memo.valid = False
+        memo.digests.clear()
+        memo.bodies.clear()
+        for parent_ref in memo.parents:
+            parent = parent_ref()
+            if parent is not None:
+                values.append(parent)
+
+
+def _memoized_hash_value(value, key, hfp):
+    """Returns the (possibly memoized) Ion hash of value, computed using hfp;  key identifies the
+    hash algorithm."""
+    memo = _valid_memo(value)
+    digest = None if memo is None else memo.digests.get(key)
+    if digest is None:
+        hash_fn = hfp()
+        _write_value(value, hfp, hash_fn, [], _MemoContext(key))
+        digest = hash_fn.digest()
+        memo = _memo_for(value)
+        memo.digests[key] = digest
+        memo.valid = True
+    return digest
+
+
+class _MemoContext:
+    """Memoizes struct bodies, and records which containers each value is a part of, while a value
+    is hashed by fast_value_hasher._write_value()."""
+    __slots__ = ['key']
+
+    def __init__(self, key):
+        self.key = key
+
+    def struct_body(self, value):
+        memo = _valid_memo(value)
+        return None if memo is None else memo.bodies.get(self.key)
+
+    def store_struct_body(self, value, body):
+        memo = _memo_for(value)
+        memo.bodies[self.key] = body
+        memo.valid = True
+
+    def link(self, child, parent):
+        memo = _memo_for(child)
+        memo.valid = True
+        parents = memo.parents
+        for parent_ref in parents:
+            if parent_ref() is parent:
+                return
+        # simpleion containers are unhashable, so a WeakSet cannot be used
+        memo.parents = [parent_ref for parent_ref in parents if parent_ref() is not None]
+        memo.parents.append(weakref.ref(parent))
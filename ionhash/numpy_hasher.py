@@ -0,0 +1,194 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Vectorized serialization of homogeneous numeric lists, using NumPy if it is installed.
+
+The elements of a list or sexp of (non-null, unannotated) floats, or of ints that fit in 64 bits,
+are serialized by a handful of array operations rather than one at a time;  `hash_array()` hashes
+a NumPy array as an Ion list in the same way.  If NumPy is not installed, lists are serialized by
+the scalar path, and `hash_array()` raises an exception.
+"""
+
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyFloat
+from amazon.ion.simple_types import IonPyInt
+
+from ionhash.hasher import _BEGIN_MARKER_BYTE, _END_MARKER, _END_MARKER_BYTE, _ESCAPE_BYTE, \
+    _TQ, _TQ_NEGATIVE_INT, _resolve_hash_function_provider
+
+# NumPy, which is imported by _numpy() when it is first needed (so that importing ionhash doesn't
+# import it), or None if it isn't installed
+np = _NOT_IMPORTED = object()
+
+
+# The range of the ints that are serialized in bulk, as int64s
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+# Lists shorter than this are serialized by the scalar path, which is faster for so few elements
+_MIN_VECTORIZED_LENGTH = 32
+
+# The number of elements serialized at a time, bounding the size of the intermediate arrays
+_CHUNK_LENGTH = 16 * 1024
+
+_LIST_START = bytes([_BEGIN_MARKER_BYTE, _TQ[IonType.LIST]])
+
+# The IonPy class of the elements of each vectorizable Ion type
+_ELEMENT_CLASSES = {
+    IonType.FLOAT: IonPyFloat,
+    IonType.INT: IonPyInt,
+}
+
+
+def hash_array(array, algorithm=None, hash_function_provider=None):
+    """Given a one-dimensional NumPy array of floats or ints and an algorithm or
+    hash_function_provider, computes the Ion hash of the Ion list of the array's elements.
+
+    The elements of arrays with a floating-point dtype are hashed as Ion floats (which are 64-bit),
+    and those of arrays with an integer dtype as Ion ints, so the result is the same as the Ion
+    hash of the equivalent simpleion list.
+
+    Args:
+        array:
+            A one-dimensional NumPy array with a floating-point or integer dtype.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+    Returns:
+        `bytes` that represent the Ion hash of the array for the specified algorithm
+        or hash_function_provider.
+    """
+    if _numpy() is None:
+        raise Exception("hash_array() requires NumPy")
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    array = np.asarray(array)
+    if array.ndim != 1:
+        raise Exception("Only one-dimensional arrays may be hashed, not arrays of shape %s" % (array.shape,))
+    if np.issubdtype(array.dtype, np.floating):
+        serialize = _serialize_floats
+    elif np.issubdtype(array.dtype, np.integer):
+        serialize = _serialize_ints
+    else:
+        raise Exception("Unable to hash an array of dtype %s" % array.dtype)
+
+    hash_fn = hfp()
+    hash_fn.update(_LIST_START)
+    for i in range(0, len(array), _CHUNK_LENGTH):
+        hash_fn.update(serialize(array[i:i + _CHUNK_LENGTH]))
+    hash_fn.update(_END_MARKER)
+    return hash_fn.digest()
+
+
+def _numpy():
+    """Returns the numpy module, importing it if it hasn't been, or None if it isn't installed."""
+    global np
+    if np is _NOT_IMPORTED:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def _serialized_elements(values):
+    """Returns an iterator of `bytes` that together are s(value) for each of the given list or sexp
+    elements, or None if NumPy is not installed or the elements can't be serialized in bulk."""
+    if len(values) < _MIN_VECTORIZED_LENGTH:
+        return None
+    ion_type = values[0].ion_type
+    cls = _ELEMENT_CLASSES.get(ion_type)
+    if cls is None:
+        return None
+    for value in values:
+        # excludes nulls (IonPyNull) and, as IonPyBool is IonPyInt, bools
+        if type(value) is not cls or value.ion_type is not ion_type or value.ion_annotations:
+            return None
+    if ion_type is IonType.INT and (min(values) < _INT64_MIN or max(values) > _INT64_MAX):
+        return None
+    if _numpy() is None:
+        return None
+    return _serialized_chunks(values, ion_type)
+
+
+def _serialized_chunks(values, ion_type):
+    """Yields s(value) for each of the given list or sexp elements, a chunk of elements at a time, so
+    that only one chunk's intermediate arrays are held in memory at once."""
+    dtype = np.float64 if ion_type is IonType.FLOAT else np.int64
+    serialize = _serialize_floats if ion_type is IonType.FLOAT else _serialize_ints
+    for i in range(0, len(values), _CHUNK_LENGTH):
+        elements = values[i:i + _CHUNK_LENGTH]
+        yield serialize(np.fromiter(elements, dtype, len(elements)))
+
+
+def _serialize_floats(array):
+    """Returns s(value) for each element of the given array, as Ion floats."""
+    array = array.astype(np.float64, copy=False)
+    octets = array.astype('>f8').view(np.uint8).reshape(-1, 8)
+    # positive zero has an empty representation
+    positive_zero = (array == 0) & ~np.signbit(array)
+    has_octet = np.broadcast_to(~positive_zero[:, None], octets.shape)
+    return _serialize(octets, has_octet, _TQ[IonType.FLOAT])
+
+
+def _serialize_ints(array):
+    """Returns s(value) for each element of the given array, as Ion ints."""
+    if np.issubdtype(array.dtype, np.unsignedinteger):
+        magnitudes = array.astype(np.uint64, copy=False)
+        tq = _TQ[IonType.INT]
+    else:
+        array = array.astype(np.int64, copy=False)
+        # the absolute value of the most negative int64 wraps around, but is correct as a uint64
+        magnitudes = np.abs(array).view(np.uint64)
+        tq = np.where(array < 0, np.uint8(_TQ_NEGATIVE_INT), np.uint8(_TQ[IonType.INT]))
+    octets = magnitudes.astype('>u8').view(np.uint8).reshape(-1, 8)
+    # the representation is the magnitude without leading zero octets (and is empty for zero)
+    has_octet = np.logical_or.accumulate(octets != 0, axis=1)
+    return _serialize(octets, has_octet, tq)
+
+
+# Each element is serialized into a row of slots:  B, TQ, an escape slot preceding each of the 8
+# octets, and E;  the slots that are not needed are then dropped.
+_SLOTS = 2 + 2 * 8 + 1
+
+
+def _serialize(octets, has_octet, tq):
+    """Returns B || TQ || escape(representation) || E for each row of the given octets, where the
+    representation of each row is its octets for which has_octet is True."""
+    escaped = (octets == _BEGIN_MARKER_BYTE) | (octets == _ESCAPE_BYTE) | (octets == _END_MARKER_BYTE)
+    if has_octet.all() and not escaped.any():
+        # every element is B || TQ || its 8 octets || E
+        rows = np.empty((len(octets), 11), np.uint8)
+        rows[:, 0] = _BEGIN_MARKER_BYTE
+        rows[:, 1] = tq
+        rows[:, 2:10] = octets
+        rows[:, 10] = _END_MARKER_BYTE
+        return rows.tobytes()
+
+    slots = np.empty((len(octets), _SLOTS), np.uint8)
+    slots[:, 0] = _BEGIN_MARKER_BYTE
+    slots[:, 1] = tq
+    slots[:, 2:-1:2] = _ESCAPE_BYTE
+    slots[:, 3:-1:2] = octets
+    slots[:, -1] = _END_MARKER_BYTE
+
+    keep = np.ones(slots.shape, np.bool_)
+    keep[:, 2:-1:2] = has_octet & escaped
+    keep[:, 3:-1:2] = has_octet
+    # np.compress() is considerably faster than indexing with a boolean array
+    return np.compress(keep.ravel(), slots.ravel()).tobytes()
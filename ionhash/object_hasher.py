@@ -0,0 +1,163 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Hashes plain Python values (dicts, lists, strs, ints, Decimals, datetimes, bytes, etc.)
+directly, without first converting them to simpleion values."""
+
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import _IonNature
+from amazon.ion.simpleion import _FROM_TYPE
+from amazon.ion.simpleion import _FROM_TYPE_TUPLE_AS_SEXP
+from amazon.ion.simpleion import _ion_type
+
+from ionhash.fast_value_hasher import _s_scalar, _write_symbol, _write_value, _CONTAINER_START
+from ionhash.hasher import _resolve_hash_function_provider, _sort_field_hashes, _escape, _END_MARKER, \
+    _TQ, _BEGIN_MARKER_BYTE, _is_chunked, _update_escaped, _MultiHash
+
+
+def hash_object(obj, algorithm=None, hash_function_provider=None, tuple_as_sexp=False):
+    """Given a plain Python value and an algorithm or hash_function_provider, computes the Ion
+    hash of the Ion value that ``simpleion.dumps()`` would write for it, without converting it.
+
+    Python types are mapped to Ion types as by ``simpleion.dumps()``:  None is null, and bool,
+    int, float, Decimal, datetime (and Timestamp), str, bytes, and SymbolToken values are bools,
+    ints, floats, decimals, timestamps, strings, blobs, and symbols;  lists and tuples are lists
+    (tuples are sexps if tuple_as_sexp is True), and dicts are structs.  simpleion values may
+    appear anywhere within obj, and are hashed as by their ``ion_hash()`` method.
+
+    An object whose class defines ``__ion_hash_fields__`` is hashed as a struct.  The attribute
+    may be a sequence of the names of the attributes that are the struct's fields (which suits
+    dataclasses), or a method that returns an iterable of (field name, value) pairs.
+
+    Args:
+        obj:
+            The value to hash.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+        tuple_as_sexp:
+            If True, tuples are hashed as sexps rather than lists.
+
+    Returns:
+        `bytes` that represent the Ion hash of obj for the specified algorithm
+        or hash_function_provider.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    hash_fn = hfp()
+    _write_object(obj, hfp, hash_fn, [], _FROM_TYPE_TUPLE_AS_SEXP if tuple_as_sexp else _FROM_TYPE)
+    return hash_fn.digest()
+
+
+# The Ion type of each plain Python type that has been hashed, keyed by from_type mapping
+_ION_TYPES = {id(_FROM_TYPE): {}, id(_FROM_TYPE_TUPLE_AS_SEXP): {}}
+
+# Marks the end of a container's children
+_END = object()
+
+
+class _Frame:
+    """The traversal state of a container whose children are being written."""
+    __slots__ = ['children', 'hash_fn', 'field_hash_fn', 'field_hashes', 'in_field']
+
+    def __init__(self, children, hash_fn, field_hash_fn=None, field_hashes=None):
+        self.children = children
+        self.hash_fn = hash_fn
+        self.field_hash_fn = field_hash_fn
+        self.field_hashes = field_hashes
+        self.in_field = False
+
+
+def _object_ion_type(obj, from_type):
+    """Returns the Ion type of the given plain Python value, or None if it is a simpleion value."""
+    ion_types = _ION_TYPES[id(from_type)]
+    cls = type(obj)
+    ion_type = ion_types.get(cls)
+    if ion_type is None:
+        if isinstance(obj, _IonNature):
+            return None
+        if getattr(cls, '__ion_hash_fields__', None) is not None:
+            ion_type = IonType.STRUCT
+        else:
+            ion_type = _ion_type(obj, from_type)
+        ion_types[cls] = ion_type
+    return ion_type
+
+
+def _object_fields(obj):
+    """Returns an iterator of the (field name, value) pairs of the given struct-like value."""
+    fields = getattr(type(obj), '__ion_hash_fields__', None)
+    if fields is None:
+        return iter(obj.items())
+    if callable(fields):
+        return iter(obj.__ion_hash_fields__())
+    return ((name, getattr(obj, name)) for name in fields)
+
+
+# Writes s(obj) to hash_fn;  the counterpart of fast_value_hasher._write_value() for plain Python
+# values, which delegates to it for any simpleion values encountered.
+def _write_object(obj, hfp, hash_fn, free_hashers, from_type):
+    stack = []
+    while True:
+        ion_type = _object_ion_type(obj, from_type)
+        if ion_type is None:
+            _write_value(obj, hfp, hash_fn, free_hashers)
+        elif ion_type is IonType.STRUCT:
+            hash_fn.update(_CONTAINER_START[ion_type])
+            field_hash_fn = free_hashers.pop() if free_hashers else hfp()
+            stack.append(_Frame(_object_fields(obj), hash_fn, field_hash_fn, []))
+        elif ion_type is IonType.LIST or ion_type is IonType.SEXP:
+            hash_fn.update(_CONTAINER_START[ion_type])
+            stack.append(_Frame(iter(obj), hash_fn))
+        elif obj is not None and _is_chunked(ion_type, obj):
+            hash_fn.update(bytes([_BEGIN_MARKER_BYTE, _TQ[ion_type]]))
+            _update_escaped(hash_fn.update, obj)
+            hash_fn.update(_END_MARKER)
+        else:
+            hash_fn.update(_s_scalar(obj, ion_type, obj is None))
+
+        # find the next value to write, closing any containers that have been exhausted
+        while stack:
+            frame = stack[-1]
+            field_hashes = frame.field_hashes
+            if frame.in_field:
+                field_hashes.append(frame.field_hash_fn.digest())
+            child = next(frame.children, _END)
+            if child is _END:
+                stack.pop()
+                if field_hashes is None:
+                    frame.hash_fn.update(_END_MARKER)
+                elif type(frame.hash_fn) is _MultiHash:
+                    frame.hash_fn.update_field_hashes(field_hashes)
+                    frame.hash_fn.update(_END_MARKER)
+                    free_hashers.append(frame.field_hash_fn)
+                else:
+                    _sort_field_hashes(field_hashes)
+                    frame.hash_fn.update(_escape(b''.join(field_hashes)) + _END_MARKER)
+                    free_hashers.append(frame.field_hash_fn)
+                continue
+            if field_hashes is None:
+                obj = child
+                hash_fn = frame.hash_fn
+            else:
+                field_name, obj = child
+                hash_fn = frame.field_hash_fn
+                hash_fn.update(_write_symbol(field_name))
+                frame.in_field = True
+            break
+        else:
+            return
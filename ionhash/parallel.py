@@ -0,0 +1,187 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Computes the Ion hashes of many values in parallel, using a pool of worker processes."""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+import amazon.ion.simpleion as ion
+
+from ionhash.binary_hasher import hash_binary
+from ionhash.hasher import _resolve_hash_function_provider
+
+
+# Target size, in bytes of binary Ion, of the work sent to a worker process in a single task
+_DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Number of values serialized for the first task of parallel_hash_values(), before
+# their serialized size is known
+_INITIAL_VALUES_PER_CHUNK = 64
+
+# Maximum number of tasks submitted (per worker) but not yet consumed
+_TASKS_IN_FLIGHT_PER_WORKER = 4
+
+
+def parallel_hash_binary(records, algorithm=None, hash_function_provider=None, catalog=None,
+                         max_workers=None, chunk_size=_DEFAULT_CHUNK_SIZE, executor=None):
+    """Given an iterable of binary Ion records and an algorithm or hash_function_provider, computes
+    the Ion hash of each record using a pool of worker processes.
+
+    Consecutive records are concatenated into chunks of approximately `chunk_size` bytes, each of
+    which is hashed by a worker using `hash_binary()`; a record larger than `chunk_size` is sent
+    to a worker on its own.  Digests are yielded in the order of the records, while at most a
+    few chunks per worker are in flight, so a chunk that is slow to hash does not stall the
+    other workers.
+
+    Args:
+        records:
+            An iterable of `bytes`-like objects, each containing binary Ion data (beginning with
+            an Ion version marker) that represents a single top-level value.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.  As it is sent to the
+            worker processes, it must be picklable (e.g. a module-level function).
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+        max_workers:
+            The number of worker processes to create; defaults to the number of processors.
+            Ignored if `executor` is specified.
+
+        chunk_size:
+            The approximate number of bytes of binary Ion hashed by a worker in a single task.
+
+        executor:
+            An optional ``concurrent.futures.Executor`` to submit work to, instead of creating
+            a new ``ProcessPoolExecutor``.
+
+    Returns:
+        A generator that yields `bytes` that represent the Ion hash of each record, in order.
+    """
+    _resolve_hash_function_provider(algorithm, hash_function_provider)
+    return _parallel_hash(_record_chunks(records, chunk_size),
+                          algorithm, hash_function_provider, catalog, max_workers, executor)
+
+
+def parallel_hash_values(values, algorithm=None, hash_function_provider=None,
+                         max_workers=None, chunk_size=_DEFAULT_CHUNK_SIZE, executor=None):
+    """Given an iterable of simpleion values and an algorithm or hash_function_provider, computes
+    the Ion hash of each value using a pool of worker processes.
+
+    Values are sent to the workers as binary Ion rather than as pickled simpleion values.  The
+    number of values serialized per chunk is adjusted as values are consumed so that each chunk
+    is approximately `chunk_size` bytes.
+
+    Note that serializing the values is performed by the calling process; this is only
+    beneficial when ion-python's C extension is available.  Where values are already available
+    as binary Ion, use ``parallel_hash_binary()`` instead.
+
+    Args:
+        values:
+            An iterable of simpleion values.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.  As it is sent to the
+            worker processes, it must be picklable (e.g. a module-level function).
+
+        max_workers:
+            The number of worker processes to create; defaults to the number of processors.
+            Ignored if `executor` is specified.
+
+        chunk_size:
+            The approximate number of bytes of binary Ion hashed by a worker in a single task.
+
+        executor:
+            An optional ``concurrent.futures.Executor`` to submit work to, instead of creating
+            a new ``ProcessPoolExecutor``.
+
+    Returns:
+        A generator that yields `bytes` that represent the Ion hash of each value, in order.
+    """
+    _resolve_hash_function_provider(algorithm, hash_function_provider)
+    return _parallel_hash(_value_chunks(values, chunk_size),
+                          algorithm, hash_function_provider, None, max_workers, executor)
+
+
+def _record_chunks(records, chunk_size):
+    """Yields (data, count) pairs, where data is the concatenation of count consecutive records."""
+    chunk = []
+    size = 0
+    for record in records:
+        if len(record) >= chunk_size:
+            # large records are hashed on their own, rather than delaying the records before them
+            if chunk:
+                yield b''.join(chunk), len(chunk)
+                chunk = []
+                size = 0
+            yield record, 1
+            continue
+        chunk.append(record)
+        size += len(record)
+        if size >= chunk_size:
+            yield b''.join(chunk), len(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b''.join(chunk), len(chunk)
+
+
+def _value_chunks(values, chunk_size):
+    """Yields (data, count) pairs, where data is the binary Ion serialization of count consecutive values."""
+    values = iter(values)
+    count = _INITIAL_VALUES_PER_CHUNK
+    while True:
+        chunk = list(islice(values, count))
+        if not chunk:
+            return
+        data = ion.dumps(chunk, binary=True, sequence_as_stream=True)
+        yield data, len(chunk)
+        count = max(1, int(chunk_size * len(chunk) / len(data)))
+
+
+def _parallel_hash(chunks, algorithm, hash_function_provider, catalog, max_workers, executor):
+    if executor is None:
+        with ProcessPoolExecutor(max_workers) as executor:
+            yield from _parallel_hash(chunks, algorithm, hash_function_provider, catalog, max_workers, executor)
+        return
+
+    max_in_flight = (max_workers or os.cpu_count() or 1) * _TASKS_IN_FLIGHT_PER_WORKER
+    in_flight = deque()
+    for (data, count) in chunks:
+        in_flight.append(executor.submit(_hash_chunk, data, count, algorithm, hash_function_provider, catalog))
+        if len(in_flight) >= max_in_flight:
+            yield from in_flight.popleft().result()
+    while in_flight:
+        yield from in_flight.popleft().result()
+
+
+def _hash_chunk(data, count, algorithm, hash_function_provider, catalog):
+    """Executed by a worker process; returns the digests of the top-level values in data."""
+    digests = hash_binary(data, algorithm, hash_function_provider, catalog)
+    if len(digests) != count:
+        raise Exception("Expected %d top-level values, found %d; each record must contain exactly one value"
+                        % (count, len(digests)))
+    return digests
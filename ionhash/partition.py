@@ -0,0 +1,121 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Partitions the top-level values of binary Ion data into shards, by their Ion hash."""
+
+from bisect import bisect_right
+from functools import lru_cache
+import hashlib
+
+from ionhash.binary_hasher import _BinaryHasher, _RecordWriter
+from ionhash.hasher import _resolve_hash_function_provider
+
+
+# The number of points on a consistent-hash ring per shard
+_VIRTUAL_NODES = 128
+
+# The bytes buffered per shard are at most this, and at least _MIN_SHARD_BUFFER_SIZE
+_MAX_SHARD_BUFFER_SIZE = 1 << 20
+_MIN_SHARD_BUFFER_SIZE = 1 << 16
+
+# The bytes buffered for all of the shards, unless each is buffered at least _MIN_SHARD_BUFFER_SIZE
+_TOTAL_BUFFER_SIZE = 64 << 20
+
+
+def shard_index(digest, shard_count, ring=False):
+    """Returns the shard, of shard_count shards, to which a value with the given Ion hash
+    belongs, as determined by ``partition_binary()``.
+
+    Args:
+        digest:
+            The `bytes` of a value's Ion hash.
+
+        shard_count:
+            The number of shards.
+
+        ring:
+            If False, the shard is determined by the leading 8 bytes of the digest scaled to
+            shard_count, which divides values evenly, but assigns most values to a different
+            shard if shard_count changes.  If True, the shard is determined by a consistent-hash
+            ring, which divides values slightly less evenly, but assigns only about 1/shard_count
+            of the values to a different shard if shard_count is incremented or decremented.
+
+    Returns:
+        An `int` between 0 and shard_count - 1.
+    """
+    key = int.from_bytes(digest[:8], 'big')
+    if not ring:
+        return key * shard_count >> 64
+    points, shards = _ring(shard_count)
+    return shards[bisect_right(points, key) % len(points)]
+
+
+@lru_cache(maxsize=16)
+def _ring(shard_count):
+    """Returns the sorted positions of the points of a consistent-hash ring of shard_count shards,
+    and the shard of each point."""
+    nodes = sorted((int.from_bytes(hashlib.md5(b'%d:%d' % (shard, node)).digest()[:8], 'big'), shard)
+                   for shard in range(shard_count) for node in range(_VIRTUAL_NODES))
+    return [position for (position, shard) in nodes], [shard for (position, shard) in nodes]
+
+
+def partition_binary(buffer, outs, algorithm=None, hash_function_provider=None, catalog=None, ring=False):
+    """Given binary Ion data, a sequence of binary files and an algorithm or hash_function_provider,
+    writes each top-level value of the data to the file of the shard (as determined by
+    ``shard_index()``) to which its Ion hash belongs.
+
+    The values are written as binary Ion, as they are in the data (without being decoded and
+    re-encoded), along with the local symbol tables needed to read them.  Each file's writes are
+    buffered, and passed to it in blocks of up to 1 MiB.
+
+    Args:
+        buffer:
+            A `bytes`-like object (such as an `mmap`) that contains binary Ion data, beginning
+            with an Ion version marker.
+
+        outs:
+            A sequence of binary files (or other objects with a `write()` method that accepts
+            `bytes`), one per shard.
+
+        algorithm:
+            A string corresponding to the name of a hash algorithm supported
+            by the `hashlib` module.
+
+        hash_function_provider:
+            A function that returns a new ``IonHasher`` instance when called.
+
+        catalog:
+            An optional ``SymbolTableCatalog`` used to resolve shared symbol tables imported
+            by local symbol tables.
+
+        ring:
+            If True, values are assigned to shards by a consistent-hash ring;  see ``shard_index()``.
+
+    Returns:
+        A list of the number of values written to each file.
+    """
+    hfp = _resolve_hash_function_provider(algorithm, hash_function_provider)
+    shard_count = len(outs)
+    buffer_size = max(_MIN_SHARD_BUFFER_SIZE, min(_MAX_SHARD_BUFFER_SIZE, _TOTAL_BUFFER_SIZE // shard_count))
+    writers = [_RecordWriter(out, buffer_size) for out in outs]
+    counts = [0] * shard_count
+    view = memoryview(buffer).cast('B')
+    for start, end, digest, local_symbol_tables in _BinaryHasher(buffer, hfp, catalog).hash_values():
+        if not isinstance(digest, bytes):
+            raise Exception("Only hash functions whose digests are bytes may be used to partition values")
+        shard = shard_index(digest, shard_count, ring)
+        writers[shard].write(view, start, end, local_symbol_tables)
+        counts[shard] += 1
+    for writer in writers:
+        writer.flush()
+    return counts
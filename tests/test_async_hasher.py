@@ -0,0 +1,160 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import asyncio
+from io import BytesIO
+
+import amazon.ion.simpleion as ion
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader import SKIP_EVENT
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_managed import managed_reader
+from amazon.ion.reader_text import text_reader
+from amazon.ion.writer import blocking_writer
+from amazon.ion.writer_binary import binary_writer
+
+from ionhash import AsyncHashReader, AsyncHashWriter
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hash_writer
+from ionhash.hasher import hashlib_hash_function_provider
+from ionhash.hasher import HashEvent
+
+from .util import binary_reader_over_bytes
+from .util import consume
+from .util import hash_function_provider
+
+_ION_STR = '[1, 2, {a: 3, b: (4 {c: 5} 6), d: [] }, 7] {e: "f"} g::8'
+_ION_BYTES = ion.dumps(ion.loads(_ION_STR, single_value=False), binary=True, sequence_as_stream=True)
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+async def _iterate(chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+async def _consume(reader, skip_list=[]):
+    skip_set = set(skip_list)
+    events = []
+    i = -1
+    while True:
+        i += 1
+        event = await reader.send(SKIP_EVENT if i in skip_set else NEXT_EVENT)
+        events.append(event)
+        if event.event_type == IonEventType.STREAM_END:
+            break
+    return events
+
+
+def _expected(skip_list):
+    hr = hash_reader(binary_reader_over_bytes(_ION_BYTES), hash_function_provider("md5"))
+    events = consume(hr, skip_list)
+    return events, hr.send(HashEvent.DIGEST)
+
+
+def test_async_hash_reader():
+    data = _ION_BYTES
+    for chunk_size in [1, 7, len(data)]:
+        for skip_list in [[], [1], [3], [5], [3, 9]]:
+            async def _run():
+                reader = AsyncHashReader(managed_reader(binary_reader(), None), _iterate(_chunks(data, chunk_size)),
+                                         hash_function_provider("md5"))
+                events = await _consume(reader, skip_list)
+                return events, await reader.send(HashEvent.DIGEST)
+
+            assert asyncio.run(_run()) == _expected(skip_list)
+
+
+def test_async_hash_reader_stream_reader():
+    data = _ION_BYTES
+
+    async def _run():
+        stream = asyncio.StreamReader()
+
+        async def _feed():
+            for chunk in _chunks(data, 5):
+                stream.feed_data(chunk)
+                await asyncio.sleep(0)
+            stream.feed_eof()
+
+        feeder = asyncio.ensure_future(_feed())
+        reader = AsyncHashReader(managed_reader(binary_reader(), None), stream, hash_function_provider("md5"),
+                                 buffer_size=3)
+        events = [event async for event in reader]
+        await feeder
+        return events, await reader.send(HashEvent.DIGEST)
+
+    expected_events, expected_digest = _expected([])
+    assert asyncio.run(_run()) == (expected_events[:-1], expected_digest)
+
+
+def test_async_hash_reader_text():
+    async def _run():
+        reader = AsyncHashReader(managed_reader(text_reader(), None), _iterate(_chunks(_ION_STR.encode(), 4)),
+                                 hash_function_provider("md5"))
+        events = await _consume(reader)
+        return events[-2].value, await reader.send(HashEvent.DIGEST)
+
+    assert asyncio.run(_run()) == (8, _expected([])[1])
+
+
+def test_async_hash_reader_concurrent_streams():
+    values = ['{id: %d, a: [%d, "%d"]}' % (i, i, i) for i in range(50)]
+
+    async def _digest(value):
+        data = ion.dumps(ion.loads(value), binary=True)
+        reader = AsyncHashReader(managed_reader(binary_reader(), None), _iterate(_chunks(data, 2)),
+                                 hashlib_hash_function_provider("sha256"))
+        async for _ in reader:
+            pass
+        return await reader.send(HashEvent.DIGEST)
+
+    async def _run():
+        return await asyncio.gather(*[_digest(value) for value in values])
+
+    assert asyncio.run(_run()) == [ion.loads(value).ion_hash('sha256') for value in values]
+
+
+class _StreamWriter:
+    def __init__(self):
+        self.buffer = BytesIO()
+        self.drains = 0
+
+    def write(self, data):
+        self.buffer.write(data)
+
+    async def drain(self):
+        self.drains += 1
+
+
+def test_async_hash_writer():
+    events = consume(binary_reader_over_bytes(_ION_BYTES))
+
+    expected_bytes = BytesIO()
+    hw = hash_writer(blocking_writer(binary_writer(), expected_bytes), hash_function_provider("md5"))
+    expected_write_event_types = [hw.send(event) for event in events]
+    expected_digest = hw.send(HashEvent.DIGEST)
+
+    async def _run():
+        stream = _StreamWriter()
+        writer = AsyncHashWriter(binary_writer(), stream, hash_function_provider("md5"))
+        write_event_types = [await writer.send(event) for event in events]
+        assert stream.drains == len(events)
+        return write_event_types, stream.buffer.getvalue(), await writer.send(HashEvent.DIGEST)
+
+    assert asyncio.run(_run()) == (expected_write_event_types, expected_bytes.getvalue(), expected_digest)
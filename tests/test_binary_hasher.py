@@ -0,0 +1,175 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#  
+#     http://www.apache.org/licenses/LICENSE-2.0
+#  
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import pytest
+from io import BytesIO
+
+import amazon.ion.simpleion as ion
+import amazon.ion.reader as ion_reader
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader_binary import binary_reader
+from amazon.ion.reader_managed import managed_reader
+from amazon.ion.symbols import SymbolTableCatalog
+from amazon.ion.symbols import shared_symbol_table
+from ionhash import hash_binary
+from ionhash import hash_binary_range
+from ionhash import hash_binary_values
+from ionhash import split_binary
+from ionhash.hasher import hash_reader
+from ionhash.hasher import HashEvent
+
+from .util import hash_function_provider
+
+
+_IVM = b'\xe0\x01\x00\xea'
+
+
+class _TestData:
+    def __init__(self, name, ion_bytes):
+        self.name = name
+        self.ion_bytes = ion_bytes
+
+
+def _dumps(ion_str):
+    return ion.dumps(ion.loads(ion_str), binary=True)
+
+
+def _test_data():
+    return [
+        _TestData("scalars", _dumps('[null, true, 5, -5, 2e0, 1234.500, 2017-01-01T00:00:00Z, hi, "hi", {{"hi"}}, {{aGVsbG8=}}]')),
+        _TestData("nulls", _dumps('[null.bool, null.int, null.float, null.symbol, null.list, null.struct]')),
+        _TestData("containers", _dumps('[1, 2, {a: 3, b: (4 {c: 5} 6) }, 7]')),
+        _TestData("annotations", _dumps('a::b::{x: y::[1, null.struct], z: $0}')),
+        _TestData("escapes", _dumps('{\'\\x0b\': "\\x0e", b: {{"\\x0c"}}}')),
+        _TestData("non-canonical ints", _IVM + b'\x23\x00\x00\x05' + b'\x31\x00' + b'\x21\x00' + b'\x20'),
+        _TestData("float32", _IVM + b'\x44\x3f\xc0\x00\x00' + b'\x40' + b'\x48' + bytes(8) + b'\x48\x80' + bytes(7)),
+        _TestData("nan payload", _IVM + b'\x48\x7f\xf0\x00\x00\x00\x00\x00\x01'),
+        _TestData("non-canonical decimals", _IVM + b'\x53\x80\x00\x05' + b'\x50' + b'\x51\xc0' + b'\x52\x81\x80'),
+        _TestData("nop pads", _IVM + b'\x00' + b'\x01\xff' + b'\xb4\x21\x01\x00\x00' + b'\xd5\x84\x21\x01\x80\x00'),
+        _TestData("ordered struct", _IVM + b'\xd1\x86\x84\x21\x01\x85\x21\x02'),
+        _TestData("faux ivm", _IVM + b'\x71\x02' + b'\x21\x01'),
+        _TestData("ivm resets symbol table", _dumps('{abc: def}') + _dumps('xyz::{q: r}')),
+        _TestData("local symbol table append",
+                  _dumps('{aa: bb}') + b'\xeb\x81\x83\xd8\x86\x71\x03\x87\xb3\x82cc' + b'\x71\x0c\x71\x0a'),
+        _TestData("shared symbol table import",
+                  _IVM + b'\xee\x9d\x81\x83\xde\x99\x86\xbe\x90\xde\x8e\x84\x86shared\x85\x21\x01\x88\x21\x02'
+                  + b'\x87\xb4\x83loc' + b'\x71\x0a\x71\x0b\x71\x0c'),
+    ]
+
+
+def _test_name(test_data):
+    return test_data.name
+
+
+def _catalog():
+    catalog = SymbolTableCatalog()
+    catalog.register(shared_symbol_table(u'shared', 1, [u'sa', u'sb']))
+    return catalog
+
+
+def _hash_reader_digests(ion_bytes, algorithm):
+    """Returns the digest of each top-level value, as computed by hash_reader."""
+    reader = hash_reader(
+        ion_reader.blocking_reader(managed_reader(binary_reader(), _catalog()), BytesIO(ion_bytes)),
+        hash_function_provider(algorithm))
+    digests = []
+    while True:
+        event = reader.send(NEXT_EVENT)
+        if event.event_type is IonEventType.STREAM_END:
+            return digests
+        if event.depth == 0 and event.event_type in [IonEventType.SCALAR, IonEventType.CONTAINER_END]:
+            digests.append(reader.send(HashEvent.DIGEST))
+
+
+@pytest.mark.parametrize("test_data", _test_data(), ids=_test_name)
+def test_hash_binary(test_data):
+    for algorithm in ["identity", "md5"]:
+        expected = _hash_reader_digests(test_data.ion_bytes, algorithm)
+        assert hash_binary(test_data.ion_bytes, hash_function_provider=hash_function_provider(algorithm),
+                           catalog=_catalog()) == expected
+
+
+_APPEND_LOCAL_SYMBOL_TABLE = b'\xeb\x81\x83\xd8\x86\x71\x03\x87\xb3\x82cc'
+
+
+@pytest.mark.parametrize("test_data", _test_data() + [
+    _TestData("successive appends", _dumps('{aa: bb}') + _APPEND_LOCAL_SYMBOL_TABLE + b'\x71\x0c'
+              + _APPEND_LOCAL_SYMBOL_TABLE + b'\x71\x0d\x71\x0a' + _dumps('[1, 2, 3]')),
+], ids=_test_name)
+def test_split_binary(test_data):
+    expected = hash_binary(test_data.ion_bytes, 'md5', catalog=_catalog())
+    for chunk_size in [1, 5, 1 << 20]:
+        ranges = list(split_binary(test_data.ion_bytes, chunk_size, catalog=_catalog()))
+        # each range is hashed on its own, as by a separate process
+        digests = []
+        for binary_range in ranges:
+            digests.extend(hash_binary_range(test_data.ion_bytes, binary_range, 'md5', catalog=_catalog()))
+        assert digests == expected
+        assert all(previous[1] <= following[0] for previous, following in zip(ranges, ranges[1:]))
+        if chunk_size == 1:
+            assert len(ranges) == len(expected)
+
+
+def test_hash_binary_values():
+    ion_bytes = ion.dumps(ion.loads('1 [a, "b"] {c: 2}', single_value=False), binary=True, sequence_as_stream=True)
+    expected = hash_binary(ion_bytes, 'md5')
+    values = list(hash_binary_values(ion_bytes, 'md5'))
+    assert [digest for (_, _, digest) in values] == expected
+    assert values[0][0] > len(_IVM)  # following the local symbol table
+    assert all(previous[1] == following[0] for previous, following in zip(values, values[1:]))
+    assert values[-1][1] == len(ion_bytes)
+    for binary_range in split_binary(ion_bytes, 1):
+        assert [digest for (_, _, digest) in hash_binary_values(ion_bytes, 'md5', binary_range=binary_range)] \
+            == hash_binary_range(ion_bytes, binary_range, 'md5')
+
+
+def test_hash_binary_values_unknown_symbol_text():
+    # a list of a symbol ($10) whose text is unknown, between two ints
+    digests = [digest for (_, _, digest) in hash_binary_values(_IVM + b'\x21\x01\xb2\x71\x0a\x21\x02', 'md5')]
+    assert len(digests) == 3 and isinstance(digests[1], Exception)
+    assert [digests[0], digests[2]] == hash_binary(_IVM + b'\x21\x01\x21\x02', 'md5')
+    # a top-level symbol whose text is unknown can't be traversed
+    values = hash_binary_values(_IVM + b'\x21\x01\x71\x0a\x21\x02', 'md5')
+    assert next(values)[2] == hash_binary(_dumps('1'), 'md5')[0]
+    with pytest.raises(Exception):
+        next(values)
+
+
+def test_hash_binary_memoryview():
+    ion_bytes = _dumps('{a: "' + 'x' * 1000 + '"}')
+    assert hash_binary(memoryview(ion_bytes)[0:], 'md5') == _hash_reader_digests(ion_bytes, 'md5')
+
+
+@pytest.mark.parametrize("text,copied", [
+    ('x' * 1000, False),
+    ('x' * 1000 + '\x0b', True),
+    ('x' * 10, True),
+], ids=['escape-free', 'escaped', 'short'])
+def test_hash_binary_passes_slices(text, copied):
+    ion_bytes = _dumps('{a: "%s"}' % text)
+    updates = []
+    assert hash_binary(ion_bytes, hash_function_provider=hash_function_provider("md5", updates)) \
+        == _hash_reader_digests(ion_bytes, 'md5')
+    slices = [update for update in updates if isinstance(update, memoryview)]
+    assert [update.tobytes() for update in slices] == ([] if copied else [text.encode()])
+
+
+def test_hash_binary_unknown_symbol_text():
+    with pytest.raises(Exception):
+        hash_binary(_IVM + b'\x71\x0a', 'md5')
+
+
+def test_hash_binary_invalid_params():
+    with pytest.raises(Exception):
+        hash_binary(_IVM)
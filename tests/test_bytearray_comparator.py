@@ -11,7 +11,11 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+from functools import cmp_to_key
+import random
+
 from ionhash.hasher import _bytearray_comparator
+from ionhash.hasher import _sort_field_hashes
 
 
 def test_equals():
@@ -47,3 +51,23 @@ def test_unsigned_behavior():
     assert _bytearray_comparator(b'\x7f', b'\x01') == 1
     assert _bytearray_comparator(b'\x80', b'\x01') == 1
     assert _bytearray_comparator(b'\xff', b'\x01') == 1
+
+
+def test_sort_field_hashes_matches_comparator():
+    rnd = random.Random(0)
+    digests = [bytes(rnd.randrange(256) for _ in range(rnd.randrange(4))) for _ in range(500)]
+    expected = sorted(digests, key=cmp_to_key(_bytearray_comparator))
+
+    actual = list(digests)
+    _sort_field_hashes(actual)
+    assert actual == expected
+
+    # digests provided by custom hash functions need not be bytes
+    for to_digest in [bytearray, memoryview]:
+        actual = [to_digest(digest) for digest in digests]
+        _sort_field_hashes(actual)
+        assert [bytes(digest) for digest in actual] == expected
+
+    actual = [bytearray(digest) if i % 2 else memoryview(digest) for i, digest in enumerate(digests)]
+    _sort_field_hashes(actual)
+    assert [bytes(digest) for digest in actual] == expected
@@ -0,0 +1,89 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import hashlib
+from io import BytesIO
+
+import amazon.ion.simpleion as ion
+import pytest
+
+from ionhash import DigestStore
+from ionhash import dedup_binary
+from ionhash import dedup_values
+from ionhash.dedup import _BloomFilter
+
+# duplicates differ in encoding (field order, symbol IDs), but not in content
+_TEXT = '{a: 1, b: [x, "y"]} {b: [x, "y"], a: 1} 1 2 1 z::{c: d} {a: 1, b: [x, y]} z::{c: d} 2'
+_UNIQUE_TEXT = '{a: 1, b: [x, "y"]} 1 2 z::{c: d} {a: 1, b: [x, y]}'
+
+
+def _text(values):
+    return ion.dumps(values, binary=False, sequence_as_stream=True)
+
+
+def _digests(count):
+    return [hashlib.sha256(b'%d' % i).digest() for i in range(count)]
+
+
+@pytest.mark.parametrize("expected_count", [None, 10, 100000], ids=['no_bloom_filter', 'small', 'large'])
+def test_digest_store(expected_count):
+    digests = _digests(1000)
+    with DigestStore(expected_count=expected_count, batch_size=100) as store:
+        assert [store.add(digest) for digest in digests] == [True] * 1000
+        assert [store.add(digest) for digest in digests[::3]] == [False] * 334
+        statistics = store.statistics()
+    assert statistics['added'] == 1000
+    assert statistics['duplicates'] == 334
+    if expected_count is None:
+        assert 'bloom_filter_positives' not in statistics
+    else:
+        assert statistics['bloom_filter_positives'] == 334 + statistics['bloom_filter_false_positives']
+
+
+def test_digest_store_file(tmp_path):
+    path = str(tmp_path / 'digests.db')
+    digests = _digests(100)
+    with DigestStore(path) as store:
+        assert all(store.add(digest) for digest in digests[:50])
+    # digests added by a previous run are duplicates, including to the Bloom filter
+    with DigestStore(path, expected_count=100) as store:
+        assert [store.add(digest) for digest in digests] == [False] * 50 + [True] * 50
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom_filter = _BloomFilter(10000, 0.01)
+    digests = _digests(10000)
+    for digest in digests:
+        bloom_filter.add(digest)
+    assert all(bloom_filter.add(digest) for digest in digests)
+    # as each is also added, the rate increases slightly as these are added
+    false_positives = sum(bloom_filter.add(hashlib.sha256(b'other %d' % i).digest()) for i in range(1000))
+    assert false_positives < 30
+
+
+def test_dedup_values():
+    values = ion.loads(_TEXT, single_value=False)
+    assert _text(list(dedup_values(values, 'md5'))) == _text(ion.loads(_UNIQUE_TEXT, single_value=False))
+    with DigestStore() as store:
+        assert len(list(dedup_values(values[:3], 'md5', store=store))) == 2
+        assert len(list(dedup_values(values, 'md5', store=store))) == 3
+
+
+def test_dedup_binary():
+    # the duplicates are in a second stream, with a different symbol table
+    values = ion.loads(_TEXT, single_value=False)
+    data = ion.dumps(values[:4], binary=True, sequence_as_stream=True) \
+        + ion.dumps(values[4:], binary=True, sequence_as_stream=True)
+    out = BytesIO()
+    assert dedup_binary(data, out, 'md5') == 5
+    assert _text(ion.loads(out.getvalue(), single_value=False)) == _text(ion.loads(_UNIQUE_TEXT, single_value=False))
@@ -0,0 +1,92 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import amazon.ion.simpleion as ion
+import pytest
+
+from ionhash import hash_binary
+from ionhash import hash_binary_indexed
+from ionhash import hash_binary_indexed_values
+
+_IVM = b'\xe0\x01\x00\xea'
+
+
+def _records(count, changed=()):
+    return [ion.loads('{id: %d, name: "record %d", tags: [t%d]}' % (i, -i if i in changed else i, i % 5))
+            for i in range(count)]
+
+
+def _dumps(values):
+    return ion.dumps(values, binary=True, sequence_as_stream=True)
+
+
+def _reused(data, index_file, algorithm='sha256'):
+    """Hashes the data, checking the digests, and returns the number of digests read from the index."""
+    results = list(hash_binary_indexed_values(data, str(index_file), algorithm))
+    assert [digest for (_, _, digest, _) in results] == hash_binary(data, algorithm)
+    return sum(reused for (_, _, _, reused) in results)
+
+
+def test_unchanged(tmp_path):
+    index_file = tmp_path / 'index'
+    data = _dumps(_records(100))
+    assert hash_binary_indexed(data, str(index_file), 'sha256') == hash_binary(data, 'sha256')
+    assert _reused(data, index_file) == 100
+
+
+@pytest.mark.parametrize("records", [
+    _records(100, changed=[3, 50]),
+    _records(100)[:20] + _records(103)[100:] + _records(100)[20:],
+    _records(100)[:20] + _records(100)[30:],
+], ids=['modified', 'inserted', 'removed'])
+def test_changed(tmp_path, records):
+    index_file = tmp_path / 'index'
+    original = _records(100)
+    assert _reused(_dumps(original), index_file) == 0
+    assert _reused(_dumps(records), index_file) == sum(record in original for record in records)
+
+
+def test_moved(tmp_path):
+    # once the moved records have been matched, the records that preceded them are no longer expected
+    index_file = tmp_path / 'index'
+    assert _reused(_dumps(_records(100)), index_file) == 0
+    assert _reused(_dumps(_records(100)[50:] + _records(100)[:50]), index_file) == 50
+
+
+def test_symbol_table_changed(tmp_path):
+    # the same bytes ($10 and $11), but with different symbol text
+    index_file = tmp_path / 'index'
+    first = _IVM + b'\xed\x81\x83\xda\x87\xb8\x83abc\x83def' + b'\x71\x0a\x71\x0b'
+    second = _IVM + b'\xed\x81\x83\xda\x87\xb8\x83xyz\x83def' + b'\x71\x0a\x71\x0b'
+    assert _reused(first, index_file) == 0
+    assert _reused(second, index_file) == 0
+    assert _reused(second, index_file) == 2
+
+
+def test_different_algorithm(tmp_path):
+    index_file = tmp_path / 'index'
+    data = _dumps(_records(10))
+    assert _reused(data, index_file, 'sha256') == 0
+    assert _reused(data, index_file, 'sha512') == 0
+    assert _reused(data, index_file, 'sha512') == 10
+
+
+def test_index_unchanged_on_error(tmp_path):
+    index_file = tmp_path / 'index'
+    data = _dumps(_records(10))
+    hash_binary_indexed(data, str(index_file), 'sha256')
+    index = index_file.read_bytes()
+    with pytest.raises(Exception):
+        hash_binary_indexed(data + b'\x71\x7f', str(index_file), 'sha256')
+    assert index_file.read_bytes() == index
+    assert [path.name for path in tmp_path.iterdir()] == ['index']
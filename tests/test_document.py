@@ -0,0 +1,127 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#  
+#     http://www.apache.org/licenses/LICENSE-2.0
+#  
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import pytest
+
+import amazon.ion.simpleion as ion
+
+from ionhash import HashedDocument
+
+from .util import hash_function_provider
+
+
+_ION_STR = 'a::{x: [1, b::[2, {y: 3}], {y: 4}], z: {w: (5 {v: 6})}, u: "seven", u: eight, t: null.list}'
+
+
+def _assert_digest(document):
+    # the document's value must remain consistent with its digest
+    assert document.digest == ion.loads(ion.dumps(document.value)).ion_hash('md5')
+
+
+def test_digest():
+    for ion_str in [_ION_STR, '1', 'a::b::"c"', '[]', '{}', 'null.struct', '[[[[1]]], {a: [[{b: 2}]]}]']:
+        document = HashedDocument(ion.loads(ion_str), 'md5')
+        assert document.digest == ion.loads(ion_str).ion_hash('md5')
+
+
+@pytest.mark.parametrize("path,value", [
+    ([], '[1, 2]'),
+    (['x', 0], '10'),
+    (['x', -2, 1, 'y'], 'c::{p: 30}'),
+    (['x', 1, 1, 'new'], '[]'),
+    (['x', 2], '{}'),
+    (['z', 'w', 1, 'v'], '60'),
+    (['u'], '"nine"'),
+    (['s'], '{}'),
+])
+def test_set(path, value):
+    document = HashedDocument(ion.loads(_ION_STR), 'md5')
+    document.set(path, ion.loads(value))
+    _assert_digest(document)
+
+
+@pytest.mark.parametrize("path", [
+    ['x', 0],
+    ['x', 1, 1, 'y'],
+    ['x', -1],
+    ['z', 'w', 1],
+    ['z'],
+    ['u'],
+])
+def test_delete(path):
+    document = HashedDocument(ion.loads(_ION_STR), 'md5')
+    document.delete(path)
+    _assert_digest(document)
+
+
+@pytest.mark.parametrize("path", [
+    [],
+    ['x'],
+    ['x', 1],
+    ['z', 'w'],
+])
+def test_append(path):
+    document = HashedDocument(ion.loads('[%s]' % _ION_STR if path == [] else _ION_STR), 'md5')
+    document.append(path, ion.loads('{q: [11]}'))
+    _assert_digest(document)
+
+
+def test_sequence_of_operations():
+    document = HashedDocument(ion.loads(_ION_STR), 'md5')
+    digests = [document.digest]
+    document.append(['x'], ion.loads('12'))
+    digests.append(document.digest)
+    document.set(['x', 1, 1, 'y'], ion.loads('{r: [13]}'))
+    digests.append(document.digest)
+    document.append(['x', 1, 1, 'y', 'r'], ion.loads('14'))
+    digests.append(document.digest)
+    document.delete(['z', 'w', 0])
+    digests.append(document.digest)
+    _assert_digest(document)
+    assert len(set(digests)) == len(digests)
+
+
+def test_hash_function_provider():
+    updates = []
+    document = HashedDocument(ion.loads(_ION_STR), hash_function_provider=hash_function_provider('identity', updates))
+    assert document.digest == ion.loads(_ION_STR).ion_hash(hash_function_provider=hash_function_provider('identity'))
+
+
+def test_invalid_operations():
+    document = HashedDocument(ion.loads(_ION_STR), 'md5')
+    digest = document.digest
+    with pytest.raises(Exception):
+        document.delete([])
+    with pytest.raises(Exception):
+        document.append(['z'], ion.loads('1'))
+    with pytest.raises(Exception):
+        document.set(['x', 'y'], ion.loads('1'))
+    with pytest.raises(Exception):
+        document.set(['z', 0], ion.loads('1'))
+    with pytest.raises(Exception):
+        document.set(['u', 'v'], ion.loads('1'))
+    with pytest.raises(Exception):
+        document.append(['t'], ion.loads('1'))
+    with pytest.raises(KeyError):
+        document.delete(['missing'])
+    with pytest.raises(IndexError):
+        document.set(['x', 3], ion.loads('1'))
+    assert document.digest == digest
+    _assert_digest(document)
+
+
+def test_invalid_params():
+    with pytest.raises(Exception):
+        HashedDocument(ion.loads('1'))
+    with pytest.raises(Exception):
+        HashedDocument(ion.loads('1'), 'md5', hash_function_provider('md5'))
@@ -25,6 +25,19 @@ def test_escape():
     _run_test(b'\x0c\x10\x0c\x11\x0c\x12\x0c', b'\x0c\x0c\x10\x0c\x0c\x11\x0c\x0c\x12\x0c\x0c')
 
 
+def test_escape_bytes_like():
+    for _bytes in [b'\x10\x11', b'\x0b\x0e\x0c\x10']:
+        assert _escape(bytearray(_bytes)) == _escape(_bytes)
+        assert _escape(memoryview(b'\x00' + _bytes + b'\x00')[1:-1]) == _escape(_bytes)
+
+
+def test_escape_free_input_is_returned_unchanged():
+    _bytes = b'\x10\x11\x12\x13'
+    assert _escape(_bytes) is _bytes
+    _bytes = bytearray(_bytes)
+    assert _escape(_bytes) is _bytes
+
+
 def _run_test(_bytes, expected_bytes):
     assert _escape(_bytes) == expected_bytes
 
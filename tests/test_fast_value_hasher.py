@@ -0,0 +1,111 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#  
+#     http://www.apache.org/licenses/LICENSE-2.0
+#  
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import hashlib
+import pytest
+import sys
+
+import amazon.ion.simpleion as ion
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyDict
+from amazon.ion.simple_types import IonPyList
+from ionhash.fast_value_hasher import hash_value
+from ionhash.fast_value_hasher import hash_values
+from ionhash.fast_value_hasher import serialize_value
+from ionhash.hasher import HashEvent
+from ionhash.hasher import _escape
+from ionhash.hasher import hash_reader
+
+from .util import binary_reader_over
+from .util import consume
+from .util import hash_function_provider
+
+
+_ION_STRS = [
+    'null',
+    '5',
+    '"hi"',
+    '{{"\\x0b\\x0c\\x0e"}}',
+    '[1, 2, {a: 3, b: (4 {c: 5} 6) }, 7]',
+    'a::b::{x: y::[1, null.struct], z: $0}',
+]
+
+
+@pytest.mark.parametrize("ion_str", _ION_STRS)
+def test_streamed_matches_serialized(ion_str):
+    value = ion.loads(ion_str)
+    digest = hash_value(value, hash_function_provider("identity"))
+    assert digest == bytearray(serialize_value(value, hash_function_provider("identity")))
+
+
+def test_hash_values_matches_hash_value():
+    values = [ion.loads(ion_str) for ion_str in _ION_STRS]
+    expected = [hash_value(value, hash_function_provider("md5")) for value in values]
+    assert list(hash_values(values, hash_function_provider("md5"))) == expected
+
+
+def test_hash_values_reuses_hashers():
+    hashers = []
+
+    def hfp():
+        hashers.append(hash_function_provider("md5")())
+        return hashers[-1]
+
+    values = [ion.loads('{a: {b: 1}, c: [{d: 2}]}') for i in range(100)]
+    list(hash_values(values, hfp))
+    assert len(hashers) == 3
+
+
+def test_streamed_updates_are_bounded():
+    value = ion.loads('[' + ', '.join(['"' + 'x' * 100 + '"'] * 1000) + ']')
+    updates = []
+    hash_value(value, hash_function_provider("md5", updates))
+    assert len(updates) > 1000
+    assert max(len(u) for u in updates) < 200
+
+
+def test_deeply_nested_list():
+    depth = sys.getrecursionlimit() * 2
+    value = IonPyList.from_value(IonType.LIST, [])
+    for i in range(depth):
+        value = IonPyList.from_value(IonType.LIST, [value])
+
+    digest = hash_value(value, hash_function_provider("identity"))
+    assert digest == b'\x0b\xb0' * (depth + 1) + b'\x0e' * (depth + 1)
+
+
+def test_deeply_nested_struct():
+    depth = sys.getrecursionlimit() * 2
+    value = ion.loads('{a: 1}')
+    for i in range(depth):
+        value = IonPyDict.from_value(IonType.STRUCT, {'a': value})
+
+    digest = hash_value(value, hash_function_provider("md5"))
+    assert digest == _nested_struct_digest(depth)
+
+
+def _nested_struct_digest(depth):
+    """Returns the md5 Ion hash of {a: 1} nested in depth structs, each with the single field a,
+    computed one level at a time from the definition of s(struct)."""
+    serialized = serialize_value(ion.loads('{a: 1}'), hash_function_provider("md5"))
+    field_name = serialize_value(ion.loads('a'), hash_function_provider("md5"))
+    for i in range(depth):
+        serialized = b'\x0b\xd0' + _escape(hashlib.md5(field_name + serialized).digest()) + b'\x0e'
+    return hashlib.md5(serialized).digest()
+
+
+def test_nested_struct_digest():
+    ion_str = '{a: {a: {a: {a: 1}}}}'
+    hr = hash_reader(binary_reader_over(ion_str), hash_function_provider("md5"))
+    consume(hr)
+    assert hr.send(HashEvent.DIGEST) == _nested_struct_digest(3)
@@ -11,11 +11,16 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import amazon.ion.simpleion as ion
+from amazon.ion.core import IonEventType
+
+from ionhash import hash_binary_reader
 from ionhash.hasher import hash_reader
 from ionhash.hasher import HashEvent
 
 from .util import consume
 from .util import binary_reader_over
+from .util import binary_reader_over_bytes
 from .util import hash_function_provider
 
 
@@ -51,3 +56,52 @@ def _run_test(ion_str, skip_list, algorithm):
 
     return hr.send(HashEvent.DIGEST)
 
+
+def _skips_nested_value(events, i):
+    """Returns True if skipping the i-th event, after the given events, skips a value within a container,
+    rather than a top-level value (which readers don't support)."""
+    if i >= len(events):
+        # the stream ends before the i-th event
+        return True
+    event = events[i - 1]
+    return event.depth > 0 or event.event_type is IonEventType.CONTAINER_START
+
+
+def test_hash_binary_reader():
+    ion_str = '[1, 2, {a: 3, b: (4 {c: 5} 6), d: [] }, 7, [], {}]'
+    algorithm = "md5"
+
+    max_events = len(consume(binary_reader_over(ion_str)))
+    hr = hash_reader(binary_reader_over(ion_str), hash_function_provider(algorithm))
+    consume(hr)
+    expected_digest = hr.send(HashEvent.DIGEST)
+
+    for i in range(0, max_events - 1):
+        first_events = consume(binary_reader_over(ion_str), [i] if i > 0 else [])
+        for j in range(i, max_events - 1):
+            if j > i and not _skips_nested_value(first_events, j):
+                continue
+            skip_list = sorted({i, j} - {0})
+            r_events = consume(binary_reader_over(ion_str), skip_list)
+
+            hr = hash_binary_reader(ion.dumps(ion.loads(ion_str), binary=True), hash_function_provider(algorithm))
+            hr_events = consume(hr, skip_list)
+
+            # assert reader/hash_binary_reader response behavior is identical
+            assert hr_events == r_events
+            assert hr.send(HashEvent.DIGEST) == expected_digest
+
+
+def test_hash_binary_reader_local_symbol_tables():
+    data = ion.dumps(ion.loads('{a: [b, {c: d}], e: f}'), binary=True) \
+        + ion.dumps(ion.loads('{g: [h, {i: j}], k: {l: m}}'), binary=True)
+
+    hr = hash_reader(binary_reader_over_bytes(data), hash_function_provider("md5"))
+    consume(hr)
+    expected_digest = hr.send(HashEvent.DIGEST)
+
+    for skip_list in [[1], [2], [4], [10], [11], [13], [17], [2, 12]]:
+        r_events = consume(binary_reader_over_bytes(data), skip_list)
+        hr = hash_binary_reader(data, hash_function_provider("md5"))
+        assert consume(hr, skip_list) == r_events
+        assert hr.send(HashEvent.DIGEST) == expected_digest
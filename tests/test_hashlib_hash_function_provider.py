@@ -11,6 +11,8 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import hashlib
+
 from ionhash.hasher import hash_reader
 from ionhash.hasher import HashEvent
 from ionhash.hasher import hashlib_hash_function_provider
@@ -36,3 +38,34 @@ def test_hashlib_hash_function_provider():
 
     assert actual_digest == expected_digest
 
+
+def test_hashlib_hash_function_provider_reset():
+    hf = hashlib_hash_function_provider("sha256")()
+    hf.update(b'abc')
+    assert hf.digest() == hashlib.sha256(b'abc').digest()
+    # digest() resets the hash function, without disturbing other hash functions for the algorithm
+    other = hashlib_hash_function_provider("sha256")()
+    other.update(b'xyz')
+    assert hf.digest() == hashlib.sha256().digest()
+    hf.update(b'def')
+    assert hf.digest() == hashlib.sha256(b'def').digest()
+    assert other.digest() == hashlib.sha256(b'xyz').digest()
+
+
+def test_hash_reader_reuses_hash_functions():
+    ion_str = '[{a: 1, b: {c: 2}, d: [3]}, {e: {f: 4}}, {g: 5}, {h: {i: 6}}]'
+    calls = []
+
+    def _counting_provider():
+        calls.append(None)
+        return hashlib_hash_function_provider("md5")()
+
+    hr = hash_reader(binary_reader_over(ion_str), _counting_provider)
+    consume(hr)
+    actual_digest = hr.send(HashEvent.DIGEST)
+
+    hr = hash_reader(binary_reader_over(ion_str), hash_function_provider("md5"))
+    consume(hr)
+    assert actual_digest == hr.send(HashEvent.DIGEST)
+    # hash functions released by nested structs are reused by subsequent ones
+    assert len(calls) == 4
@@ -0,0 +1,179 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from io import BytesIO
+
+import amazon.ion.simpleion as ion
+import pytest
+
+import ionhash
+from ionhash import binary_hasher
+from ionhash import fast_value_hasher
+from ionhash import hasher
+from ionhash import instrumentation
+from ionhash.hasher import hash_reader
+from ionhash.hasher import HashEvent
+
+from .util import binary_reader_over
+from .util import consume
+from .util import hash_function_provider
+
+_ION_STR = '{a: [1, "x\\x0b"], b: {c: 2e0}, d: annot::null}'
+
+
+@pytest.fixture(autouse=True)
+def _instrumentation():
+    ionhash.reset_instrumentation()
+    yield
+    ionhash.disable_instrumentation()
+    ionhash.reset_instrumentation()
+
+
+def _hash_reader_digest(hfp):
+    hr = hash_reader(binary_reader_over(_ION_STR), hfp)
+    consume(hr)
+    return hr.send(HashEvent.DIGEST)
+
+
+def test_digests_unchanged():
+    value = ion.loads(_ION_STR)
+    data = ion.dumps(value, binary=True)
+    expected = [value.ion_hash('md5'), ionhash.hash_binary(data, 'md5'), _hash_reader_digest(hash_function_provider('md5')),
+                ionhash.HashedDocument(value, 'md5').digest]
+
+    ionhash.enable_instrumentation()
+    assert ionhash.instrumentation_enabled()
+    assert [value.ion_hash('md5'), ionhash.hash_binary(data, 'md5'), _hash_reader_digest(hash_function_provider('md5')),
+            ionhash.HashedDocument(value, 'md5').digest] == expected
+
+
+def test_disable_restores_originals():
+    originals = (hasher._Hasher.__dict__['__init__'], hasher._Hasher.__dict__['scalar'], fast_value_hasher._escape,
+                 fast_value_hasher._s_scalar, fast_value_hasher._Frame, binary_hasher._resolve_hash_function_provider,
+                 ionhash._resolve_hash_function_provider)
+    ionhash.enable_instrumentation()
+    assert hasher._Hasher.__dict__['scalar'] is not originals[1]
+    ionhash.disable_instrumentation()
+    assert not ionhash.instrumentation_enabled()
+    assert (hasher._Hasher.__dict__['__init__'], hasher._Hasher.__dict__['scalar'], fast_value_hasher._escape,
+            fast_value_hasher._s_scalar, fast_value_hasher._Frame, binary_hasher._resolve_hash_function_provider,
+            ionhash._resolve_hash_function_provider) == originals
+
+
+def test_hash_reader_snapshot():
+    ionhash.enable_instrumentation()
+    _hash_reader_digest(hash_function_provider('md5'))
+    snapshot = ionhash.instrumentation_snapshot()
+
+    md5 = snapshot['hash_functions']['_MD5Hash']
+    assert md5['created'] >= 3
+    assert md5['digests'] == 5  # the digests of fields a, b, c and d, and of the value itself
+    assert md5['updates'] > 0 and md5['bytes'] > md5['updates']
+
+    assert snapshot['escape']['calls'] > 0
+    assert snapshot['escape']['escaped'] == 1
+
+    types = snapshot['types']
+    assert (types['STRUCT']['containers'], types['LIST']['containers']) == (2, 1)
+    assert (types['INT']['scalars'], types['STRING']['scalars'], types['FLOAT']['scalars'], types['NULL']['scalars']) \
+        == (1, 1, 1, 1)
+    assert sum(types['INT']['histogram'].values()) == 1
+    assert types['INT']['time_ns'] <= max(types['INT']['histogram'])
+
+    depths = snapshot['depths']
+    assert (depths[0]['containers'], depths[1]['containers']) == (1, 2)
+    assert (depths[1]['scalars'], depths[2]['scalars']) == (1, 3)
+
+
+def test_ion_hash_snapshot():
+    ionhash.enable_instrumentation()
+    ion.loads(_ION_STR).ion_hash('sha256')
+    snapshot = ionhash.instrumentation_snapshot()
+
+    assert snapshot['hash_functions']['sha256']['created'] == 3  # the value's, and one per struct
+    assert snapshot['hash_functions']['sha256']['digests'] == 5
+    assert (snapshot['types']['STRUCT']['containers'], snapshot['types']['LIST']['containers']) == (2, 1)
+    assert snapshot['types']['STRING']['scalars'] == 1
+    assert snapshot['depths'] == {}
+
+
+def test_hash_binary_escape_snapshot():
+    # every scalar's representation is passed to _escape() as a memoryview, but none is escaped
+    data = ion.dumps(ion.loads('{a: [1, "x", 2e0], b: "%s"}' % ('y' * 100)), binary=True)
+    ionhash.enable_instrumentation()
+    ionhash.hash_binary(data, 'md5')
+    escape = ionhash.instrumentation_snapshot()['escape']
+    assert escape['calls'] >= 3
+    assert escape['escaped'] == 0
+
+
+def test_hash_binary_snapshot():
+    data = ion.dumps(ion.loads(_ION_STR), binary=True)
+    ionhash.enable_instrumentation()
+    ionhash.hash_binary(data, 'md5')
+    snapshot = ionhash.instrumentation_snapshot()
+
+    assert snapshot['hash_functions']['md5']['digests'] == 5
+    types = snapshot['types']
+    assert (types['STRUCT']['containers'], types['LIST']['containers']) == (2, 1)
+    assert (types['INT']['scalars'], types['STRING']['scalars'], types['FLOAT']['scalars'], types['NULL']['scalars']) \
+        == (1, 1, 1, 1)
+    assert sum(types['FLOAT']['histogram'].values()) == 1
+    assert snapshot['depths'] == {}
+
+
+def test_multi_hash_counted_without_modifying_it():
+    multi_hash = ionhash.multi_hash_function_provider(['md5', 'sha1'])()
+    hash_functions = list(multi_hash._hash_functions)
+    data = ion.dumps(ion.loads(_ION_STR), binary=True)
+    expected = ionhash.hash_binary(data, hash_function_provider=ionhash.multi_hash_function_provider(['md5', 'sha1']))
+    ionhash.enable_instrumentation()
+    assert instrumentation._counting_hash(multi_hash) is not multi_hash
+    assert multi_hash._hash_functions == hash_functions
+    assert ionhash.hash_binary(data, hash_function_provider=ionhash.multi_hash_function_provider(['md5', 'sha1'])) \
+        == expected
+    snapshot = ionhash.instrumentation_snapshot()
+    assert snapshot['hash_functions']['md5']['digests'] == snapshot['hash_functions']['sha1']['digests'] == 5
+
+
+def test_other_entry_points_snapshot():
+    value = ion.loads(_ION_STR)
+    data = ion.dumps(value, binary=True)
+    ionhash.enable_instrumentation()
+    ionhash.hash_object({'a': [1, 'x'], 'b': {'c': 2.0}}, 'sha256')
+    list(ionhash.dedup_values([value, value], 'sha1'))
+    ionhash.partition_binary(data, [BytesIO(), BytesIO()], 'sha512')
+    snapshot = ionhash.instrumentation_snapshot()
+
+    assert snapshot['hash_functions']['sha256']['digests'] == 4  # the value's, and one per field
+    assert snapshot['hash_functions']['sha1']['digests'] == 10
+    assert snapshot['hash_functions']['sha512']['digests'] == 5
+    assert snapshot['types']['STRUCT']['containers'] == 8
+    assert snapshot['types']['LIST']['containers'] == 4
+    assert snapshot['types']['STRING']['scalars'] == 4
+
+
+def test_reset():
+    ionhash.enable_instrumentation()
+    ion.loads(_ION_STR).ion_hash('sha256')
+    ionhash.reset_instrumentation()
+    assert ionhash.instrumentation_snapshot() == {
+        'hash_functions': {}, 'escape': {'calls': 0, 'bytes': 0, 'escaped': 0}, 'types': {}, 'depths': {}}
+
+
+def test_nothing_recorded_while_disabled():
+    ionhash.enable_instrumentation()
+    ionhash.disable_instrumentation()
+    ion.loads(_ION_STR).ion_hash('sha256')
+    _hash_reader_digest(hash_function_provider('md5'))
+    assert ionhash.instrumentation_snapshot()['hash_functions'] == {}
@@ -0,0 +1,148 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from os.path import abspath, join
+import subprocess
+import sys
+
+import amazon.ion.simpleion as ion
+import pytest
+
+_CLI = abspath(join(abspath(__file__), '..', '..', 'tools', 'ion-hash.py'))
+
+_VALUES = ion.loads('1 "a" {a: [1, 2e0, {b: null}], c: x::y} [] a::b::(1 2) 2020-01-01T00:00Z {{aGVsbG8=}} $0',
+                    single_value=False)
+
+
+def _run(path, algorithm='sha256', jobs=None):
+    jobs_args = [] if jobs is None else ['--jobs', str(jobs)]
+    return subprocess.run([sys.executable, _CLI] + jobs_args + [algorithm, str(path)], check=True,
+                          capture_output=True, text=True).stdout.splitlines()
+
+
+def _expected(values, algorithm='sha256'):
+    return [' '.join('%02x' % x for x in value.ion_hash(algorithm)) for value in values]
+
+
+@pytest.mark.parametrize("binary", [True, False], ids=['binary', 'text'])
+def test_digests(tmp_path, binary):
+    path = tmp_path / 'values'
+    data = ion.dumps(_VALUES, binary=binary, sequence_as_stream=True)
+    path.write_bytes(data if binary else data.encode())
+    assert _run(path) == _expected(_VALUES)
+    assert _run(path, 'md5') == _expected(_VALUES, 'md5')
+
+
+def test_parallel_digests(tmp_path):
+    # several streams, each with its own local symbol table, spanning many ranges
+    streams = [ion.loads(' '.join('{id: %d, s%d: [v%d, "%s"]}' % (i, i % 7, i, 'x' * (i % 100)) for i in range(n)),
+                         single_value=False) for n in [300, 1, 500]]
+    path = tmp_path / 'values'
+    path.write_bytes(b''.join(ion.dumps(values, binary=True, sequence_as_stream=True) for values in streams))
+    expected = _expected([value for values in streams for value in values])
+    assert _run(path, jobs=3) == expected
+    assert _run(path, 'md5', jobs=2) == _expected([value for values in streams for value in values], 'md5')
+
+
+def test_index(tmp_path):
+    path = tmp_path / 'values'
+    index = tmp_path / 'values.idx'
+    path.write_bytes(ion.dumps(_VALUES, binary=True, sequence_as_stream=True))
+    args = [sys.executable, _CLI, '--index', str(index), 'sha256', str(path)]
+    for reused in [0, len(_VALUES)]:
+        result = subprocess.run(args, check=True, capture_output=True, text=True)
+        assert result.stdout.splitlines() == _expected(_VALUES)
+        assert result.stderr == '%d of %d digests read from the index\n' % (reused, len(_VALUES))
+
+
+@pytest.mark.parametrize("options", [[], ['--bloom', '100']], ids=['no_bloom_filter', 'bloom_filter'])
+def test_dedup(tmp_path, options):
+    path = tmp_path / 'values'
+    output = tmp_path / 'unique'
+    store = tmp_path / 'digests.db'
+    path.write_bytes(ion.dumps(_VALUES + _VALUES[2:4], binary=True, sequence_as_stream=True))
+    args = [sys.executable, _CLI, '--dedup', str(output), '--store', str(store)] + options + ['sha256', str(path)]
+    result = subprocess.run(args, check=True, capture_output=True, text=True)
+    assert result.stdout == ''
+    assert result.stderr.startswith('%d values, 2 duplicates removed, %d written\n' % (len(_VALUES) + 2, len(_VALUES)))
+    assert _expected(ion.loads(output.read_bytes(), single_value=False)) == _expected(_VALUES)
+    # the store holds the digests of the previous run
+    result = subprocess.run(args, check=True, capture_output=True, text=True)
+    assert result.stderr.startswith('%d values, %d duplicates removed, 0 written\n' % ((len(_VALUES) + 2,) * 2))
+    assert output.read_bytes() == b''
+
+
+@pytest.mark.parametrize("ring", [False, True], ids=['prefix', 'ring'])
+def test_partition(tmp_path, ring):
+    path = tmp_path / 'values'
+    prefix = str(tmp_path / 'part-')
+    path.write_bytes(ion.dumps(_VALUES, binary=True, sequence_as_stream=True))
+    args = [sys.executable, _CLI, '--partition', '3', '--output', prefix] + (['--ring'] if ring else []) \
+        + ['sha256', str(path)]
+    result = subprocess.run(args, check=True, capture_output=True, text=True)
+    assert result.stdout == ''
+    shards = [ion.loads((tmp_path / ('part-%d.10n' % shard)).read_bytes(), single_value=False) for shard in range(3)]
+    assert sorted(digest for values in shards for digest in _expected(values)) == sorted(_expected(_VALUES))
+    assert result.stderr == ''.join('%s%d.10n: %d values\n' % (prefix, shard, len(values))
+                                    for shard, values in enumerate(shards))
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty'
+    path.write_bytes(b'')
+    assert _run(path) == []
+
+
+@pytest.mark.parametrize("jobs", [None, 2], ids=['serial', 'parallel'])
+def test_binary_value_that_cannot_be_digested(tmp_path, jobs):
+    # a list of a symbol ($10) whose text is unknown, between two ints
+    path = tmp_path / 'values'
+    path.write_bytes(b'\xe0\x01\x00\xea' + b'\x21\x01' + b'\xb2\x71\x0a' + b'\x21\x02')
+    digests = _run(path, jobs=jobs)
+    assert len(digests) == 3
+    assert digests[1].startswith('[unable to digest: ')
+    assert [digests[0], digests[2]] == _expected(ion.loads('1 2', single_value=False))
+
+
+@pytest.mark.parametrize("jobs", [None, 2], ids=['serial', 'parallel'])
+def test_binary_data_that_cannot_be_traversed(tmp_path, jobs):
+    # a top-level symbol ($10) whose text is unknown, so may or may not be an Ion version marker
+    path = tmp_path / 'values'
+    path.write_bytes(b'\xe0\x01\x00\xea' + b'\x21\x01' + b'\x71\x0a' + b'\x21\x02')
+    digests = _run(path, jobs=jobs)
+    assert digests[0] == _expected([ion.loads('1')])[0]
+    assert len(digests) == 2 and digests[1].startswith('[unable to digest: ')
+
+
+def test_text_value_that_cannot_be_digested(tmp_path):
+    # a list and a sexp containing a symbol ($10) whose text is unknown, between two ints
+    path = tmp_path / 'values'
+    path.write_bytes(b'1 {a: [x, $10, {b: c}], d: e} (a::b $10) 2')
+    digests = _run(path)
+    assert len(digests) == 4
+    assert digests[1].startswith('[unable to digest: ') and digests[2].startswith('[unable to digest: ')
+    assert [digests[0], digests[3]] == _expected(ion.loads('1 2', single_value=False))
+
+
+def test_text_data_that_cannot_be_parsed(tmp_path):
+    # a top-level symbol ($10) whose text is unknown, so may or may not be an Ion version marker
+    path = tmp_path / 'values'
+    path.write_bytes(b'1 $10 2')
+    digests = _run(path)
+    assert digests[0] == _expected([ion.loads('1')])[0]
+    assert len(digests) == 2 and digests[1].startswith('[unable to digest: ')
+
+
+def test_usage():
+    assert subprocess.run([sys.executable, _CLI], check=True, capture_output=True, text=True).stdout \
+        .startswith('Utility that prints the Ion Hash')
@@ -27,6 +27,8 @@ from amazon.ion.writer import blocking_writer
 from amazon.ion.writer_text import raw_writer
 from amazon.ion.core import IonEventType
 from amazon.ion.core import IonEvent
+from ionhash import hash_binary
+from ionhash import hash_binary_reader
 from ionhash.hasher import hash_reader
 from ionhash.hasher import hash_writer
 from ionhash.hasher import HashEvent
@@ -173,6 +175,28 @@ def test_skip_over(ion_test):
     _run_test(ion_test, skipping_consumer)
 
 
+@pytest.mark.parametrize("ion_test", _test_data("identity"), ids=_test_name)
+def test_skip_over_binary(ion_test):
+    buf = _to_buffer(ion_test, binary=True)
+
+    def skipping_consumer(algorithm):
+        reader = hash_binary_reader(buf.getvalue(),
+                                    hash_function_provider(algorithm, _actual_updates, _actual_digests))
+
+        event = reader.send(NEXT_EVENT)
+        while event.event_type != IonEventType.STREAM_END:
+            if event.event_type == IonEventType.CONTAINER_START:
+                event = reader.send(SKIP_EVENT)
+            else:
+                event = reader.send(NEXT_EVENT)
+
+        return reader.send(HashEvent.DIGEST)
+
+    # Do not assert on expected_updates because skipped values are hashed by hash_binary_reader()
+    # as they are by hash_binary()
+    _run_test(ion_test, skipping_consumer, should_assert_on_expected_updates=False)
+
+
 @pytest.mark.parametrize("ion_test", _test_data("identity"), ids=_test_name)
 def test_writer(ion_test):
     _run_test(ion_test,
@@ -199,6 +223,22 @@ def test_simpleion(ion_test):
     # Do not assert on expected_updates because the implementation of ion_hash() is not backed by an ion_writer
     _run_test(ion_test, to_ion_hash, should_assert_on_expected_updates=False)
 
+
+@pytest.mark.parametrize("ion_test", _test_data("identity"), ids=_test_name)
+def test_hash_binary(ion_test):
+    buf = _to_buffer(ion_test, binary=True)
+
+    def to_ion_hash(algorithm):
+        [digest] = hash_binary(buf.getvalue(),
+                               hash_function_provider=hash_function_provider(algorithm,
+                                                                             _actual_updates,
+                                                                             _actual_digests))
+        return digest
+
+    # Do not assert on expected_updates because hash_binary() is not backed by an ion_writer
+    _run_test(ion_test, to_ion_hash, should_assert_on_expected_updates=False)
+
+
 _actual_updates = []
 _actual_digests = []
 
@@ -0,0 +1,97 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from functools import partial
+import hashlib
+import mmap
+import tracemalloc
+
+import amazon.ion.simpleion as ion
+import pytest
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyBytes
+from amazon.ion.simple_types import IonPyText
+
+from ionhash import hash_binary
+from ionhash.fast_value_hasher import _s_scalar
+from ionhash.hasher import _CHUNK_SIZE
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hashlib_hash_function_provider
+from ionhash.hasher import HashEvent
+
+from .util import binary_reader_over_bytes
+from .util import consume
+
+_ANNOTATED_VALUE_START = b'\x0b\xe0\x0b\x70\x61\x0e'
+
+
+def _lob(size):
+    # escapable bytes at and around each chunk boundary
+    lob = bytearray(b'\x01' * size)
+    for boundary in range(_CHUNK_SIZE, size, _CHUNK_SIZE):
+        lob[boundary - 1:boundary + 2] = b'\x0b\x0c\x0e'
+    return bytes(lob)
+
+
+_SIZE = 3 * _CHUNK_SIZE + 5
+
+_VALUES = [
+    IonPyBytes.from_value(IonType.BLOB, _lob(_SIZE)),
+    IonPyBytes.from_value(IonType.CLOB, _lob(_SIZE)),
+    IonPyText.from_value(IonType.STRING, (u'é\x0b' * _SIZE)[:_SIZE]),
+    IonPyBytes.from_value(IonType.BLOB, _lob(_SIZE), annotations=('a',)),
+]
+
+
+def _expected(value):
+    # the digest of the unchunked serialization of the value
+    s_value = _s_scalar(value, value.ion_type, False)
+    if value.ion_annotations:
+        s_value = _ANNOTATED_VALUE_START + s_value + b'\x0e'
+    return hashlib.sha256(s_value).digest()
+
+
+@pytest.mark.parametrize("value", _VALUES, ids=["blob", "clob", "string", "annotated_blob"])
+def test_chunked_scalars(value):
+    expected = _expected(value)
+    hfp = hashlib_hash_function_provider('sha256')
+    assert value.ion_hash('sha256') == expected
+
+    data = ion.dumps(value, binary=True)
+    assert hash_binary(data, 'sha256') == [expected]
+    assert hash_binary(memoryview(data), 'sha256') == [expected]
+
+    reader = hash_reader(binary_reader_over_bytes(data), hfp)
+    consume(reader)
+    assert reader.send(HashEvent.DIGEST) == expected
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_peak_memory_is_bounded(tmp_path):
+    size = 64 * 1024 * 1024
+    value = IonPyBytes.from_value(IonType.BLOB, _lob(size))
+    assert _peak_memory(partial(value.ion_hash, 'sha256')) < 8 * _CHUNK_SIZE
+
+    path = tmp_path / 'blob.10n'
+    path.write_bytes(ion.dumps(value, binary=True))
+    del value
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            assert _peak_memory(partial(hash_binary, buffer, 'sha256')) < 8 * _CHUNK_SIZE
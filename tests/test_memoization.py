@@ -0,0 +1,168 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#  
+#     http://www.apache.org/licenses/LICENSE-2.0
+#  
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import pytest
+
+import amazon.ion.simpleion as ion
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyDict
+from amazon.ion.simple_types import IonPyList
+from amazon.ion.simple_types import _IonNature
+
+import ionhash
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+_ION_STR = 'a::{x: [1, 2, {y: 3}], z: {w: b::(4 5)}, v: "six"}'
+
+
+@pytest.fixture(autouse=True)
+def _memoization():
+    ionhash.enable_memoization()
+    yield
+    ionhash.disable_memoization()
+
+
+class _CountingProvider:
+    """A hash function provider that counts the bytes passed to the hash functions it provides."""
+    def __init__(self):
+        self.updated = 0
+        self._hfp = hashlib_hash_function_provider('md5')
+
+    def __call__(self):
+        hash_fn = self._hfp()
+        provider = self
+
+        class _Counting:
+            def update(self, _bytes):
+                provider.updated += len(_bytes)
+                hash_fn.update(_bytes)
+
+            def digest(self):
+                return hash_fn.digest()
+        return _Counting()
+
+
+def _unmemoized(value, algorithm='md5'):
+    ionhash.disable_memoization()
+    try:
+        return value.ion_hash(algorithm)
+    finally:
+        ionhash.enable_memoization()
+
+
+def test_repeated_hash_is_memoized():
+    value = ion.loads(_ION_STR)
+    hfp = _CountingProvider()
+    digest = value.ion_hash(hash_function_provider=hfp)
+    updated = hfp.updated
+    assert value.ion_hash(hash_function_provider=hfp) == digest
+    assert hfp.updated == updated
+    assert value.ion_hash('md5') == digest == _unmemoized(value)
+
+
+def test_memoized_per_algorithm():
+    value = ion.loads(_ION_STR)
+    assert value.ion_hash('md5') == _unmemoized(value, 'md5')
+    assert value.ion_hash('sha256') == _unmemoized(value, 'sha256')
+    assert value.ion_hash('md5') != value.ion_hash('sha256')
+
+
+def test_nested_struct_digest_reuses_fields():
+    value = ion.loads(_ION_STR)
+    hfp = _CountingProvider()
+    value.ion_hash(hash_function_provider=hfp)
+    hfp.updated = 0
+    # only B || TQ || escape(field hashes) || E is hashed; the fields are not traversed again
+    assert value['z'].ion_hash(hash_function_provider=hfp) == _unmemoized(value['z'])
+    assert hfp.updated == 2 + 16 + 1
+
+
+@pytest.mark.parametrize("mutation", [
+    "value['x'].append(ion.loads('7'))",
+    "value['x'].extend([ion.loads('7')])",
+    "value['x'].insert(0, ion.loads('7'))",
+    "value['x'].pop()",
+    "value['x'].remove(value['x'][0])",
+    "value['x'].reverse()",
+    "value['x'].clear()",
+    "value['x'].__setitem__(0, ion.loads('7'))",
+    "value['x'].__delitem__(0)",
+    "value['x'][2].__setitem__('y', ion.loads('7'))",
+    "value['x'][2].add_item('y', ion.loads('7'))",
+    "value['x'][2].pop('y')",
+    "value['x'][2].update({'q': ion.loads('7')})",
+    "value['z']['w'].append(ion.loads('6'))",
+    "value['z'].__delitem__('w')",
+    'value.__setitem__(\'v\', ion.loads(\'"seven"\'))',
+    "setattr(value['z']['w'], 'ion_annotations', ('c',))",
+    "setattr(value['x'][0], 'ion_annotations', ('c',))",
+    "setattr(value['x'], 'ion_type', IonType.SEXP)",
+    "setattr(value, 'ion_annotations', ())",
+])
+def test_mutation_invalidates(mutation):
+    value = ion.loads(_ION_STR)
+    digest = value.ion_hash('md5')
+    value['z'].ion_hash('md5')
+    exec(mutation, {'value': value, 'ion': ion, 'IonType': IonType})
+    assert value.ion_hash('md5') == _unmemoized(value) != digest
+    assert value['z'].ion_hash('md5') == _unmemoized(value['z'])
+
+
+def test_mutation_of_shared_child_invalidates_all_parents():
+    child = ion.loads('[1]')
+    first = ion.loads('[]')
+    first.append(child)
+    second = ion.loads('{}')
+    second['c'] = child
+    first.ion_hash('md5')
+    second.ion_hash('md5')
+    child.append(ion.loads('2'))
+    assert first.ion_hash('md5') == _unmemoized(first)
+    assert second.ion_hash('md5') == _unmemoized(second)
+
+
+def test_mutation_after_rehash_invalidates():
+    value = ion.loads(_ION_STR)
+    value.ion_hash('md5')
+    value['x'].append(ion.loads('7'))
+    value.ion_hash('md5')
+    value['x'].append(ion.loads('8'))
+    assert value.ion_hash('md5') == _unmemoized(value)
+
+
+def test_explicit_invalidate():
+    value = ion.loads(_ION_STR)
+    digest = value.ion_hash('md5')
+    value['z'].get_all_values('w').append(ion.loads('7'))
+    assert value.ion_hash('md5') == digest
+    ionhash.invalidate(value['z'])
+    assert value.ion_hash('md5') == _unmemoized(value) != digest
+
+
+def test_mutation_while_disabled():
+    value = ion.loads(_ION_STR)
+    value.ion_hash('md5')
+    ionhash.disable_memoization()
+    value['x'].append(ion.loads('7'))
+    expected = value.ion_hash('md5')
+    ionhash.enable_memoization()
+    assert value.ion_hash('md5') == expected
+
+
+def test_disable_restores_methods():
+    ionhash.disable_memoization()
+    assert not ionhash.memoization_enabled()
+    assert 'append' not in IonPyList.__dict__
+    assert 'add_item' not in IonPyDict.__dict__
+    assert '__setattr__' not in _IonNature.__dict__
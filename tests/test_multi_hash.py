@@ -0,0 +1,139 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from io import BytesIO
+
+import amazon.ion.simpleion as ion
+import pytest
+from amazon.ion.core import IonEventType
+from amazon.ion.writer import blocking_writer
+from amazon.ion.writer_binary import binary_writer
+
+import ionhash
+from ionhash import hash_binary
+from ionhash import hash_binary_reader
+from ionhash import hash_value
+from ionhash import HashedDocument
+from ionhash import multi_hash_function_provider
+from ionhash.hasher import hash_reader
+from ionhash.hasher import hash_writer
+from ionhash.hasher import hashlib_hash_function_provider
+from ionhash.hasher import HashEvent
+
+from .util import binary_reader_over
+from .util import consume
+from .util import hash_function_provider
+
+_ION_STRS = [
+    'null',
+    '5',
+    'a::b::"\\x0b"',
+    '{}',
+    '{a: 1, b: 2, c: {d: [3, {e: 4, f: null.struct}], g: h::{}}}',
+    '[1, (2 {a: 3, a: 4}), x::{b: {c: {d: 5}}}]',
+    '{\'\\x0b\': "\\x0e", b: {{"\\x0c"}}, c: {{AAECAwQF}}}',
+]
+
+_ALGORITHMS = ['sha256', 'md5', 'sha1']
+
+
+def _expected(value):
+    return {algorithm: value.ion_hash(algorithm) for algorithm in _ALGORITHMS}
+
+
+def _hfp():
+    return multi_hash_function_provider(_ALGORITHMS)
+
+
+@pytest.mark.parametrize("ion_str", _ION_STRS)
+def test_hash_value(ion_str):
+    value = ion.loads(ion_str)
+    expected = _expected(value)
+    assert value.ion_hash(hash_function_provider=_hfp()) == expected
+    assert hash_value(value, _hfp()) == expected
+    assert list(ionhash.hash_values([value, value], hash_function_provider=_hfp())) == [expected, expected]
+    assert list(hash_value(value, _hfp())) == _ALGORITHMS
+
+
+@pytest.mark.parametrize("ion_str", _ION_STRS)
+def test_hash_reader(ion_str):
+    hr = hash_reader(binary_reader_over(ion_str), _hfp())
+    consume(hr)
+    assert hr.send(HashEvent.DIGEST) == _expected(ion.loads(ion_str))
+
+
+@pytest.mark.parametrize("ion_str", _ION_STRS)
+def test_hash_writer(ion_str):
+    hw = hash_writer(blocking_writer(binary_writer(), BytesIO()), _hfp())
+    for event in consume(binary_reader_over(ion_str)):
+        if event.event_type is not IonEventType.STREAM_END:
+            hw.send(event)
+    assert hw.send(HashEvent.DIGEST) == _expected(ion.loads(ion_str))
+
+
+@pytest.mark.parametrize("ion_str", _ION_STRS)
+def test_hash_binary(ion_str):
+    value = ion.loads(ion_str)
+    data = ion.dumps(value, binary=True)
+    assert hash_binary(data, hash_function_provider=_hfp()) == [_expected(value)]
+
+    hr = hash_binary_reader(data, _hfp())
+    consume(hr)
+    assert hr.send(HashEvent.DIGEST) == _expected(value)
+
+
+def test_hash_function_providers():
+    value = ion.loads(_ION_STRS[4])
+    hfp = multi_hash_function_provider(['sha256'], {'identity': hash_function_provider('identity'),
+                                                    'md5': hash_function_provider('md5')})
+    assert value.ion_hash(hash_function_provider=hfp) == {
+        'sha256': value.ion_hash('sha256'),
+        'identity': value.ion_hash(hash_function_provider=hash_function_provider('identity')),
+        'md5': value.ion_hash(hash_function_provider=hashlib_hash_function_provider('md5')),
+    }
+
+
+def test_instrumentation():
+    value = ion.loads(_ION_STRS[4])
+    ionhash.enable_instrumentation()
+    try:
+        assert value.ion_hash(hash_function_provider=_hfp()) == _expected(value)
+        snapshot = ionhash.instrumentation_snapshot()
+    finally:
+        ionhash.disable_instrumentation()
+        ionhash.reset_instrumentation()
+    assert all(snapshot['hash_functions'][algorithm]['digests'] > 0 for algorithm in _ALGORITHMS)
+
+
+def test_memoization():
+    value = ion.loads(_ION_STRS[5])
+    ionhash.enable_memoization()
+    try:
+        hfp = _hfp()
+        assert value.ion_hash(hash_function_provider=hfp) == _expected(value)
+        assert value.ion_hash(hash_function_provider=hfp) == _expected(value)
+        assert value.ion_hash('sha256') == _expected(value)['sha256']
+    finally:
+        ionhash.disable_memoization()
+
+
+def test_no_algorithms():
+    with pytest.raises(Exception):
+        multi_hash_function_provider()
+    with pytest.raises(Exception):
+        multi_hash_function_provider([], {})
+
+
+def test_hashed_document_unsupported():
+    with pytest.raises(Exception):
+        HashedDocument(ion.loads('{a: 1}'), hash_function_provider=_hfp())
@@ -0,0 +1,119 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import random
+
+import amazon.ion.simpleion as ion
+import pytest
+
+import ionhash
+from ionhash import hash_array
+from ionhash import numpy_hasher
+from ionhash.fast_value_hasher import serialize_value
+from ionhash.hasher import hashlib_hash_function_provider
+
+np = pytest.importorskip('numpy')
+
+_RNG = random.Random(0)
+
+_FLOATS = [0.0, -0.0, float('nan'), float('inf'), float('-inf'), 5e-324, 1.7976931348623157e308,
+           # doubles whose encodings include 0x0B, 0x0C and 0x0E
+           1.8684510462260566e-255, 3.5, -3.5] + [_RNG.uniform(-1e9, 1e9) for _ in range(200)]
+
+_INTS = [0, 1, -1, 11, 12, 14, -14, 255, 256, -256, 0x0B0C0E, 2 ** 63 - 1, -2 ** 63] \
+    + [_RNG.randrange(-2 ** 63, 2 ** 63) >> _RNG.randrange(64) for _ in range(200)]
+
+
+@pytest.fixture
+def no_numpy(monkeypatch):
+    monkeypatch.setattr(numpy_hasher, 'np', None)
+
+
+def _scalar_path_serialization(value, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(numpy_hasher, 'np', None)
+        return serialize_value(value, hashlib_hash_function_provider('md5'))
+
+
+def _loads(obj):
+    return ion.loads(ion.dumps(obj))
+
+
+@pytest.mark.parametrize("value", [
+    _loads(_FLOATS),
+    _loads(_INTS),
+    ion.loads('a::(%s)' % ' '.join(str(i) for i in _INTS)),
+    _loads({'a': _FLOATS, 'b': [_INTS]}),
+    ion.loads('[%s]' % ', '.join(['1'] * (numpy_hasher._MIN_VECTORIZED_LENGTH - 1))),
+], ids=['floats', 'ints', 'annotated sexp', 'nested', 'short'])
+def test_vectorized_lists(value, monkeypatch):
+    assert serialize_value(value, hashlib_hash_function_provider('md5')) \
+        == _scalar_path_serialization(value, monkeypatch)
+
+
+@pytest.mark.parametrize("ion_str", [
+    '[%s, 1e0]' % ', '.join(['1'] * 40),
+    '[%s, null.int]' % ', '.join(['1'] * 40),
+    '[%s, true]' % ', '.join(['1'] * 40),
+    '[%s, a::1]' % ', '.join(['1'] * 40),
+    '[%s, %d]' % (', '.join(['1'] * 40), 2 ** 64),
+], ids=['mixed', 'null', 'bool', 'annotated', 'big int'])
+def test_not_vectorized(ion_str, monkeypatch):
+    value = ion.loads(ion_str)
+    assert numpy_hasher._serialized_elements(value) is None
+    assert serialize_value(value, hashlib_hash_function_provider('md5')) \
+        == _scalar_path_serialization(value, monkeypatch)
+
+
+def test_chunks(monkeypatch):
+    monkeypatch.setattr(numpy_hasher, '_CHUNK_LENGTH', 50)
+    value = _loads(_INTS)
+    assert len(list(numpy_hasher._serialized_elements(value))) == 5
+    assert serialize_value(value, hashlib_hash_function_provider('md5')) \
+        == _scalar_path_serialization(value, monkeypatch)
+    assert hash_array(np.array(_INTS), 'md5') == value.ion_hash('md5')
+
+
+@pytest.mark.parametrize("array,values", [
+    (np.array(_FLOATS), _FLOATS),
+    (np.array(_FLOATS[10:], np.float32), [float(f) for f in np.array(_FLOATS[10:], np.float32)]),
+    (np.array(_INTS), _INTS),
+    (np.array([0, 2 ** 64 - 1, 2 ** 63], np.uint64), [0, 2 ** 64 - 1, 2 ** 63]),
+    (np.array([-128, 0, 127], np.int8), [-128, 0, 127]),
+    (np.array([], np.float64), []),
+], ids=['float64', 'float32', 'int64', 'uint64', 'int8', 'empty'])
+def test_hash_array(array, values):
+    assert hash_array(array, 'sha256') == _loads(values).ion_hash('sha256')
+
+
+def test_hash_array_errors(no_numpy):
+    with pytest.raises(Exception):
+        hash_array([1, 2, 3], 'md5')
+
+
+def test_hash_array_unsupported():
+    with pytest.raises(Exception):
+        hash_array(np.zeros((2, 2)), 'md5')
+    with pytest.raises(Exception):
+        hash_array(np.array(['a', 'b']), 'md5')
+
+
+def test_memoized_list_invalidated_by_element_change():
+    value = _loads(_FLOATS)
+    ionhash.enable_memoization()
+    try:
+        before = value.ion_hash('md5')
+        value[3].ion_annotations = ('a',)
+        assert value.ion_hash('md5') != before
+    finally:
+        ionhash.disable_memoization()
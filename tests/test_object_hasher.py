@@ -0,0 +1,97 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import amazon.ion.simpleion as ion
+import pytest
+from amazon.ion.core import Timestamp
+from amazon.ion.core import TimestampPrecision
+from amazon.ion.symbols import SymbolToken
+
+from ionhash import hash_object
+from ionhash import multi_hash_function_provider
+from ionhash.hasher import _CHUNK_SIZE
+
+from .util import hash_function_provider
+
+_OBJECTS = [
+    None, True, False, 0, -5, 2 ** 70, 1.5, -0.0, float('nan'), Decimal('1.50'), Decimal('-0'),
+    datetime(2020, 1, 2, 3, 4, 5, 678), datetime(2020, 1, 2, tzinfo=timezone(timedelta(hours=-3))),
+    Timestamp(2020, 1, 1, precision=TimestampPrecision.YEAR), 'x\x0b', b'\x0c\x0e', '', b'',
+    SymbolToken('sym', None), SymbolToken(None, 0), [], (), {}, [None, [[]]],
+    {'a': [1, (2, 3), {'b': None}], 'c': 'd', '\x0b': b'\x0b'},
+    {'big': 'é' * _CHUNK_SIZE, 'blob': b'\x0b' * (_CHUNK_SIZE + 1)},
+    OrderedDict([('b', 1), ('a', 2)]),
+]
+
+
+@pytest.mark.parametrize("obj", _OBJECTS, ids=[repr(obj)[:40] for obj in _OBJECTS])
+def test_hash_object(obj):
+    assert hash_object(obj, 'sha256') == ion.loads(ion.dumps(obj)).ion_hash('sha256')
+
+
+def test_tuple_as_sexp():
+    obj = {'a': (1, [2, (3,)])}
+    assert hash_object(obj, 'md5', tuple_as_sexp=True) == ion.loads('{a: (1 [2, (3)])}').ion_hash('md5')
+    assert hash_object(obj, 'md5') == ion.loads('{a: [1, [2, [3]]]}').ion_hash('md5')
+
+
+def test_simpleion_values_within():
+    obj = {'a': ion.loads('x::{y: [1, z::2]}'), 'b': [ion.loads('true'), ion.loads('null.int')]}
+    assert hash_object(obj, 'md5') == ion.loads('{a: x::{y: [1, z::2]}, b: [true, null.int]}').ion_hash('md5')
+    value = ion.loads('a::[1, 2]')
+    assert hash_object(value, 'md5') == value.ion_hash('md5')
+
+
+@dataclass
+class _Point:
+    __ion_hash_fields__ = ('x', 'y')
+    x: int
+    y: float
+    label: str = 'ignored'
+
+
+class _Record:
+    def __init__(self, id, tags):
+        self.id = id
+        self.tags = tags
+
+    def __ion_hash_fields__(self):
+        yield 'id', self.id
+        yield 'tags', self.tags
+        yield 'points', [_Point(1, 2.0), _Point(3, 4.5)]
+
+
+def test_ion_hash_fields():
+    assert hash_object(_Point(1, 2.0), 'md5') == ion.loads('{x: 1, y: 2e0}').ion_hash('md5')
+    assert hash_object([_Record(7, ('a', 'b'))], 'md5') \
+        == ion.loads('[{id: 7, tags: ["a", "b"], points: [{x: 1, y: 2e0}, {x: 3, y: 4.5e0}]}]').ion_hash('md5')
+
+
+def test_hash_function_providers():
+    obj = {'a': [1, {'b': 2}], 'c': 'd'}
+    value = ion.loads(ion.dumps(obj))
+    assert hash_object(obj, hash_function_provider=hash_function_provider('identity')) \
+        == value.ion_hash(hash_function_provider=hash_function_provider('identity'))
+    assert hash_object(obj, hash_function_provider=multi_hash_function_provider(['md5', 'sha256'])) \
+        == {'md5': value.ion_hash('md5'), 'sha256': value.ion_hash('sha256')}
+
+
+def test_unsupported_types():
+    for obj in [object(), {'a': {1, 2}}, bytearray(b'a')]:
+        with pytest.raises(TypeError):
+            hash_object(obj, 'md5')
@@ -0,0 +1,57 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#  
+#     http://www.apache.org/licenses/LICENSE-2.0
+#  
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import amazon.ion.simpleion as ion
+from pytest import raises
+
+from ionhash import hash_values
+from ionhash import parallel_hash_binary
+from ionhash import parallel_hash_values
+
+
+def _values():
+    # record sizes are deliberately skewed:  mostly small values, with a few large ones
+    values = []
+    for i in range(300):
+        if i % 50 == 0:
+            values.append(ion.loads('{id: %d, data: "%s"}' % (i, 'x' * 10000)))
+        else:
+            values.append(ion.loads('{id: %d, tags: [a, b::c], nested: {d: %d.5}}' % (i, i)))
+    return values
+
+
+def test_parallel_hash_binary():
+    values = _values()
+    records = [ion.dumps(value, binary=True) for value in values]
+    expected = list(hash_values(values, 'md5'))
+    with ProcessPoolExecutor(2) as executor:
+        assert list(parallel_hash_binary(records, 'md5', chunk_size=1000, executor=executor)) == expected
+
+
+def test_parallel_hash_values():
+    values = _values()
+    expected = list(hash_values(values, 'md5'))
+    assert list(parallel_hash_values(values, 'md5', max_workers=2, chunk_size=1000)) == expected
+
+
+def test_parallel_hash_binary_multiple_values_per_record():
+    records = [ion.dumps(ion.loads('1 2', single_value=False), binary=True, sequence_as_stream=True)]
+    with raises(Exception):
+        list(parallel_hash_binary(records, 'md5', max_workers=1))
+
+
+def test_parallel_hash_binary_invalid_params():
+    with raises(Exception):
+        parallel_hash_binary([])
@@ -0,0 +1,62 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import hashlib
+from io import BytesIO
+
+import amazon.ion.simpleion as ion
+import pytest
+
+from ionhash import hash_binary
+from ionhash import partition_binary
+from ionhash import shard_index
+
+
+def _digests(count):
+    return [hashlib.sha256(b'%d' % i).digest() for i in range(count)]
+
+
+@pytest.mark.parametrize("ring", [False, True], ids=['prefix', 'ring'])
+def test_shard_index_balance(ring):
+    counts = [0] * 8
+    for digest in _digests(8000):
+        counts[shard_index(digest, 8, ring)] += 1
+    assert min(counts) > 700 and max(counts) < 1300
+
+
+def test_shard_index_stability():
+    # with a ring, adding a shard moves only the values assigned to it
+    digests = _digests(10000)
+    moved = [shard_index(digest, 9, True) for digest in digests
+             if shard_index(digest, 8, True) != shard_index(digest, 9, True)]
+    assert set(moved) == {8}
+    assert len(moved) < 2000
+    # whereas with prefixes, about half of the values move
+    assert sum(shard_index(digest, 8) != shard_index(digest, 9) for digest in digests) > 4000
+
+
+@pytest.mark.parametrize("ring", [False, True], ids=['prefix', 'ring'])
+def test_partition_binary(ring):
+    # two streams, with different symbol tables
+    values = [ion.loads('{id: %d, name: n%d, tags: [t%d]}' % (i, i, i % 3)) for i in range(200)]
+    data = ion.dumps(values[:100], binary=True, sequence_as_stream=True) \
+        + ion.dumps(values[100:], binary=True, sequence_as_stream=True)
+    digests = hash_binary(data, 'sha256')
+    outs = [BytesIO() for _ in range(5)]
+    counts = partition_binary(data, outs, 'sha256', ring=ring)
+    assert sum(counts) == 200
+    for shard, out in enumerate(outs):
+        # each shard holds, in order, the values that belong to it
+        expected = [digest for digest in digests if shard_index(digest, 5, ring) == shard]
+        assert hash_binary(out.getvalue(), 'sha256') == expected
+        assert counts[shard] == len(expected)
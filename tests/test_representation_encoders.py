@@ -0,0 +1,157 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from os.path import abspath, join
+
+import amazon.ion.simpleion as ion
+import pytest
+from amazon.ion.core import IonType
+from amazon.ion.core import OffsetTZInfo
+from amazon.ion.core import Timestamp
+from amazon.ion.core import TimestampPrecision
+from amazon.ion.simple_types import IonPyNull
+from amazon.ion.symbols import SymbolToken
+from amazon.ion.writer_binary_raw import _serialize_blob
+from amazon.ion.writer_binary_raw import _serialize_bool
+from amazon.ion.writer_binary_raw import _serialize_clob
+from amazon.ion.writer_binary_raw import _serialize_decimal
+from amazon.ion.writer_binary_raw import _serialize_float
+from amazon.ion.writer_binary_raw import _serialize_int
+from amazon.ion.writer_binary_raw import _serialize_timestamp
+
+from ionhash.hasher import _representation
+from ionhash.hasher import _TQ
+from ionhash.hasher import _TQ_SYMBOL_SID0
+
+
+class _Event:
+    def __init__(self, value, ion_type):
+        self.value = value
+        self.ion_type = ion_type
+
+
+def _serialize_string(event):
+    return bytearray([_TQ[IonType.STRING]]) + event.value.encode('utf-8')
+
+
+def _serialize_symbol(event):
+    if getattr(event.value, 'sid', None) == 0:
+        return bytearray([_TQ_SYMBOL_SID0])
+    return bytearray([_TQ[IonType.SYMBOL]]) + getattr(event.value, 'text', event.value).encode('utf-8')
+
+
+_SERIALIZERS = {
+    IonType.BOOL: _serialize_bool,
+    IonType.INT: _serialize_int,
+    IonType.FLOAT: _serialize_float,
+    IonType.DECIMAL: _serialize_decimal,
+    IonType.TIMESTAMP: _serialize_timestamp,
+    IonType.SYMBOL: _serialize_symbol,
+    IonType.STRING: _serialize_string,
+    IonType.CLOB: _serialize_clob,
+    IonType.BLOB: _serialize_blob,
+}
+
+
+def _serialized_representation(value, ion_type):
+    # the TQ and representation as previously derived: serialized as binary Ion, then split after
+    # the type descriptor and length
+    if value is None:
+        return _TQ[ion_type] | 0x0F, b''
+    _bytes = _SERIALIZERS[ion_type](_Event(value, ion_type))
+    offset = 1
+    if _bytes[0] & 0x0F == 0x0E:
+        while not _bytes[offset] & 0x80:
+            offset += 1
+        offset += 1
+    tq = _bytes[0]
+    if ion_type not in (IonType.BOOL, IonType.SYMBOL):
+        tq &= 0xF0
+    return tq, bytes(_bytes[offset:])
+
+
+def _timestamp(precision, fractional_seconds=None, tz=OffsetTZInfo(timedelta(hours=-7, minutes=-30))):
+    return Timestamp(2020, 2, 29, 23, 59, 58, None, tz, precision=precision, fractional_seconds=fractional_seconds)
+
+
+_VALUES = [
+    (True, IonType.BOOL), (False, IonType.BOOL),
+    (0, IonType.INT), (1, IonType.INT), (-1, IonType.INT), (127, IonType.INT), (128, IonType.INT),
+    (-256, IonType.INT), (2 ** 64, IonType.INT), (-(2 ** 200) + 1, IonType.INT),
+    (0.0, IonType.FLOAT), (-0.0, IonType.FLOAT), (1.5, IonType.FLOAT), (float('nan'), IonType.FLOAT),
+    (float('inf'), IonType.FLOAT), (float('-inf'), IonType.FLOAT), (5e-324, IonType.FLOAT),
+    (Decimal('0'), IonType.DECIMAL), (Decimal('-0'), IonType.DECIMAL), (Decimal('0E-3'), IonType.DECIMAL),
+    (Decimal('-0E+5'), IonType.DECIMAL), (Decimal('1.5'), IonType.DECIMAL), (Decimal('-128'), IonType.DECIMAL),
+    (Decimal('127E-70'), IonType.DECIMAL), (Decimal('-' + '1' * 60 + 'E1000'), IonType.DECIMAL),
+    (_timestamp(TimestampPrecision.YEAR, tz=None), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.MONTH, tz=None), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.DAY, tz=None), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.MINUTE), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.SECOND), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.SECOND, Decimal('0.123456')), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.SECOND, Decimal('0.1234567890')), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.SECOND, Decimal('0.000'), tz=timezone.utc), IonType.TIMESTAMP),
+    (_timestamp(TimestampPrecision.SECOND, Decimal('0.5'), tz=None), IonType.TIMESTAMP),
+    (datetime(2001, 1, 1, 0, 0, 0, 1), IonType.TIMESTAMP),
+    (datetime(1, 1, 1, 23, tzinfo=timezone(timedelta(hours=14))), IonType.TIMESTAMP),
+    ('', IonType.SYMBOL), ('abc', IonType.SYMBOL), ('\x0bé', IonType.SYMBOL),
+    (SymbolToken('abc', 10), IonType.SYMBOL), (SymbolToken(None, 0), IonType.SYMBOL),
+    ('', IonType.STRING), ('abc', IonType.STRING), ('é\U0001f600' * 10, IonType.STRING),
+    (b'', IonType.CLOB), (b'\x00\x0b' * 20, IonType.CLOB),
+    (b'', IonType.BLOB), (bytes(range(256)), IonType.BLOB),
+] + [(None, ion_type) for ion_type in IonType]
+
+
+@pytest.mark.parametrize("value,ion_type", _VALUES, ids=['%s-%d' % (t.name, i) for i, (_, t) in enumerate(_VALUES)])
+def test_matches_serialized_representation(value, ion_type):
+    tq, representation = _representation(value, ion_type)
+    assert (tq, bytes(representation)) == _serialized_representation(value, ion_type)
+
+
+def _scalars(value):
+    # yields (value, ion_type) for each scalar or null within the given value;  null values as None
+    if isinstance(value, IonPyNull):
+        yield None, value.ion_type
+    elif value.ion_type is IonType.STRUCT:
+        for child in value.values():
+            yield from _scalars(child)
+    elif value.ion_type in (IonType.LIST, IonType.SEXP):
+        for child in value:
+            yield from _scalars(child)
+    else:
+        yield value, value.ion_type
+
+
+def test_matches_ion_hash_tests_corpus():
+    path = abspath(join(abspath(__file__), '..', '..', 'ion-hash-test', 'ion_hash_tests.ion'))
+    with open(path) as f:
+        ion_tests = ion.loads(f.read(), single_value=False)
+    count = 0
+    for ion_test in ion_tests:
+        if 'ion' not in ion_test:
+            continue
+        for value, ion_type in _scalars(ion_test['ion']):
+            assert _representation(value, ion_type) == _serialized_representation(value, ion_type)
+            count += 1
+    assert count > 0
+
+
+def test_matches_simpleion_values():
+    for value in ion.loads('''
+            true 0 -7 0e0 -0e0 nan +inf 0d0 -0d0 0d-3 -1.10d3 2017T 2017-01T 2017-01-01T
+            2017-01-01T00:00Z 2017-01-01T00:00:00-00:00 2017-01-01T00:00:00.000+01:00
+            2017-01-01T00:00:00.123456789Z '' abc "" "abc" {{}} {{"abc"}} {{}} {{YWJj}}
+            ''', single_value=False):
+        assert _representation(value, value.ion_type) == _serialized_representation(value, value.ion_type)
@@ -11,7 +11,12 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import subprocess
+import sys
+
 import amazon.ion.simpleion as ion
+import ionhash
+from ionhash import binary_hasher
 
 from pytest import raises
 
@@ -34,6 +39,30 @@ def test_simpleion_with_algorithm():
         b'\x9e\xb1\x12\x17\x8d\xfa\x00\x57\xf7\xdc\x79\x44\x67\x9d\x99\xb8'
 
 
+def test_hash_values_invalid_no_params():
+    with raises(Exception):
+        ionhash.hash_values([ion.loads('blah')])
+
+
+def test_hash_values_with_algorithm():
+    values = [ion.loads(ion_str) for ion_str in ['"hello"', '{a: 1, b: [2]}', 'c::3']]
+    assert list(ionhash.hash_values(values, "md5")) == [value.ion_hash("md5") for value in values]
+
+
+def test_lazy_attributes():
+    assert ionhash.hash_binary is binary_hasher.hash_binary
+    assert 'parallel_hash_values' in dir(ionhash)
+    with raises(AttributeError):
+        ionhash.no_such_attribute
+
+
+def test_import_does_not_import_optional_modules():
+    modules = ['asyncio', 'concurrent.futures', 'multiprocessing', 'numpy', 'sqlite3']
+    imported = subprocess.check_output(
+        [sys.executable, '-c', 'import sys, ionhash; print(" ".join(m for m in %r if m in sys.modules))' % modules])
+    assert imported.split() == []
+
+
 # remainder of the testing for the ion_hash() extension to simpleion classes is
 # covered by test_ion_hash_tests.test_simpleion
 
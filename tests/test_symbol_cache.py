@@ -0,0 +1,76 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#  
+#     http://www.apache.org/licenses/LICENSE-2.0
+#  
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import pytest
+
+import amazon.ion.simpleion as ion
+
+import ionhash
+from ionhash import configure_symbol_cache
+from ionhash import symbol_cache_info
+from ionhash.hasher import hash_reader
+from ionhash.hasher import HashEvent
+
+from .util import binary_reader_over
+from .util import consume
+from .util import hash_function_provider
+
+
+_ION_STR = '[{a: 1, b: 2}, {a: 3, b: 4}, x::y::{c: 5}, {"\\x0b\\x0e\\x0c": 6}]'
+
+
+@pytest.fixture(autouse=True)
+def _empty_symbol_cache():
+    configure_symbol_cache()
+    yield
+    configure_symbol_cache()
+
+
+def _hash_reader_digest(ion_str):
+    hr = hash_reader(binary_reader_over(ion_str), hash_function_provider("md5"))
+    consume(hr)
+    return hr.send(HashEvent.DIGEST)
+
+
+def test_symbol_cache_hits_and_misses():
+    ion.loads(_ION_STR).ion_hash('md5')
+    info = symbol_cache_info()
+    # a, b, x, y, c, and the escaped field name are each serialized once
+    assert info.misses == 6
+    assert info.hits == 2
+    assert info.currsize == 6
+
+
+def test_symbol_cache_shared_by_hash_reader():
+    ion.loads(_ION_STR).ion_hash('md5')
+    misses = symbol_cache_info().misses
+    _hash_reader_digest(_ION_STR)
+    assert symbol_cache_info().misses == misses
+
+
+def test_symbol_cache_bounded():
+    configure_symbol_cache(2)
+    ion.loads(_ION_STR).ion_hash('md5')
+    assert symbol_cache_info().currsize == 2
+    assert symbol_cache_info().maxsize == 2
+
+
+@pytest.mark.parametrize("maxsize", [None, 0, 1])
+def test_symbol_cache_digests(maxsize):
+    expected_value_digest = ion.loads(_ION_STR).ion_hash('md5')
+    expected_reader_digest = _hash_reader_digest(_ION_STR)
+    configure_symbol_cache(maxsize)
+    for _ in range(2):
+        assert ion.loads(_ION_STR).ion_hash('md5') == expected_value_digest
+        assert _hash_reader_digest(_ION_STR) == expected_reader_digest
+        assert ionhash.hash_binary(ion.dumps(ion.loads(_ION_STR)), 'md5') == [expected_value_digest]
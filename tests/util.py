@@ -85,6 +85,10 @@ def hex_string(obj):
 def binary_reader_over(ion_str):
     value = ion.loads(ion_str)
     _bytes = ion.dumps(value, binary=True)
+    return binary_reader_over_bytes(_bytes)
+
+
+def binary_reader_over_bytes(_bytes):
     return ion_reader.blocking_reader(managed_reader(binary_reader(), None), BytesIO(_bytes))
 
 
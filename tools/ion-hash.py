@@ -11,29 +11,296 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+# The input file is memory-mapped, and each digest is printed as soon as its top-level value has been
+# hashed:  binary Ion is hashed directly from the mapped bytes, and text Ion is hashed by a hash_reader
+# as it is parsed, so no simpleion values are created and the memory used is independent of the size
+# of the file.
+#
+# With --jobs N, the top-level values of binary Ion are split into ranges by reading only their type
+# descriptors and lengths (and any local symbol tables), and the ranges are hashed by N worker
+# processes, each of which maps the file itself;  digests are printed in their original order.
+#
+# With --index FILE, the digests of binary Ion are recorded in an index file, and on later runs
+# only the values whose bytes have changed since are hashed;  the others' digests are read from it.
+#
+# With --dedup OUTPUT, no digests are printed;  instead, the top-level values of binary Ion are
+# written to OUTPUT as they are, except for those whose Ion hash is that of a preceding value.
+#
+# With --partition N, no digests are printed;  instead, each top-level value of binary Ion is
+# written as it is to one of N files (PREFIX0.10n to PREFIXN-1.10n), chosen by its Ion hash.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
 import sys
-import amazon.ion.simpleion as ion
-import ionhash
-
-
-if len(sys.argv) < 3:
-    print("Utility that prints the Ion Hash of the top-level values in a file.")
-    print()
-    print("Usage:")
-    print("  ion-hash [algorithm] [filename]")
-    print()
-    print("where [algorithm] is a hash function such as sha256")
-    print()
-    sys.exit()
-
-
-algorithm = sys.argv[1]
-input_file = sys.argv[2]
-
-with open(input_file, 'rb') as f:
-    values = ion.load(f, single_value=False)
-    for value in values:
-        try:
-            print(''.join('%02x ' % x for x in value.ion_hash(algorithm))[0:-1])
-        except Exception as e:
-            print('[unable to digest: ' + str(e) + ']')
+import tempfile
+import time
+
+from amazon.ion import reader as ion_reader
+from amazon.ion.core import IonEventType
+from amazon.ion.reader import NEXT_EVENT
+from amazon.ion.reader_managed import managed_reader
+from amazon.ion.reader_text import text_reader
+
+from amazon.ion.util import coroutine
+from amazon.ion.writer import WriteEventType
+
+from ionhash.binary_hasher import hash_binary_values
+from ionhash.binary_hasher import split_binary
+from ionhash.dedup import DigestStore
+from ionhash.dedup import dedup_binary
+from ionhash.partition import partition_binary
+from ionhash.digest_index import hash_binary_indexed_values
+from ionhash.hasher import HashEvent
+from ionhash.hasher import hash_writer
+from ionhash.hasher import hashlib_hash_function_provider
+
+
+_IVM = b'\xe0\x01\x00\xea'
+
+# Bounds on the size of the ranges hashed by worker processes;  within them, ranges are sized so
+# that each worker hashes several
+_MIN_RANGE_SIZE = 1 << 12
+_MAX_RANGE_SIZE = 1 << 20
+_RANGES_PER_JOB = 16
+
+# Maximum number of ranges (per worker) submitted but not yet printed
+_RANGES_IN_FLIGHT_PER_JOB = 4
+
+# The memory-mapped input file and hash function provider of a worker process
+_worker_buffer = None
+_worker_hfp = None
+
+
+def _format(digest):
+    return ' '.join('%02x' % x for x in digest)
+
+
+def _unable_to_digest(e):
+    return '[unable to digest: ' + str(e) + ']'
+
+
+def _binary_digests(buffer, hfp, binary_range=None):
+    """Yields the formatted digest of each top-level value of the binary Ion in buffer, or in the
+    given range of it (as yielded by split_binary())."""
+    try:
+        for _, _, digest in hash_binary_values(buffer, hash_function_provider=hfp, binary_range=binary_range):
+            # a value that can't be hashed doesn't prevent the values that follow it from being hashed
+            yield _unable_to_digest(digest) if isinstance(digest, Exception) else _format(digest)
+    except Exception as e:
+        # the remainder of the data can't be traversed
+        yield _unable_to_digest(e)
+
+
+def _init_worker(input_file, algorithm):
+    global _worker_buffer, _worker_hfp
+    with open(input_file, 'rb') as f:
+        _worker_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker_hfp = hashlib_hash_function_provider(algorithm)
+
+
+def _hash_range(binary_range):
+    """Executed by a worker process; returns the formatted digests of the values in the range."""
+    return list(_binary_digests(_worker_buffer, _worker_hfp, binary_range))
+
+
+def _parallel_binary_digests(buffer, input_file, algorithm, jobs):
+    """Yields the formatted digest of each top-level value of the binary Ion in buffer, which is
+    the mapped input_file, hashing ranges of the values in worker processes."""
+    range_size = max(_MIN_RANGE_SIZE, min(_MAX_RANGE_SIZE, len(buffer) // (jobs * _RANGES_PER_JOB)))
+    ranges = split_binary(buffer, range_size)
+    error = None
+    in_flight = deque()
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(input_file, algorithm)) as executor:
+        while True:
+            try:
+                binary_range = next(ranges, None)
+            except Exception as e:
+                # the remainder of the data can't be traversed;  the exception itself isn't kept, as
+                # its traceback refers to the mapped buffer
+                error = _unable_to_digest(e)
+                binary_range = None
+            if binary_range is None:
+                break
+            in_flight.append(executor.submit(_hash_range, binary_range))
+            if len(in_flight) >= jobs * _RANGES_IN_FLIGHT_PER_JOB:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    if error is not None:
+        yield error
+
+
+def _indexed_binary_digests(buffer, algorithm, index_file):
+    """Yields the formatted digest of each top-level value of the binary Ion in buffer, reading the
+    digests of unchanged values from the index file, which is then rewritten."""
+    count = 0
+    reused_count = 0
+    try:
+        for start, end, digest, reused in hash_binary_indexed_values(buffer, index_file, algorithm):
+            count += 1
+            reused_count += reused
+            yield _format(digest)
+    except Exception as e:
+        # the index is left as it was
+        yield _unable_to_digest(e)
+        return
+    print("%d of %d digests read from the index" % (reused_count, count), file=sys.stderr)
+
+
+def _dedup(buffer, hfp, output_file, store_file, expected_count):
+    """Writes the top-level values of the binary Ion in buffer that are not duplicates to the
+    output file, printing statistics to stderr."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if store_file is None:
+            store_file = os.path.join(temp_dir, 'digests.db')
+        with DigestStore(store_file, expected_count) as store, open(output_file, 'wb') as out:
+            start = time.perf_counter()
+            try:
+                written = dedup_binary(buffer, out, hash_function_provider=hfp, store=store)
+            except Exception as e:
+                print(_unable_to_digest(e))
+                return
+            elapsed = time.perf_counter() - start
+            statistics = store.statistics()
+    values = statistics['added'] + statistics['duplicates']
+    print("%d values, %d duplicates removed, %d written" % (values, statistics['duplicates'], written),
+          file=sys.stderr)
+    print("%.0f values/s, %.2f MB/s" % (values / elapsed, len(buffer) / elapsed / 1e6), file=sys.stderr)
+    if 'bloom_filter_positives' in statistics:
+        print("Bloom filter:  %d positives, %d false (a false positive rate of %.4f)"
+              % (statistics['bloom_filter_positives'], statistics['bloom_filter_false_positives'],
+                 statistics['bloom_filter_false_positive_rate']), file=sys.stderr)
+
+
+def _partition(buffer, hfp, shard_count, prefix, ring):
+    """Writes each top-level value of the binary Ion in buffer to one of shard_count files,
+    printing the number written to each to stderr."""
+    outs = [open('%s%d.10n' % (prefix, shard), 'wb') for shard in range(shard_count)]
+    try:
+        counts = partition_binary(buffer, outs, hash_function_provider=hfp, ring=ring)
+    except Exception as e:
+        print(_unable_to_digest(e))
+        return
+    finally:
+        for out in outs:
+            out.close()
+    for shard, count in enumerate(counts):
+        print("%s%d.10n: %d values" % (prefix, shard, count), file=sys.stderr)
+
+
+@coroutine
+def _null_writer():
+    """A writer coroutine that discards the events sent to it."""
+    yield
+    while True:
+        yield WriteEventType.COMPLETE
+
+
+def _text_digests(buffer, hfp):
+    """Yields the formatted digest of each top-level value of the text Ion in buffer."""
+    reader = ion_reader.blocking_reader(managed_reader(text_reader(), None), buffer)
+    # the events are hashed by a hash_writer, rather than a hash_reader, so that a value that can't
+    # be hashed (e.g. one that contains a symbol whose text is unknown) leaves the reader usable
+    writer = hash_writer(_null_writer(), hfp)
+    error = None
+    try:
+        event = reader.send(NEXT_EVENT)
+        while event.event_type is not IonEventType.STREAM_END:
+            if error is None:
+                try:
+                    writer.send(event)
+                except Exception as e:
+                    # the remainder of the value is read, but not hashed
+                    error = e
+            if event.depth == 0 and event.event_type is not IonEventType.CONTAINER_START:
+                if error is None:
+                    yield _format(writer.send(HashEvent.DIGEST))
+                else:
+                    yield _unable_to_digest(error)
+                    error = None
+                    writer = hash_writer(_null_writer(), hfp)
+            event = reader.send(NEXT_EVENT)
+    except Exception as e:
+        # the remainder of the stream can't be parsed
+        yield _unable_to_digest(e)
+
+
+def main():
+    args = sys.argv[1:]
+    options = {'--jobs': '1', '--index': None, '--dedup': None, '--store': None, '--bloom': None,
+               '--partition': None, '--output': 'shard-'}
+    flags = {'--ring': False}
+    while args and (args[0] in flags or (len(args) >= 2 and args[0] in options)):
+        if args[0] in flags:
+            flags[args[0]] = True
+            args = args[1:]
+        else:
+            options[args[0]] = args[1]
+            args = args[2:]
+    jobs = int(options['--jobs'])
+    index_file = options['--index']
+    dedup_file = options['--dedup']
+    shard_count = None if options['--partition'] is None else int(options['--partition'])
+    if len(args) < 2 or jobs < 1 or (shard_count is not None and shard_count < 1):
+        print("Utility that prints the Ion Hash of the top-level values in a file.")
+        print()
+        print("Usage:")
+        print("  ion-hash [--jobs N] [--index FILE] [algorithm] [filename]")
+        print("  ion-hash --dedup OUTPUT [--store FILE] [--bloom COUNT] [algorithm] [filename]")
+        print("  ion-hash --partition N [--output PREFIX] [--ring] [algorithm] [filename]")
+        print()
+        print("where [algorithm] is a hash function such as sha256, and N is the number of")
+        print("processes that hash binary Ion in parallel (text Ion is hashed by one process).")
+        print()
+        print("--index records the digests of binary Ion in FILE, and on later runs hashes only")
+        print("the values that have changed since, reading the others' digests from FILE;  the")
+        print("remaining values are hashed by one process.")
+        print()
+        print("--dedup writes the values of binary Ion to OUTPUT, except for those whose Ion hash")
+        print("is that of a preceding value (or is in the --store FILE of a previous run);  --bloom")
+        print("sizes a Bloom filter that precedes the store for COUNT values.")
+        print()
+        print("--partition writes each value of binary Ion to one of the N files PREFIX0.10n to")
+        print("PREFIXN-1.10n (PREFIX is 'shard-' by default), chosen by the leading bytes of its Ion")
+        print("hash or, with --ring, by a consistent-hash ring.")
+        print()
+        sys.exit()
+
+    algorithm = args[0]
+    input_file = args[1]
+    hfp = hashlib_hash_function_provider(algorithm)
+
+    with open(input_file, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            # an empty file can't be memory-mapped, and contains no values
+            if dedup_file is not None:
+                open(dedup_file, 'wb').close()
+            for shard in range(shard_count or 0):
+                open('%s%d.10n' % (options['--output'], shard), 'wb').close()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if buffer[:len(_IVM)] != _IVM:
+                if index_file is not None or dedup_file is not None or shard_count is not None:
+                    sys.exit("--index, --dedup and --partition may only be used with binary Ion")
+                digests = _text_digests(buffer, hfp)
+            elif dedup_file is not None:
+                bloom = options['--bloom']
+                _dedup(buffer, hfp, dedup_file, options['--store'], None if bloom is None else int(bloom))
+                return
+            elif shard_count is not None:
+                _partition(buffer, hfp, shard_count, options['--output'], flags['--ring'])
+                return
+            elif index_file is not None:
+                digests = _indexed_binary_digests(buffer, algorithm, index_file)
+            elif jobs > 1:
+                digests = _parallel_binary_digests(buffer, input_file, algorithm, jobs)
+            else:
+                digests = _binary_digests(buffer, hfp)
+            for digest in digests:
+                print(digest)
+
+
+if __name__ == '__main__':
+    main()